@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "accounts"
+
+    def ready(self):
+        from . import roles
+
+        # Oubli des groupes mémorisés sur l'utilisateur lorsqu'ils changent
+        roles.connect_signals()
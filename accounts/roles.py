@@ -0,0 +1,50 @@
+"""
+Appartenance aux groupes, mémorisée sur l'objet utilisateur.
+
+``request.user`` est chargé une fois par requête par
+``AuthenticationMiddleware`` : en mémorisant les noms de ses groupes sur
+l'instance, ``est_moderateur`` (décorateurs) et le filtre ``is_in_group``
+(``header.html``, ``admin_sidebar.html``...) ne coûtent qu'une requête SQL
+par requête HTTP, quel que soit le nombre de vérifications.
+
+La valeur est oubliée dès que les groupes de l'utilisateur changent
+(signal ``m2m_changed``) ; la requête HTTP suivante recharge de toute
+façon un nouvel objet utilisateur.
+"""
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed
+
+_CACHE_ATTR = "_group_names_cache"
+
+
+def get_group_names(user):
+    """Noms des groupes de ``user`` (``frozenset``), chargés une fois par instance."""
+    if not getattr(user, "is_authenticated", False):
+        return frozenset()
+    names = getattr(user, _CACHE_ATTR, None)
+    if names is None:
+        names = frozenset(user.groups.values_list("name", flat=True))
+        setattr(user, _CACHE_ATTR, names)
+    return names
+
+
+def in_group(user, group_name):
+    """True si ``user`` est superutilisateur ou membre de ``group_name``."""
+    if getattr(user, "is_superuser", False):
+        return True
+    return group_name in get_group_names(user)
+
+
+def _invalidate(sender, instance, action, **kwargs):
+    if action.startswith("post_") and isinstance(instance, get_user_model()):
+        instance.__dict__.pop(_CACHE_ATTR, None)
+
+
+def connect_signals():
+    """Invalide le cache lors d'un ajout/retrait de groupe (``AppConfig.ready``)."""
+    m2m_changed.connect(
+        _invalidate,
+        sender=get_user_model().groups.through,
+        dispatch_uid="accounts.roles.invalidate",
+    )
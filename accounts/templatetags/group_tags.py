@@ -1,5 +1,7 @@
 from django import template
 
+from accounts.roles import in_group
+
 register = template.Library()
 
 
@@ -8,7 +10,7 @@ def is_in_group(user, group_name):
     """
     Retourne True si l'utilisateur appartient au groupe spécifié
     ou si il est superutilisateur, sinon False.
+
+    Les groupes sont chargés une seule fois par requête (``accounts.roles``).
     """
-    if user.groups.filter(name=group_name).exists() or user.is_superuser:
-        return True
-    return False
+    return in_group(user, group_name)
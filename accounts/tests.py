@@ -1,3 +1,5 @@
+from importlib import import_module
+
 from django.contrib.auth import get_user_model
 from django.test import Client, TestCase
 from django.urls import reverse
@@ -230,18 +232,18 @@ class SessionExpiryTests(TestCase):
 
         self.assertEqual(settings.SESSION_COOKIE_AGE, 30 * 24 * 60 * 60)
 
-    def test_settings_session_save_every_request_is_true(self):
+    def test_settings_session_save_every_request_is_false(self):
         from django.conf import settings
 
-        self.assertTrue(settings.SESSION_SAVE_EVERY_REQUEST)
+        self.assertFalse(settings.SESSION_SAVE_EVERY_REQUEST)
 
-    def test_settings_session_engine_is_db(self):
+    def test_settings_session_engine_is_db_backed(self):
         from django.conf import settings
+        from django.contrib.sessions.backends.db import SessionStore as DBStore
 
-        self.assertEqual(
-            settings.SESSION_ENGINE,
-            "django.contrib.sessions.backends.db",
-        )
+        self.assertEqual(settings.SESSION_ENGINE, "app.sessions")
+        engine = import_module(settings.SESSION_ENGINE)
+        self.assertTrue(issubclass(engine.SessionStore, DBStore))
 
     def test_login_without_remember_me_uses_browser_session(self):
         self.client.post(
@@ -289,7 +291,7 @@ class SessionExpiryTests(TestCase):
         self.assertGreater(Session.objects.count(), 0)
 
     def test_sliding_session_refreshes_expiry(self):
-        """SESSION_SAVE_EVERY_REQUEST=True : l'expiration est repoussée."""
+        """Session glissante : l'expiration n'est jamais raccourcie."""
         from django.conf import settings
 
         self.client.post(
@@ -308,6 +310,49 @@ class SessionExpiryTests(TestCase):
         self.assertGreaterEqual(new_age, initial_age - 5)
         self.assertAlmostEqual(new_age, settings.SESSION_COOKIE_AGE, delta=30)
 
+    def _login_remember_me(self):
+        self.client.post(
+            reverse("accounts:login"),
+            {
+                "username": self.user.email,
+                "password": "Str0ng-Pa55word!",
+                "remember_me": "on",
+            },
+        )
+        from django.contrib.sessions.models import Session
+
+        return Session.objects.get(session_key=self.client.session.session_key)
+
+    def test_recent_session_is_not_rewritten(self):
+        """Moins d'un jour depuis le dernier rafraîchissement : aucun UPDATE."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self._login_remember_me()
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("accounts:profile"))
+        writes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if "django_session" in q["sql"]
+            and q["sql"].lstrip().upper().startswith(("UPDATE", "INSERT"))
+        ]
+        self.assertEqual(writes, [])
+
+    def test_stale_session_expiry_is_refreshed_once(self):
+        """Expiration en retard de plus d'un jour : la session est réécrite."""
+        from datetime import timedelta
+
+        from django.contrib.sessions.models import Session
+        from django.utils import timezone
+
+        session = self._login_remember_me()
+        stale = timezone.now() + timedelta(days=20)
+        Session.objects.filter(pk=session.pk).update(expire_date=stale)
+        self.client.get(reverse("accounts:profile"))
+        session.refresh_from_db()
+        self.assertGreater(session.expire_date, stale + timedelta(days=9))
+
 
 class PasswordResetPageTests(TestCase):
     def setUp(self):
@@ -800,3 +845,47 @@ class WelcomeEmailFailureTests(TestCase):
         call_args = mock_error.call_args[0]
         self.assertIn("Échec d'envoi", call_args[0])
         self.assertIn("smtpfail@example.com", call_args[1])
+
+
+class GroupMembershipCacheTests(TestCase):
+    """Les groupes de l'utilisateur ne sont chargés qu'une fois par instance."""
+
+    def setUp(self):
+        from django.contrib.auth.models import Group
+
+        self.group = Group.objects.create(name="moderator")
+        self.user = User.objects.create_user(
+            username="role_user", email="role@example.com", password="Str0ng-Pa55word!"
+        )
+
+    def test_repeated_checks_cost_one_query(self):
+        from accounts.roles import in_group
+        from accounts.views import est_moderateur
+
+        self.user.groups.add(self.group)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(est_moderateur(user))
+            self.assertTrue(in_group(user, "moderator"))
+            self.assertFalse(in_group(user, "editor"))
+
+    def test_superuser_and_anonymous_need_no_query(self):
+        from django.contrib.auth.models import AnonymousUser
+
+        from accounts.roles import in_group
+
+        superuser = User.objects.create_superuser(
+            username="root", email="root@example.com", password="Str0ng-Pa55word!"
+        )
+        with self.assertNumQueries(0):
+            self.assertTrue(in_group(superuser, "moderator"))
+            self.assertFalse(in_group(AnonymousUser(), "moderator"))
+
+    def test_cache_invalidated_when_groups_change(self):
+        from accounts.roles import in_group
+
+        self.assertFalse(in_group(self.user, "moderator"))
+        self.user.groups.add(self.group)
+        self.assertTrue(in_group(self.user, "moderator"))
+        self.user.groups.remove(self.group)
+        self.assertFalse(in_group(self.user, "moderator"))
@@ -19,6 +19,7 @@ from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
 from django.utils.translation import gettext_lazy as _
 
 from contact.models import ContactEmail
+from contact.outbox import get_direct_connection
 
 from .forms import (
     AdminUserCreationForm,
@@ -28,6 +29,7 @@ from .forms import (
     CustomUserCreationForm,
 )
 from .models import CustomUser
+from .roles import in_group
 
 logger = logging.getLogger(__name__)
 audit_logger = logging.getLogger("accounts.audit")
@@ -59,7 +61,7 @@ def est_moderateur(user):
     Renvoie True si l'utilisateur est un modérateur ou un superutilisateur,
     sinon False.
     """
-    return user.groups.filter(name="moderator").exists() or user.is_superuser
+    return in_group(user, "moderator")
 
 
 def _apply_session_expiry(request, remember_me: str | None) -> None:
@@ -68,7 +70,7 @@ def _apply_session_expiry(request, remember_me: str | None) -> None:
     « Se souvenir de moi ».
 
     - Case cochée : la session dure ``settings.SESSION_COOKIE_AGE``
-      secondes (30 jours) et est glissante (``SESSION_SAVE_EVERY_REQUEST``).
+      secondes (30 jours) et est glissante (rafraîchie par ``app.sessions``).
     - Case non cochée : la session expire à la fermeture du navigateur.
     """
     if remember_me:
@@ -285,7 +287,14 @@ def password_reset_view(request):
                         "token": token,
                     },
                 )
-                send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+                # Envoi immédiat : le lien ne doit pas être stocké dans la file
+                send_mail(
+                    subject,
+                    message,
+                    settings.DEFAULT_FROM_EMAIL,
+                    [email],
+                    connection=get_direct_connection(),
+                )
 
                 return redirect("accounts:password_reset_done")
             except CustomUser.DoesNotExist:
@@ -648,12 +657,14 @@ def _send_welcome_email(user, password: str, request) -> bool:
     }
     try:
         message = render_to_string("accounts/welcome_email.txt", context)
+        # Envoi immédiat : le mot de passe ne doit pas être stocké dans la file
         send_mail(
             subject,
             message,
             settings.DEFAULT_FROM_EMAIL,
             [user.email],
             fail_silently=False,
+            connection=get_direct_connection(),
         )
         return True
     except (smtplib.SMTPException, OSError) as exc:
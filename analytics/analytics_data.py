@@ -31,13 +31,24 @@ def is_bot_url(url: str) -> bool:
     return False
 
 
+_last_purge: date | None = None
+
+
 def ensure_dir():
+    global _last_purge
     ANALYTICS_DIR.mkdir(parents=True, exist_ok=True)
-    purge_old_data()
+    # Purge au plus une fois par jour et par processus (la commande
+    # ``maintenance`` la lance aussi) plutôt qu'à chaque écriture
+    today = date.today()
+    if _last_purge != today:
+        _last_purge = today
+        purge_old_data()
 
 
-def purge_old_data():
+def purge_old_data() -> list[str]:
+    """Supprime les fichiers de plus de ``RETENTION_DAYS`` jours, renvoie leurs noms."""
     limite = date.today() - timedelta(days=RETENTION_DAYS)
+    deleted: list[str] = []
     for f in sorted(ANALYTICS_DIR.glob("*.json*")):
         if ".summary" in f.stem:
             continue
@@ -45,8 +56,10 @@ def purge_old_data():
             d = date.fromisoformat(f.stem)
             if d < limite:
                 f.unlink(missing_ok=True)
+                deleted.append(f.name)
         except (ValueError, OSError):
             pass
+    return deleted
 
 
 def count_recent_ips(minutes: int = 15) -> int:
@@ -891,7 +904,7 @@ def log_search_query(query: str, ip: str = "", results_count: int = 0):
     append(entry)
 
 
-def get_search_queries(start: date, end: date) -> list[dict]:
+def get_search_queries(start: date, end: date, limit: int = 20) -> list[dict]:
     queries: dict[str, int] = {}
     d = start
     while d <= end:
@@ -902,7 +915,7 @@ def get_search_queries(start: date, end: date) -> list[dict]:
             if q:
                 queries[q] = queries.get(q, 0) + 1
         d += timedelta(days=1)
-    sorted_queries = sorted(queries.items(), key=lambda x: -x[1])[:20]
+    sorted_queries = sorted(queries.items(), key=lambda x: -x[1])[:limit]
     return [{"query": q, "count": c} for q, c in sorted_queries]
 
 
@@ -1,4 +1,5 @@
 import logging
+from importlib.util import find_spec
 
 from django.conf import settings
 
@@ -7,12 +8,10 @@ logger = logging.getLogger(__name__)
 GEOIP_DB = settings.BASE_DIR / "geoip" / "GeoLite2-City.mmdb"
 _reader = None
 
-try:
-    import geoip2.database  # noqa: F401
-
-    geoip2_available = True
-except ImportError:
-    geoip2_available = False
+# geoip2 (et maxminddb) n'est importé qu'à l'ouverture de la base, à la
+# première géolocalisation : hors du démarrage des workers
+geoip2_available = find_spec("geoip2") is not None
+if not geoip2_available:
     logger.warning("geoip2 non installe - geolocalisation desactivee")
 
 
@@ -22,6 +21,8 @@ def _get_reader():
         if not geoip2_available:
             return None
         if GEOIP_DB.exists():
+            import geoip2.database
+
             _reader = geoip2.database.Reader(str(GEOIP_DB))
     return _reader
 
@@ -1,4 +1,5 @@
 import logging
+import random
 import time
 
 from django.conf import settings
@@ -6,7 +7,10 @@ from django.conf import settings
 from analytics.analytics_data import append
 from analytics.device_parser import parse_user_agent
 from analytics.geo import lookup as geo_lookup
+from analytics.profiling import append as append_profile
+from analytics.profiling import profile_request
 from app.utils import get_client_ip, hash_ip
+from app.warmup import is_warmup_request
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +33,8 @@ class PageTrackingMiddleware:
 
     def __call__(self, request):
         path = request.path_info
-        if self._should_skip(path):
+        # Requêtes internes du préchauffage des workers : pas des visites
+        if self._should_skip(path) or is_warmup_request(request):
             return self.get_response(request)
 
         start = time.time()
@@ -80,3 +85,66 @@ class PageTrackingMiddleware:
         if getattr(settings, "TESTING", False):
             return True
         return False
+
+
+class ProfilingMiddleware:
+    """
+    Profile une fraction des requêtes (``PROFILING_SAMPLE_RATE``, 0 à 1) et
+    celles d'un membre du staff qui envoie l'en-tête ``X-Profile: 1``.
+
+    Enregistre SQL, templates et cache par vue (``analytics.profiling``).
+    Les requêtes demandées par en-tête reçoivent aussi un en-tête
+    ``Server-Timing`` lisible dans les outils de développement du navigateur.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        forced = self._is_forced(request)
+        rate = getattr(settings, "PROFILING_SAMPLE_RATE", 0)
+        if not forced and (rate <= 0 or random.random() >= rate):
+            return self.get_response(request)
+        if self._should_skip(request.path_info):
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        with profile_request() as profile:
+            response = self.get_response(request)
+        total_ms = round((time.perf_counter() - start) * 1000, 1)
+
+        summary = profile.summary()
+        match = getattr(request, "resolver_match", None)
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "view": match.view_name if match else "",
+            "path": request.path_info,
+            "method": request.method,
+            "status": response.status_code,
+            "total_ms": total_ms,
+            "forced": forced,
+            **summary,
+        }
+        try:
+            append_profile(entry)
+        except Exception:
+            logger.exception("Erreur de profilage pour %s", request.path_info)
+
+        if forced:
+            response["Server-Timing"] = (
+                f'sql;dur={summary["sql_ms"]};desc="SQL x{summary["sql_count"]}", '
+                f'tpl;dur={summary["template_ms"]};desc="Templates", '
+                f"total;dur={total_ms}"
+            )
+        return response
+
+    @staticmethod
+    def _is_forced(request):
+        if request.headers.get("X-Profile") != "1":
+            return False
+        user = getattr(request, "user", None)
+        return bool(user and user.is_authenticated and user.is_staff)
+
+    @staticmethod
+    def _should_skip(path: str) -> bool:
+        return path.startswith(("/static/", "/media/"))
@@ -0,0 +1,315 @@
+"""
+Profilage des requêtes en production : SQL, templates et cache par vue.
+
+``PageTrackingMiddleware`` ne mesure que le temps total par URL. Pour une
+fraction des requêtes (``PROFILING_SAMPLE_RATE``) ou sur demande d'un
+membre du staff (en-tête ``X-Profile: 1``), ``ProfilingMiddleware``
+enregistre pour la vue appelée :
+
+- le nombre de requêtes SQL et leur durée totale ;
+- les requêtes répétées (même SQL, paramètres différents : N+1 probable)
+  et les doublons exacts (même SQL, mêmes paramètres) ;
+- la durée de rendu des templates ;
+- les succès et échecs du cache Django.
+
+Une ligne JSON compacte par requête profilée, dans
+``analytics_data/profiling/<date>.jsonl``, conservée
+``PROFILING_RETENTION_DAYS`` jours. Agrégation par vue pour la page
+d'administration (``analytics:admin_profiling``).
+
+Les points de mesure des templates et du cache sont installés au premier
+profilage et ne coûtent qu'une lecture de ``ContextVar`` hors profilage.
+"""
+
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from analytics.analytics_data import ANALYTICS_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILING_DIR = ANALYTICS_DIR / "profiling"
+# Une requête SQL exécutée au moins autant de fois est signalée comme répétée
+REPEAT_THRESHOLD = 3
+# Requêtes répétées conservées par enregistrement
+TOP_REPEATED = 3
+SQL_PREVIEW_LENGTH = 200
+
+_current = ContextVar("analytics_profile", default=None)
+_install_lock = threading.Lock()
+_installed = False
+_last_purge = None
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class Profile:
+    """Mesures d'une requête en cours de profilage."""
+
+    def __init__(self):
+        self.queries = Counter()
+        self.exact = Counter()
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def sql_count(self):
+        return sum(self.queries.values())
+
+    def record_query(self, sql, params, duration):
+        self.queries[sql] += 1
+        try:
+            self.exact[(sql, repr(params))] += 1
+        except Exception:
+            pass
+        self.sql_time += duration
+
+    def summary(self):
+        repeated = [
+            {"sql": _WHITESPACE.sub(" ", sql)[:SQL_PREVIEW_LENGTH], "count": count}
+            for sql, count in self.queries.most_common(TOP_REPEATED)
+            if count >= REPEAT_THRESHOLD
+        ]
+        return {
+            "sql_count": self.sql_count,
+            "sql_ms": round(self.sql_time * 1000, 1),
+            "duplicates": sum(count - 1 for count in self.exact.values()),
+            "repeated": repeated,
+            "template_ms": round(self.template_time * 1000, 1),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+        }
+
+
+# --- Points de mesure ----------------------------------------------------------
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.record_query(sql, params, time.perf_counter() - start)
+
+
+def _wrap_template_render(render):
+    def timed_render(self, context):
+        profile = _current.get()
+        if profile is None:
+            return render(self, context)
+        # Seul le template de plus haut niveau est chronométré ({% include %}
+        # et {% extends %} sont comptés dans son temps)
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            profile.template_depth -= 1
+            if profile.template_depth == 0:
+                profile.template_time += time.perf_counter() - start
+
+    return timed_render
+
+
+_MISSING = object()
+
+
+def _wrap_cache_get(get):
+    def counted_get(self, key, default=None, version=None):
+        profile = _current.get()
+        if profile is None:
+            return get(self, key, default, version)
+        value = get(self, key, _MISSING, version)
+        if value is _MISSING:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+
+    return counted_get
+
+
+def _wrap_cache_get_many(get_many):
+    def counted_get_many(self, keys, version=None):
+        profile = _current.get()
+        values = get_many(self, keys, version)
+        if profile is not None:
+            keys = list(keys) if not isinstance(keys, (list, tuple, set)) else keys
+            profile.cache_hits += len(values)
+            profile.cache_misses += len(keys) - len(values)
+        return values
+
+    return counted_get_many
+
+
+def install():
+    """Installe les mesures de rendu des templates et d'accès au cache (une fois)."""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        from django.core.cache import caches
+        from django.template.base import Template
+
+        Template.render = _wrap_template_render(Template.render)
+        patched = set()
+        for alias in settings.CACHES:
+            backend = type(caches[alias])
+            if backend in patched:
+                continue
+            patched.add(backend)
+            backend.get = _wrap_cache_get(backend.get)
+            backend.get_many = _wrap_cache_get_many(backend.get_many)
+        _installed = True
+
+
+class profile_request:
+    """
+    Gestionnaire de contexte : mesure les requêtes SQL, templates et cache.
+
+        with profile_request() as profile:
+            response = get_response(request)
+        profile.summary()
+    """
+
+    def __enter__(self):
+        from django.db import connections
+
+        install()
+        self.profile = Profile()
+        self._token = _current.set(self.profile)
+        self._wrappers = []
+        for connection in connections.all():
+            wrapper = connection.execute_wrapper(_sql_wrapper)
+            wrapper.__enter__()
+            self._wrappers.append(wrapper)
+        return self.profile
+
+    def __exit__(self, *exc_info):
+        for wrapper in reversed(self._wrappers):
+            wrapper.__exit__(*exc_info)
+        _current.reset(self._token)
+        return False
+
+
+# --- Stockage ------------------------------------------------------------------
+
+
+def _day_path(d):
+    return PROFILING_DIR / f"{d.isoformat()}.jsonl"
+
+
+def purge_old_profiles():
+    """Purge les profils anciens (``PROFILING_RETENTION_DAYS``) ; renvoie leurs noms."""
+    retention = getattr(settings, "PROFILING_RETENTION_DAYS", 14)
+    limit = date.today() - timedelta(days=retention)
+    deleted = []
+    for path in sorted(PROFILING_DIR.glob("*.jsonl")):
+        try:
+            if date.fromisoformat(path.stem) < limit:
+                path.unlink(missing_ok=True)
+                deleted.append(path.name)
+        except (ValueError, OSError):
+            pass
+    return deleted
+
+
+def append(entry):
+    """Ajoute une mesure au fichier du jour (purge au plus une fois par jour)."""
+    global _last_purge
+    PROFILING_DIR.mkdir(parents=True, exist_ok=True)
+    today = date.today()
+    if _last_purge != today:
+        _last_purge = today
+        purge_old_profiles()
+    try:
+        with open(_day_path(today), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    except OSError as e:
+        logger.error("Erreur écriture profilage: %s", e)
+
+
+def load_entries(start, end):
+    """Mesures enregistrées du ``start`` au ``end`` inclus."""
+    entries = []
+    d = start
+    while d <= end:
+        path = _day_path(d)
+        if path.exists():
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+            except OSError as e:
+                logger.error("Erreur lecture profilage: %s", e)
+        d += timedelta(days=1)
+    return entries
+
+
+def _percentile(sorted_values, ratio):
+    return sorted_values[min(int(len(sorted_values) * ratio), len(sorted_values) - 1)]
+
+
+def summarize_by_view(entries):
+    """
+    Agrège les mesures par vue, les plus coûteuses en SQL d'abord.
+
+    Returns:
+        liste de dicts (``view``, ``count``, moyennes, P95, requêtes répétées).
+    """
+    by_view = {}
+    for entry in entries:
+        view = entry.get("view") or entry.get("path", "?")
+        by_view.setdefault(view, []).append(entry)
+
+    result = []
+    for view, items in by_view.items():
+        n = len(items)
+        totals = sorted(item.get("total_ms", 0) for item in items)
+        hits = sum(item.get("cache_hits", 0) for item in items)
+        lookups = hits + sum(item.get("cache_misses", 0) for item in items)
+        repeated = Counter()
+        for item in items:
+            for query in item.get("repeated", []):
+                repeated[query["sql"]] = max(repeated[query["sql"]], query["count"])
+        result.append(
+            {
+                "view": view,
+                "count": n,
+                "avg_ms": round(sum(totals) / n, 1),
+                "p95_ms": _percentile(totals, 0.95),
+                "avg_sql_count": round(
+                    sum(i.get("sql_count", 0) for i in items) / n, 1
+                ),
+                "max_sql_count": max(i.get("sql_count", 0) for i in items),
+                "avg_sql_ms": round(sum(i.get("sql_ms", 0) for i in items) / n, 1),
+                "avg_template_ms": round(
+                    sum(i.get("template_ms", 0) for i in items) / n, 1
+                ),
+                "duplicates": max(i.get("duplicates", 0) for i in items),
+                "cache_hit_rate": round(100 * hits / lookups) if lookups else None,
+                "repeated": [
+                    {"sql": sql, "count": count}
+                    for sql, count in repeated.most_common(TOP_REPEATED)
+                ],
+            }
+        )
+    result.sort(key=lambda row: (-row["avg_sql_count"], -row["avg_ms"]))
+    return result
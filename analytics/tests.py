@@ -0,0 +1,114 @@
+import shutil
+import tempfile
+from datetime import date
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from analytics import profiling
+
+User = get_user_model()
+
+
+class ProfilingTests(TestCase):
+    """Profilage SQL, templates et cache (``analytics.profiling``)."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        patcher = patch.object(profiling, "PROFILING_DIR", self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        cache.clear()
+
+    def test_profile_counts_repeated_queries_templates_and_cache(self):
+        with profiling.profile_request() as profile:
+            for pk in (1, 2, 3, 3):
+                list(User.objects.filter(pk=pk))
+            Template("{% for i in items %}{{ i }}{% endfor %}").render(
+                Context({"items": range(10)})
+            )
+            cache.set("profil", 1)
+            cache.get("profil")
+            cache.get("absent")
+        summary = profile.summary()
+
+        self.assertEqual(summary["sql_count"], 4)
+        self.assertEqual(summary["duplicates"], 1)
+        self.assertEqual(summary["repeated"][0]["count"], 4)
+        self.assertGreater(summary["template_ms"], 0)
+        self.assertEqual((summary["cache_hits"], summary["cache_misses"]), (1, 1))
+
+    def test_nothing_recorded_outside_profiling(self):
+        with profiling.profile_request() as profile:
+            pass
+        list(User.objects.all())
+        cache.get("absent")
+        self.assertEqual(profile.summary()["sql_count"], 0)
+        self.assertEqual(profile.summary()["cache_misses"], 0)
+
+    def test_staff_header_profiles_request(self):
+        staff = User.objects.create_user(
+            "staff@example.com", password="x", is_staff=True
+        )
+        self.client.force_login(staff)
+        response = self.client.get(
+            reverse("competences:competences"), HTTP_X_PROFILE="1"
+        )
+
+        self.assertIn("sql;dur=", response["Server-Timing"])
+        entries = profiling.load_entries(date.today(), date.today())
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]["view"], "competences:competences")
+        self.assertGreater(entries[0]["sql_count"], 0)
+
+    def test_header_ignored_for_non_staff(self):
+        response = self.client.get(
+            reverse("competences:competences"), HTTP_X_PROFILE="1"
+        )
+        self.assertNotIn("Server-Timing", response)
+        self.assertFalse(list(self.tmp.glob("*.jsonl")))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_sampling_profiles_anonymous_requests(self):
+        response = self.client.get(reverse("competences:competences"))
+        self.assertNotIn("Server-Timing", response)
+        self.assertEqual(len(list(self.tmp.glob("*.jsonl"))), 1)
+
+    def test_summarize_by_view(self):
+        entries = [
+            {
+                "view": "a",
+                "total_ms": 10,
+                "sql_count": 2,
+                "cache_hits": 1,
+                "cache_misses": 1,
+            },
+            {
+                "view": "a",
+                "total_ms": 30,
+                "sql_count": 40,
+                "repeated": [{"sql": "SELECT x", "count": 38}],
+            },
+            {"view": "b", "total_ms": 5, "sql_count": 1},
+        ]
+        rows = profiling.summarize_by_view(entries)
+        self.assertEqual([row["view"] for row in rows], ["a", "b"])
+        self.assertEqual(rows[0]["avg_sql_count"], 21)
+        self.assertEqual(rows[0]["max_sql_count"], 40)
+        self.assertEqual(rows[0]["cache_hit_rate"], 50)
+        self.assertEqual(rows[0]["repeated"], [{"sql": "SELECT x", "count": 38}])
+
+    def test_admin_page(self):
+        profiling.append(
+            {"view": "conseil_communautaire:conseil", "total_ms": 12, "sql_count": 3}
+        )
+        admin = User.objects.create_superuser("admin@example.com", "x")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("analytics:admin_profiling"))
+        self.assertContains(response, "conseil_communautaire:conseil")
@@ -7,6 +7,11 @@ app_name = "analytics"
 urlpatterns = [
     path("adminccsa/statistiques/", views.admin_stats, name="admin_stats"),
     path("adminccsa/statistiques/live/", views.live_stats, name="live_stats"),
+    path(
+        "adminccsa/statistiques/profilage/",
+        views.admin_profiling,
+        name="admin_profiling",
+    ),
     path(
         "adminccsa/statistiques/telecharger/tout/",
         views.download_all_json,
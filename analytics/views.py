@@ -11,8 +11,6 @@ from django.http import HttpResponse, JsonResponse
 from django.shortcuts import redirect, render
 from django.utils.safestring import mark_safe
 
-from markdown_it import MarkdownIt
-
 from accounts.views import est_moderateur
 from analytics.analytics_data import (
     ANALYTICS_DIR,
@@ -39,6 +37,8 @@ from analytics.analytics_data import (
     normalize_france_regions,
     run_diagnostics,
 )
+from analytics.profiling import load_entries as load_profiles
+from analytics.profiling import summarize_by_view
 
 
 @login_required
@@ -494,6 +494,9 @@ def download_all_json(request):
 @login_required
 @user_passes_test(lambda u: est_moderateur(u))
 def admin_changelog(request):
+    # markdown-it importé à la consultation : hors du démarrage des workers
+    from markdown_it import MarkdownIt
+
     changelog_path = Path(settings.BASE_DIR / "CHANGELOG.md")
     raw = changelog_path.read_text(encoding="utf-8")
 
@@ -749,3 +752,26 @@ def send_email_report(request):
         messages.warning(request, "Aucune adresse email fournie")
 
     return redirect("analytics:admin_stats")
+
+
+@login_required
+@user_passes_test(lambda u: est_moderateur(u))
+def admin_profiling(request):
+    """Requêtes SQL, templates et cache par vue (``ProfilingMiddleware``)."""
+    retention = getattr(settings, "PROFILING_RETENTION_DAYS", 14)
+    try:
+        days = int(request.GET.get("days", 1))
+    except ValueError:
+        days = 1
+    days = min(max(days, 1), retention)
+    end = date.today()
+    entries = load_profiles(end - timedelta(days=days - 1), end)
+
+    context = {
+        "views": summarize_by_view(entries),
+        "total": len(entries),
+        "days": days,
+        "day_choices": [d for d in (1, 7, 14, 30) if d <= retention],
+        "sample_rate": getattr(settings, "PROFILING_SAMPLE_RATE", 0),
+    }
+    return render(request, "analytics/admin_profiling.html", context)
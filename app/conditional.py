@@ -0,0 +1,153 @@
+"""
+Requêtes conditionnelles (``If-None-Match`` / ``If-Modified-Since``) des
+pages publiques.
+
+Le journal, les partenaires, les liens, les compétences, les rapports
+d'activité et les semestriels étaient rendus en entier à chaque visite.
+``conditional_page`` calcule un ETag et une date ``Last-Modified`` à partir
+des versions de contenu des modèles affichés (``home.content_versions``,
+une requête), de la date des templates et d'un jeton de déploiement
+(``deploy_token()`` : le code et les fichiers statiques changent aussi la
+page) : si le navigateur ou le proxy possède déjà cette version, la
+réponse est un 304 sans rendu ni corps.
+
+Le menu des communes est reconstruit pour la version de ``ConseilVille``
+lue pour l'ETag (``app.context_processors.get_all_cities``) : une page
+servie sous un nouvel ETag n'affiche jamais l'ancien menu.
+
+Les versions plutôt que ``MAX(updated_at)`` : une suppression ne change
+pas le maximum, et tous les modèles n'ont pas de date de modification.
+
+Seules les pages identiques pour tous sont concernées : visiteur anonyme,
+sans message flash en attente. Elles sont servies avec
+``Cache-Control: no-cache`` (revalidation à chaque visite).
+"""
+
+import hashlib
+import os
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from home import content_versions
+
+# Modèles affichés sur toutes les pages (communes du menu et du pied de page)
+CITIES_LABEL = "conseil_communautaire.conseilville"
+COMMON_MODELS = (CITIES_LABEL,)
+
+
+@lru_cache(maxsize=1)
+def templates_modified():
+    """Date de modification la plus récente des templates (une fois par processus)."""
+    latest = 0
+    for engine in engines.all():
+        for directory in engine.template_dirs:
+            for root, _dirs, files in os.walk(directory):
+                for filename in files:
+                    try:
+                        mtime = os.stat(os.path.join(root, filename)).st_mtime
+                    except OSError:
+                        continue
+                    latest = max(latest, mtime)
+    return datetime.fromtimestamp(int(latest), tz=dt_timezone.utc)
+
+
+@lru_cache(maxsize=1)
+def deploy_token():
+    """
+    Jeton du déploiement courant (une fois par processus).
+
+    ``DEPLOY_ID`` s'il est défini (identifiant de build, commit), sinon
+    l'empreinte du manifeste ``collectstatic``, qui change avec le CSS et
+    le JavaScript. Vide sans manifeste (développement, tests).
+    """
+    if getattr(settings, "DEPLOY_ID", ""):
+        return settings.DEPLOY_ID
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    try:
+        return getattr(staticfiles_storage, "manifest_hash", "") or ""
+    except Exception:
+        return ""
+
+
+def _is_shared_page(request):
+    """Vrai si la page est la même pour tous les visiteurs (ni compte, ni message)."""
+    if request.COOKIES.get(CookieStorage.cookie_name):
+        return False
+    user = getattr(request, "user", None)
+    return user is None or not user.is_authenticated
+
+
+def conditional_page(*models):
+    """
+    Décorateur de vue publique : ETag, Last-Modified et réponses 304.
+
+    Usage :
+        @conditional_page("journal.Journal")
+        def journal(request): ...
+
+    ``models`` : modèles (ou labels ``app.Modèle``) dont dépend la page ;
+    ils doivent figurer dans ``home.content_versions.TRACKED_MODELS``.
+    Les paramètres de la requête (``?page=``) n'ont pas à être pris en
+    compte : les navigateurs et proxys associent l'ETag à l'URL complète.
+    """
+    labels = (*models, *COMMON_MODELS)
+    missing = content_versions.untracked(labels)
+    if missing:
+        raise ImproperlyConfigured(
+            "Modèles absents de home.content_versions.TRACKED_MODELS : "
+            + ", ".join(missing)
+        )
+
+    def get_state(request):
+        if not getattr(settings, "CONDITIONAL_PAGES", True):
+            return None
+        if not _is_shared_page(request):
+            return None
+        state = getattr(request, "_conditional_state", None)
+        if state is None:
+            versions, last_modified = content_versions.get_state(labels)
+            # Menu des communes rendu pour la même version (context processor)
+            request.cities_version = versions[CITIES_LABEL]
+            templates = templates_modified()
+            token = "|".join(f"{label}={versions[label]}" for label in sorted(versions))
+            etag = hashlib.md5(
+                f"{templates.timestamp():.0f}|{deploy_token()}|{token}".encode(),
+                usedforsecurity=False,
+            ).hexdigest()
+            if last_modified is None or last_modified < templates:
+                last_modified = templates
+            state = request._conditional_state = (etag, last_modified)
+        return state
+
+    def etag_func(request, *args, **kwargs):
+        state = get_state(request)
+        return state[0] if state else None
+
+    def last_modified_func(request, *args, **kwargs):
+        state = get_state(request)
+        return state[1] if state else None
+
+    def decorator(view):
+        conditional_view = condition(
+            etag_func=etag_func, last_modified_func=last_modified_func
+        )(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if getattr(request, "_conditional_state", None) is not None:
+                patch_cache_control(response, no_cache=True)
+            return response
+
+        return wrapper
+
+    return decorator
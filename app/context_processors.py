@@ -1,16 +1,59 @@
 from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 
 from conseil_communautaire.models import ConseilVille
 
+ALL_CITIES_KEY = "all_cities"
+
+
+def get_all_cities(version=None):
+    """
+    Liste des communes (nom et slug) triée par nom, partagée par le menu,
+    le pied de page et les pages qui listent les communes.
+
+    ``version`` : version de contenu de ``ConseilVille`` déjà lue par la
+    page (``app.conditional``). La liste est alors reconstruite si elle a
+    été mise en cache à partir d'une autre version, pour que l'ETag et le
+    menu rendu correspondent, même dans un worker qui n'a pas vu la
+    modification.
+    """
+    # Utilisation du cache pour éviter les requêtes sur chaque page
+    entry = cache.get(ALL_CITIES_KEY)
+    if entry is None or (version is not None and entry[0] != version):
+        cities = list(
+            ConseilVille.objects.only("city_name", "slug").order_by("city_name")
+        )
+        entry = (version, cities)
+        cache.set(ALL_CITIES_KEY, entry, 300)  # Cache pour 5 minutes
+    return entry[1]
+
+
+def invalidate_all_cities():
+    """Périme la liste des communes du processus courant."""
+    cache.delete(ALL_CITIES_KEY)
+
+
+def _on_city_change(sender, **kwargs):
+    invalidate_all_cities()
+    # Une lecture concurrente avant le commit a pu remettre l'ancienne liste
+    transaction.on_commit(invalidate_all_cities)
+
+
+def connect_signals():
+    """Périme la liste des communes à chaque ajout, modification ou suppression."""
+    post_save.connect(
+        _on_city_change, sender=ConseilVille, dispatch_uid="all_cities_save"
+    )
+    post_delete.connect(
+        _on_city_change, sender=ConseilVille, dispatch_uid="all_cities_delete"
+    )
+
 
 def get_cities(request):
     """
     Context processor to add the list of cities to the context.
     Optimisé avec cache pour éviter les requêtes sur chaque page.
     """
-    # Utilisation du cache pour éviter les requêtes sur chaque page
-    cities = cache.get('all_cities')
-    if cities is None:
-        cities = list(ConseilVille.objects.only('city_name', 'slug').order_by('city_name'))
-        cache.set('all_cities', cities, 300)  # Cache pour 5 minutes
+    cities = get_all_cities(getattr(request, "cities_version", None))
     return {"cities": cities if cities else None}
@@ -0,0 +1,177 @@
+"""
+Réglages SQLite de production et séparation lecture/écriture.
+
+Avec le journal par défaut (``rollback journal``), un écrivain bloque
+tous les lecteurs : plusieurs workers gunicorn se disputent le verrou du
+fichier. À l'ouverture de chaque connexion SQLite (signal
+``connection_created``), on applique :
+
+- ``journal_mode=WAL`` : lecteurs et écrivain ne se bloquent plus ;
+- ``synchronous=NORMAL`` : sûr en WAL, un ``fsync`` par checkpoint et non
+  par transaction ;
+- ``busy_timeout`` : attente du verrou d'écriture au lieu d'une erreur
+  immédiate ``database is locked`` ;
+- ``mmap_size``, ``cache_size``, ``temp_store=MEMORY`` : lectures et tris
+  temporaires en mémoire.
+
+Les valeurs sont surchargeables via ``settings.SQLITE_PRAGMAS``.
+
+Optionnellement (``SQLITE_READ_ALIAS``), un alias ``readonly`` ouvre le
+même fichier en lecture seule (``query_only``) et ``ReadReplicaRouter`` y
+envoie les lectures faites hors transaction : les pages publiques ne
+partagent plus leur connexion avec les écritures (sessions, analytics).
+"""
+
+import logging
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+READ_ALIAS = "readonly"
+
+# Ordre significatif : journal_mode avant synchronous
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,  # ms
+    "mmap_size": 64 * 1024 * 1024,  # 64 Mo
+    "cache_size": -16000,  # ~16 Mo (valeur négative : en Kio)
+    "temp_store": "MEMORY",
+}
+
+# Pragmas qui écrivent dans le fichier : ignorés sur l'alias en lecture seule
+_WRITE_PRAGMAS = {"journal_mode"}
+
+
+def get_pragmas(alias="default"):
+    """Pragmas à appliquer aux connexions de ``alias``."""
+    pragmas = {**DEFAULT_PRAGMAS, **getattr(settings, "SQLITE_PRAGMAS", {})}
+    if alias == READ_ALIAS:
+        pragmas = {k: v for k, v in pragmas.items() if k not in _WRITE_PRAGMAS}
+        pragmas["query_only"] = 1
+    return pragmas
+
+
+def apply_pragmas(connection):
+    """Exécute les pragmas sur une connexion SQLite ouverte."""
+    with connection.cursor() as cursor:
+        for name, value in get_pragmas(connection.alias).items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    if connection.vendor != "sqlite":
+        return
+    try:
+        apply_pragmas(connection)
+    except Exception:
+        logger.exception("Impossible d'appliquer les pragmas SQLite")
+
+
+def connect_signals():
+    """Branche l'initialisation des connexions SQLite (depuis ``AppConfig.ready``)."""
+    connection_created.connect(
+        _on_connection_created, dispatch_uid="app.database.pragmas"
+    )
+
+
+def _pragma_value(cursor, name):
+    cursor.execute(f"PRAGMA {name}")
+    return cursor.fetchone()[0]
+
+
+def optimize_database(vacuum=False):
+    """
+    Entretien du fichier SQLite (connexion ``default``, hors transaction).
+
+    - ``PRAGMA incremental_vacuum`` si ``auto_vacuum=INCREMENTAL`` : rend au
+      système les pages libérées par les suppressions ;
+    - avec ``vacuum=True`` : conversion unique en ``auto_vacuum=INCREMENTAL``
+      suivie d'un ``VACUUM`` complet (réécrit tout le fichier, bloque les
+      écritures le temps de l'opération) ;
+    - ``PRAGMA optimize`` : met à jour les statistiques du planificateur ;
+    - ``wal_checkpoint(TRUNCATE)`` : reporte le WAL et le ramène à zéro.
+
+    Returns:
+        dict ``{"freed_bytes", "free_pages", "auto_vacuum"}``.
+    """
+    connection = connections["default"]
+    if connection.vendor != "sqlite":
+        return {"freed_bytes": 0, "free_pages": 0, "auto_vacuum": None}
+    with connection.cursor() as cursor:
+        page_size = _pragma_value(cursor, "page_size")
+        pages_before = _pragma_value(cursor, "page_count")
+        auto_vacuum = _pragma_value(cursor, "auto_vacuum")
+        if vacuum and auto_vacuum != 2:
+            cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            cursor.execute("VACUUM")
+            auto_vacuum = _pragma_value(cursor, "auto_vacuum")
+        elif auto_vacuum == 2:
+            cursor.execute("PRAGMA incremental_vacuum")
+            cursor.fetchall()
+        cursor.execute("PRAGMA optimize")
+        cursor.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        cursor.fetchall()
+        pages_after = _pragma_value(cursor, "page_count")
+        free_pages = _pragma_value(cursor, "freelist_count")
+    return {
+        "freed_bytes": max(pages_before - pages_after, 0) * page_size,
+        "free_pages": free_pages,
+        "auto_vacuum": auto_vacuum,
+    }
+
+
+class ReadReplicaRouter:
+    """
+    Envoie les lectures hors transaction vers l'alias ``readonly``.
+
+    Dans un bloc ``atomic`` sur ``default``, les lectures restent sur la
+    connexion d'écriture pour voir les modifications non encore validées.
+    Les écritures, migrations et relations passent toujours par ``default``.
+    """
+
+    def db_for_read(self, model, **hints):
+        if READ_ALIAS not in settings.DATABASES:
+            return None
+        if connections["default"].in_atomic_block:
+            return "default"
+        return READ_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {"default", READ_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
+
+
+@contextmanager
+def capture_queries():
+    """
+    Requêtes SQL exécutées dans le bloc, sur toutes les connexions.
+
+    ``CaptureQueriesContext(connection)`` ne voit que ``default`` : avec
+    ``SQLITE_READ_ALIAS``, les lectures passent par ``readonly``. Produit
+    une liste, remplie à la sortie du bloc (dicts ``sql``/``time``).
+    """
+    # Importé ici : ``django.test`` charge unittest, inutile au démarrage
+    from django.test.utils import CaptureQueriesContext
+
+    captured = []
+    with ExitStack() as stack:
+        contexts = [
+            stack.enter_context(CaptureQueriesContext(connections[alias]))
+            for alias in connections
+        ]
+        yield captured
+    for context in contexts:
+        captured.extend(context.captured_queries)
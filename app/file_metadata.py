@@ -0,0 +1,196 @@
+"""
+Métadonnées des fichiers téléversés, persistées en base.
+
+Les listes de documents interrogeaient le système de fichiers à chaque
+rendu (``os.path.exists``, ``FieldFile.size``...). Ce module calcule une
+fois, à l'enregistrement, pour chaque champ fichier :
+
+    {"name": ..., "exists": bool, "size": octets, "mtime": float, "sha256": hex}
+
+et stocke le résultat dans le champ JSON ``file_metadata`` du modèle
+(une entrée par champ fichier). Les rendus lisent ensuite cette valeur
+sans aucun appel système ; la commande ``reconcile_file_metadata``
+(cron) rattrape les fichiers modifiés ou supprimés hors de l'application.
+"""
+
+import hashlib
+import logging
+import os
+
+from django.db.models.signals import post_save
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Modèles portant un champ ``file_metadata`` et leurs champs fichier suivis
+FILE_METADATA_FIELDS = (
+    ("journal.Journal", ("document", "cover")),
+    ("bureau_communautaire.Document", ("document",)),
+)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_metadata(field_file, previous=None):
+    """
+    Métadonnées d'un ``FieldFile`` (un seul ``stat``, hash si nécessaire).
+
+    Args:
+        field_file: fichier à décrire.
+        previous: métadonnées déjà connues ; le SHA-256 est réutilisé si
+            le nom, la taille et la date de modification n'ont pas changé.
+
+    Returns:
+        dict des métadonnées, ou None si le champ est vide.
+    """
+    name = getattr(field_file, "name", None) if field_file else None
+    if not name:
+        return None
+    try:
+        path = field_file.path
+        st = os.stat(path)
+    except (OSError, ValueError, NotImplementedError):
+        return {"name": name, "exists": False, "size": 0, "mtime": None, "sha256": ""}
+
+    previous = previous or {}
+    if (
+        previous.get("exists")
+        and previous.get("name") == name
+        and previous.get("size") == st.st_size
+        and previous.get("mtime") == st.st_mtime
+        and previous.get("sha256")
+    ):
+        sha256 = previous["sha256"]
+    else:
+        try:
+            sha256 = _sha256(path)
+        except OSError as e:
+            logger.warning("Hash impossible pour %s: %s", name, e)
+            sha256 = ""
+    return {
+        "name": name,
+        "exists": True,
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "sha256": sha256,
+    }
+
+
+def refresh_metadata(instance, field_names, force_hash=False):
+    """
+    Recalcule les métadonnées des fichiers d'un objet et les enregistre.
+
+    L'écriture passe par ``QuerySet.update()`` (pas de nouveau signal
+    ``post_save``) et n'a lieu que si quelque chose a changé.
+
+    Args:
+        instance: objet portant un champ ``file_metadata``.
+        field_names: champs fichier à décrire.
+        force_hash: recalcule le SHA-256 même si taille et date sont identiques.
+
+    Returns:
+        True si les métadonnées ont été mises à jour.
+    """
+    current = instance.file_metadata or {}
+    updated = {}
+    for field_name in field_names:
+        previous = None if force_hash else current.get(field_name)
+        metadata = compute_metadata(getattr(instance, field_name, None), previous)
+        if metadata is not None:
+            updated[field_name] = metadata
+    if updated == current:
+        return False
+    type(instance).objects.filter(pk=instance.pk).update(file_metadata=updated)
+    instance.file_metadata = updated
+    return True
+
+
+def get_cached(instance, field_name):
+    """
+    Métadonnées mémorisées d'un champ, ou None si absentes ou périmées.
+
+    Elles sont considérées périmées si le fichier du champ a changé depuis
+    le calcul (nouveau fichier affecté mais pas encore enregistré).
+    """
+    field_file = getattr(instance, field_name, None)
+    name = getattr(field_file, "name", None) if field_file else None
+    metadata = (getattr(instance, "file_metadata", None) or {}).get(field_name)
+    if not name or not metadata or metadata.get("name") != name:
+        return None
+    return metadata
+
+
+def file_exists(instance, field_name):
+    """Existence du fichier, depuis la base (repli sur le disque si inconnue)."""
+    metadata = get_cached(instance, field_name)
+    if metadata is not None:
+        return metadata["exists"]
+    field_file = getattr(instance, field_name, None)
+    if not field_file:
+        return False
+    try:
+        return os.path.exists(field_file.path)
+    except (ValueError, NotImplementedError):
+        return False
+
+
+def file_size(instance, field_name):
+    """Taille en octets depuis la base (repli sur le disque), None si absent."""
+    metadata = get_cached(instance, field_name)
+    if metadata is not None:
+        return metadata["size"] if metadata["exists"] else None
+    field_file = getattr(instance, field_name, None)
+    if not field_file:
+        return None
+    try:
+        return field_file.size
+    except (FileNotFoundError, ValueError, OSError):
+        return None
+
+
+def format_size(size):
+    """Taille lisible (``"12.3 Ko"`` / ``"4.5 Mo"``), False si inconnue."""
+    if size is None:
+        return False
+    ko_size = size / 1024
+    if ko_size > 1024:
+        return f"{ko_size / 1024:.1f} Mo"
+    return f"{ko_size:.1f} Ko"
+
+
+def _make_post_save_handler(field_names):
+    def handler(sender, instance, raw=False, **kwargs):
+        if raw:
+            # Chargement de fixtures : pas d'accès disque
+            return
+        try:
+            refresh_metadata(instance, field_names)
+        except Exception:
+            logger.exception("Erreur de calcul des métadonnées: %r", instance)
+
+    return handler
+
+
+_connected_handlers = []
+
+
+def connect_signals():
+    """Calcule les métadonnées à chaque enregistrement des modèles suivis."""
+    if _connected_handlers:
+        return
+    for model_label, field_names in FILE_METADATA_FIELDS:
+        handler = _make_post_save_handler(field_names)
+        post_save.connect(
+            handler,
+            sender=model_label,
+            weak=False,
+            dispatch_uid=f"file_metadata:{model_label}",
+        )
+        _connected_handlers.append(handler)
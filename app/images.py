@@ -0,0 +1,339 @@
+"""
+Déclinaisons responsives (WebP/AVIF) des images téléversées.
+
+Les images uploadées (couvertures, portraits, blasons, logos...) sont
+servies à leur taille d'origine. Ce module génère, pour chaque image, des
+variantes redimensionnées à largeur fixe dans ``MEDIA_ROOT/derives/`` :
+
+    derives/<chemin d'origine sans extension>-<largeur>w.<format>
+
+Les variantes sont créées hors requête : à l'upload (signal ``post_save``
+déclenché après commit) ou par la commande ``generate_responsive_images``.
+Le rendu du template tag ``{% responsive_image %}`` ne génère jamais rien :
+il liste les variantes déjà présentes, l'original à sa largeur réelle
+servant de plus grande taille. Cette liste est mémorisée par processus
+sous la date de modification de l'original (un remplacement du fichier la
+périme) ; une liste incomplète (génération en cours ou en échec) est
+revérifiée au bout de ``RECHECK_SECONDS``.
+
+AVIF n'est produit que si Pillow a été compilé avec le support AVIF
+(Pillow >= 11.3) ; sinon seules les variantes WebP sont générées.
+"""
+
+import logging
+import os
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+
+logger = logging.getLogger(__name__)
+
+DERIVATIVES_DIR = "derives"
+RESPONSIVE_WIDTHS = (320, 640, 1024, 1600)
+FORMAT_QUALITY = {"avif": 55, "webp": 80}
+# Délai avant de revérifier une image dont des variantes manquent
+RECHECK_SECONDS = 60
+AVAILABLE_CACHE_SIZE = 2048
+
+# Champs image concernés par la génération automatique des variantes
+RESPONSIVE_IMAGE_FIELDS = (
+    ("journal.Journal", "cover"),
+    ("bureau_communautaire.Elus", "picture"),
+    ("conseil_communautaire.ConseilMembre", "photo"),
+    ("conseil_communautaire.ConseilVille", "image"),
+    ("partenaires.Partenaire", "logo"),
+    ("semestriels.SemestrielPage", "picture"),
+)
+
+
+@lru_cache(maxsize=1)
+def get_available_formats():
+    """Formats de sortie supportés par Pillow, du plus compact au moins compact."""
+    from PIL import features
+
+    formats = []
+    if features.check("avif"):
+        formats.append("avif")
+    if features.check("webp"):
+        formats.append("webp")
+    return tuple(formats)
+
+
+def derivative_name(name, width, fmt):
+    """Chemin relatif (storage) d'une variante pour le fichier ``name``."""
+    stem, _ext = os.path.splitext(name)
+    return f"{DERIVATIVES_DIR}/{stem}-{width}w.{fmt}"
+
+
+def _derivative_path(name, width, fmt):
+    return os.path.join(
+        os.fspath(settings.MEDIA_ROOT), *derivative_name(name, width, fmt).split("/")
+    )
+
+
+def _target_widths(source_width):
+    """Largeurs à produire : jamais d'agrandissement au-delà de l'original."""
+    return [w for w in RESPONSIVE_WIDTHS if w < source_width]
+
+
+def _source_width(img):
+    """Largeur affichée d'une image (en-tête seul, sans décodage)."""
+    # Orientations EXIF 5 à 8 : l'image affichée est pivotée de 90°
+    if img.getexif().get(0x0112) in (5, 6, 7, 8):
+        return img.height
+    return img.width
+
+
+def _is_fresh(target, source_mtime):
+    try:
+        return os.path.getmtime(target) >= source_mtime
+    except OSError:
+        return False
+
+
+def _generate(name, source_path, force=False):
+    # Pillow importé au premier usage : hors du démarrage des workers
+    from PIL import Image, ImageOps, UnidentifiedImageError
+
+    try:
+        source_mtime = os.path.getmtime(source_path)
+    except OSError:
+        logger.warning("Image source introuvable pour les variantes: %s", name)
+        return {}
+
+    try:
+        with Image.open(source_path) as img:
+            width = _source_width(img)
+            planned = {fmt: _target_widths(width) for fmt in get_available_formats()}
+            missing = [
+                (fmt, w)
+                for fmt, widths in planned.items()
+                for w in widths
+                if force or not _is_fresh(_derivative_path(name, w, fmt), source_mtime)
+            ]
+
+            if missing:
+                # Décodage complet uniquement s'il reste des variantes à produire
+                img = ImageOps.exif_transpose(img)
+                if img.mode not in ("RGB", "RGBA"):
+                    img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+                for fmt, w in missing:
+                    target = _derivative_path(name, w, fmt)
+                    h = max(1, round(img.height * w / img.width))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_target = f"{target}.tmp"
+                    img.resize((w, h), Image.LANCZOS).save(
+                        tmp_target, format=fmt.upper(), quality=FORMAT_QUALITY[fmt]
+                    )
+                    os.replace(tmp_target, target)
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning("Variantes impossibles pour %s: %s", name, e)
+        return {}
+
+    return {
+        fmt: [(w, derivative_name(name, w, fmt)) for w in widths]
+        for fmt, widths in planned.items()
+        if widths
+    }
+
+
+def generate_derivatives(field_file, force=False):
+    """
+    Génère les variantes manquantes (ou obsolètes) d'une image.
+
+    Args:
+        field_file: ``FieldFile`` d'un ``ImageField``.
+        force: régénère même si la variante est plus récente que l'original.
+
+    Returns:
+        dict ``{format: [(largeur, nom_relatif), ...]}`` des variantes
+        disponibles après l'opération (vide si l'image est illisible).
+    """
+    if not field_file or not getattr(field_file, "name", None):
+        return {}
+    result = _generate(field_file.name, field_file.path, force=force)
+    clear_cache()
+    return result
+
+
+# Variantes disponibles par image :
+# {nom: (mtime de l'original, échéance ou None, (largeur, variantes))}
+_available = {}
+
+
+def clear_cache():
+    """Oublie les variantes mémorisées par ce processus."""
+    _available.clear()
+
+
+def _scan(name, source_path, source_mtime):
+    """
+    Variantes déjà générées et à jour d'une image, sans rien écrire.
+
+    Returns:
+        tuple ``(largeur de l'original, {format: [(largeur, nom), ...]},
+        complet)``, ou None si l'image est illisible.
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(source_path) as img:
+            width = _source_width(img)
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+    variants = {}
+    complete = True
+    for fmt in get_available_formats():
+        found = []
+        for w in _target_widths(width):
+            if _is_fresh(_derivative_path(name, w, fmt), source_mtime):
+                found.append((w, derivative_name(name, w, fmt)))
+            else:
+                complete = False
+        if found:
+            variants[fmt] = found
+    return width, variants, complete
+
+
+def _lookup(field_file):
+    if not field_file or not getattr(field_file, "name", None):
+        return None
+    try:
+        path = field_file.path
+        source_mtime = os.path.getmtime(path)
+    except (NotImplementedError, ValueError, OSError):
+        return None
+    name = field_file.name
+    now = time.monotonic()
+    cached = _available.get(name)
+    if cached and cached[0] == source_mtime and (cached[1] is None or cached[1] > now):
+        return cached[2]
+    scanned = _scan(name, path, source_mtime)
+    entry = scanned[:2] if scanned else None
+    expires = None if scanned and scanned[2] else now + RECHECK_SECONDS
+    if len(_available) >= AVAILABLE_CACHE_SIZE:
+        _available.clear()
+    _available[name] = (source_mtime, expires, entry)
+    return entry
+
+
+def get_derivatives(field_file):
+    """
+    Variantes déjà générées d'une image : ``{format: [(largeur, nom), ...]}``.
+
+    Ne génère rien (voir ``generate_derivatives``). Mémorisé par processus
+    et par date de modification de l'original : les rendus suivants ne
+    font qu'un ``stat``.
+    """
+    entry = _lookup(field_file)
+    return entry[1] if entry else {}
+
+
+def build_srcset(field_file, fmt):
+    """
+    Attribut ``srcset`` (``url 320w, url 640w, ...``) pour un format.
+
+    L'original, à sa largeur réelle, est la plus grande taille proposée :
+    sans lui, un écran large recevrait au mieux la plus grande variante.
+    Vide si aucune variante de ce format n'est encore générée.
+    """
+    from django.core.files.storage import default_storage
+
+    entry = _lookup(field_file)
+    if not entry or not entry[1].get(fmt):
+        return ""
+    width, variants = entry
+    candidates = [
+        f"{default_storage.url(variant)} {w}w" for w, variant in variants[fmt]
+    ]
+    candidates.append(f"{field_file.url} {width}w")
+    return ", ".join(candidates)
+
+
+def delete_derivatives(name):
+    """Supprime toutes les variantes connues d'une image (tous formats)."""
+    removed = 0
+    for fmt in FORMAT_QUALITY:
+        for width in RESPONSIVE_WIDTHS:
+            target = _derivative_path(name, width, fmt)
+            try:
+                os.remove(target)
+                removed += 1
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.warning("Suppression variante impossible %s: %s", target, e)
+    clear_cache()
+    return removed
+
+
+def _safe_generate(field_file):
+    try:
+        generate_derivatives(field_file)
+    except Exception:
+        logger.exception("Erreur de génération des variantes: %s", field_file.name)
+
+
+def _make_pre_save_handler(field_name):
+    def handler(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or instance.pk is None:
+            return
+        if update_fields is not None and field_name not in update_fields:
+            return
+        # Nom de l'image remplacée, pour supprimer ses variantes après commit
+        previous = (
+            sender._default_manager.filter(pk=instance.pk)
+            .values_list(field_name, flat=True)
+            .first()
+        )
+        instance.__dict__.setdefault("_previous_images", {})[field_name] = previous
+
+    return handler
+
+
+def _make_post_save_handler(field_name):
+    def handler(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name, None)
+        previous = instance.__dict__.get("_previous_images", {}).pop(field_name, None)
+        if previous and previous != getattr(field_file, "name", None):
+            transaction.on_commit(lambda: delete_derivatives(previous))
+        if not field_file:
+            return
+        transaction.on_commit(lambda: _safe_generate(field_file))
+
+    return handler
+
+
+def _make_post_delete_handler(field_name):
+    def handler(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name, None)
+        if not field_file:
+            return
+        name = field_file.name
+        transaction.on_commit(lambda: delete_derivatives(name))
+
+    return handler
+
+
+_connected_handlers = []
+
+
+def connect_signals():
+    """
+    Branche génération/suppression des variantes sur ``RESPONSIVE_IMAGE_FIELDS``
+    (y compris celles d'une image remplacée).
+    """
+    if _connected_handlers:
+        return
+    for model_label, field_name in RESPONSIVE_IMAGE_FIELDS:
+        uid = f"responsive_images:{model_label}.{field_name}"
+        before_save = _make_pre_save_handler(field_name)
+        on_save = _make_post_save_handler(field_name)
+        on_delete = _make_post_delete_handler(field_name)
+        pre_save.connect(before_save, sender=model_label, weak=False, dispatch_uid=uid)
+        post_save.connect(on_save, sender=model_label, weak=False, dispatch_uid=uid)
+        post_delete.connect(on_delete, sender=model_label, weak=False, dispatch_uid=uid)
+        _connected_handlers.extend((before_save, on_save, on_delete))
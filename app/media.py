@@ -0,0 +1,229 @@
+"""
+Service des fichiers médias en production.
+
+Remplace ``django.views.static.serve`` (déconseillé en production) pour
+``/media/`` tant qu'aucun serveur frontal ne sert directement le dossier :
+
+- Requêtes conditionnelles : ``If-None-Match`` / ``If-Modified-Since``
+  (réponse 304) avec un ETag dérivé de la taille et de la date du fichier ;
+- Requêtes partielles ``Range: bytes=...`` (réponse 206), indispensables
+  à la visionneuse PDF (pdf.js) pour ne charger que les pages affichées ;
+- Délégation au proxy (``X-Accel-Redirect`` nginx ou ``X-Sendfile``
+  Apache/LiteSpeed) si ``MEDIA_SENDFILE_HEADER`` est configuré : le worker
+  Python ne lit alors plus le fichier ;
+- Variantes précompressées ``.br`` / ``.gz`` posées à côté du fichier
+  (SVG, CSS, JSON...) lorsque le client les accepte.
+"""
+
+import mimetypes
+import os
+import re
+import stat
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+# Types pour lesquels une variante précompressée a un intérêt
+COMPRESSIBLE_TYPES = frozenset(
+    {
+        "image/svg+xml",
+        "text/plain",
+        "text/csv",
+        "text/css",
+        "application/json",
+        "application/javascript",
+        "application/xml",
+    }
+)
+SIDECAR_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _etag(st, encoding=None):
+    suffix = f"-{encoding}" if encoding else ""
+    return quote_etag(f"{st.st_size:x}-{st.st_mtime_ns:x}{suffix}")
+
+
+def _not_modified(request, etag, mtime):
+    """Évalue ``If-None-Match`` puis ``If-Modified-Since`` (RFC 9110 §13.2.2)."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # Comparaison faible : W/"x" et "x" désignent la même représentation
+        normalized = {tag.removeprefix("W/") for tag in candidates}
+        return "*" in normalized or etag in normalized
+    if_modified_since = parse_http_date_safe(
+        request.META.get("HTTP_IF_MODIFIED_SINCE", "")
+    )
+    return if_modified_since is not None and int(mtime) <= if_modified_since
+
+
+def parse_range(header, size):
+    """
+    Interprète un en-tête ``Range`` à plage unique.
+
+    Returns:
+        ``(début, fin)`` inclusifs, ``None`` si l'en-tête est absent ou non
+        supporté (plages multiples : on sert alors le fichier complet), ou
+        ``False`` si la plage n'est pas satisfiable (réponse 416).
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    start_str, end_str = match.groups()
+    if not start_str and not end_str:
+        return None
+    if not start_str:
+        # Suffixe : les N derniers octets
+        length = int(end_str)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(start_str)
+    end = int(end_str) if end_str else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_range(path, start, length):
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = handle.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _pick_sidecar(request, fullpath, content_type):
+    """Retourne ``(encodage, chemin)`` d'une variante précompressée acceptée."""
+    if content_type not in COMPRESSIBLE_TYPES:
+        return None, None
+    accepted = request.META.get("HTTP_ACCEPT_ENCODING", "")
+    for encoding, suffix in SIDECAR_ENCODINGS:
+        if encoding not in accepted:
+            continue
+        candidate = fullpath.with_name(fullpath.name + suffix)
+        try:
+            sidecar_st = candidate.stat()
+        except OSError:
+            continue
+        if stat.S_ISREG(sidecar_st.st_mode):
+            return encoding, candidate
+    return None, None
+
+
+def _apply_common_headers(response, st, etag, content_type):
+    response["Content-Type"] = content_type
+    response["Last-Modified"] = http_date(st.st_mtime)
+    response["ETag"] = etag
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = (
+        f"public, max-age={getattr(settings, 'MEDIA_CACHE_MAX_AGE', 3600)}"
+    )
+    return response
+
+
+@require_safe
+def serve_media(request, path, document_root=None):
+    """
+    Sert un fichier de ``MEDIA_ROOT`` avec cache HTTP et plages d'octets.
+
+    Args:
+        request: requête Django (GET ou HEAD).
+        path: chemin relatif demandé (sous ``/media/``).
+        document_root: racine (défaut ``settings.MEDIA_ROOT``).
+    """
+    document_root = document_root or settings.MEDIA_ROOT
+    try:
+        fullpath = Path(safe_join(os.fspath(document_root), path))
+    except SuspiciousFileOperation:
+        # Tentative de sortie de MEDIA_ROOT (../)
+        raise Http404("Fichier introuvable")
+    try:
+        st = fullpath.stat()
+    except OSError:
+        raise Http404("Fichier introuvable")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Fichier introuvable")
+
+    content_type, _encoding = mimetypes.guess_type(str(fullpath))
+    content_type = content_type or "application/octet-stream"
+    range_header = request.META.get("HTTP_RANGE")
+    sendfile_header = getattr(settings, "MEDIA_SENDFILE_HEADER", "")
+
+    # Variante précompressée (jamais pour une requête partielle : les
+    # octets demandés se réfèrent à la représentation non compressée)
+    encoding, sidecar = (None, None)
+    if not range_header and not sendfile_header:
+        encoding, sidecar = _pick_sidecar(request, fullpath, content_type)
+    etag = _etag(st, encoding)
+
+    if _not_modified(request, etag, st.st_mtime):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(st.st_mtime)
+        return response
+
+    # Délégation au proxy : il gère lui-même Range et la compression
+    if sendfile_header:
+        response = HttpResponse()
+        if sendfile_header == "X-Accel-Redirect":
+            prefix = getattr(
+                settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected-media/"
+            )
+            relative = os.path.relpath(
+                fullpath, os.path.abspath(os.fspath(document_root))
+            ).replace(os.sep, "/")
+            response[sendfile_header] = prefix.rstrip("/") + "/" + relative
+        else:
+            response[sendfile_header] = str(fullpath)
+        return _apply_common_headers(response, st, etag, content_type)
+
+    byte_range = parse_range(range_header, st.st_size)
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if byte_range and if_range and if_range != etag:
+        # La représentation a changé depuis le premier fragment : tout renvoyer
+        byte_range = None
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{st.st_size}"
+        return response
+
+    if byte_range:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _iter_range(fullpath, start, length), status=206
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{st.st_size}"
+        response["Content-Length"] = str(length)
+        return _apply_common_headers(response, st, etag, content_type)
+
+    if sidecar:
+        response = FileResponse(sidecar.open("rb"), filename=fullpath.name)
+        response["Content-Encoding"] = encoding
+    else:
+        response = FileResponse(fullpath.open("rb"))
+    if content_type in COMPRESSIBLE_TYPES:
+        response["Vary"] = "Accept-Encoding"
+    return _apply_common_headers(response, st, etag, content_type)
@@ -0,0 +1,115 @@
+"""
+Détection des fichiers de ``MEDIA_ROOT`` qui ne sont plus référencés.
+
+Les vues de suppression effacent les fichiers dans des rappels
+``on_commit`` ; un échec, une suppression depuis l'admin ou une
+restauration partielle laissent des fichiers orphelins que les sauvegardes
+archivent ensuite chaque semaine.
+
+Principe, pour des dizaines de milliers de fichiers :
+
+1. un ensemble de tous les noms stockés dans les ``FileField`` /
+   ``ImageField`` de tous les modèles (une requête ``values_list`` par
+   champ) ;
+2. un seul parcours de ``MEDIA_ROOT``, chaque fichier testé par
+   appartenance à l'ensemble.
+
+Les dérivés (``derives/<chemin sans extension>-…``) sont orphelins lorsque
+leur original ne l'est plus. Les fichiers récents (``min_age``) sont
+ignorés : leur objet n'est peut-être pas encore enregistré.
+"""
+
+import logging
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models
+
+from app.images import DERIVATIVES_DIR
+from app.utils import _is_within_media
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_AGE = 24 * 60 * 60  # 1 jour
+
+
+def referenced_names():
+    """Noms (relatifs à ``MEDIA_ROOT``) de tous les fichiers référencés en base."""
+    names = set()
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if not isinstance(field, models.FileField):
+                continue
+            values = (
+                model._default_manager.exclude(**{field.attname: ""})
+                .exclude(**{f"{field.attname}__isnull": True})
+                .values_list(field.attname, flat=True)
+            )
+            names.update(values.iterator())
+    return names
+
+
+def _derivative_source_stem(relative_name):
+    """``derives/a/b-640w.webp`` -> ``a/b`` (chemin de l'original sans extension)."""
+    stem = relative_name.removeprefix(f"{DERIVATIVES_DIR}/")
+    return os.path.splitext(stem)[0].rsplit("-", 1)[0]
+
+
+def find_orphans(min_age=DEFAULT_MIN_AGE):
+    """
+    Parcourt ``MEDIA_ROOT`` une fois et produit les fichiers non référencés.
+
+    Yields:
+        tuples ``(nom relatif, taille en octets)``.
+    """
+    media_root = os.fspath(settings.MEDIA_ROOT)
+    if not os.path.isdir(media_root):
+        return
+    referenced = referenced_names()
+    stems = {os.path.splitext(name)[0] for name in referenced}
+    derivatives_prefix = f"{DERIVATIVES_DIR}/"
+    cutoff = time.time() - min_age
+
+    for root, dirs, files in os.walk(media_root):
+        # Dossiers cachés ignorés (.git, .thumbnails...)
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for filename in files:
+            if filename.startswith("."):
+                continue
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, media_root).replace(os.sep, "/")
+            if relative.startswith(derivatives_prefix):
+                if _derivative_source_stem(relative) in stems:
+                    continue
+            elif relative in referenced:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if stat.st_mtime > cutoff:
+                continue
+            yield relative, stat.st_size
+
+
+def delete_orphans(orphans):
+    """
+    Supprime les fichiers ``orphans`` (noms relatifs) ; renvoie les octets libérés.
+    """
+    media_root = os.fspath(settings.MEDIA_ROOT)
+    freed = 0
+    for relative, size in orphans:
+        path = os.path.join(media_root, *relative.split("/"))
+        if not _is_within_media(path):
+            logger.error("Fichier orphelin hors de MEDIA_ROOT ignoré : %s", path)
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            logger.exception("Suppression impossible : %s", path)
+            continue
+        freed += size
+        logger.info("Fichier orphelin supprimé : %s", relative)
+    return freed
@@ -1,4 +1,73 @@
-from django.db import models
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+
+# --- Cache de lecture des modèles de configuration ---------------------------
+#
+# Les singletons (paramètres PLUi, recherche, comptes rendus...) et
+# ``PageStatus`` sont lus à chaque requête publique mais modifiés rarement.
+# Chaque processus garde sa copie en mémoire, validée par un numéro de
+# version stocké dans le cache Django : un ``save``/``delete`` change la
+# version et toutes les copies sont rechargées. Le cache ``LocMemCache``
+# n'étant pas partagé entre workers, une copie expire aussi au bout de
+# ``MODEL_CACHE_TIMEOUT`` secondes.
+
+MODEL_CACHE_TIMEOUT = 60
+
+_local_model_cache = {}
+_cached_models = set()
+
+
+def _model_version_key(model):
+    return f"model-cache:{model._meta.label_lower}:version"
+
+
+def cached_model_value(model, loader):
+    """
+    Valeur ``loader()`` mémorisée pour ``model`` jusqu'à sa prochaine modification.
+
+    La valeur est partagée entre les requêtes du processus : elle doit être
+    traitée en lecture seule. Sans effet si ``settings.MODEL_CACHE`` est faux.
+    """
+    if not getattr(settings, "MODEL_CACHE", True):
+        return loader()
+    label = model._meta.label_lower
+    key = _model_version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    now = time.monotonic()
+    entry = _local_model_cache.get(label)
+    if entry is not None and entry[0] == version and entry[1] > now:
+        return entry[2]
+    value = loader()
+    _local_model_cache[label] = (version, now + MODEL_CACHE_TIMEOUT, value)
+    return value
+
+
+def invalidate_model_cache(model):
+    """Périme les valeurs mémorisées de ``model`` dans tous les processus."""
+    _local_model_cache.pop(model._meta.label_lower, None)
+    cache.set(_model_version_key(model), uuid.uuid4().hex, None)
+
+
+def register_cached_model(model):
+    """Invalide le cache de ``model`` à chaque ``save``/``delete`` (signaux)."""
+    _cached_models.add(model)
+    return model
+
+
+def _invalidate_on_change(sender, **kwargs):
+    if sender in _cached_models or issubclass(sender, SingletonModel):
+        invalidate_model_cache(sender)
+        # Une lecture concurrente avant le commit a pu recharger l'ancienne
+        # valeur : nouvelle invalidation une fois la transaction validée
+        transaction.on_commit(lambda: invalidate_model_cache(sender))
 
 
 class SingletonModel(models.Model):
@@ -56,10 +125,22 @@ class SingletonModel(models.Model):
         except cls.DoesNotExist:
             return None
 
+    @classmethod
+    def get_cached(cls, create=False):
+        """
+        Instance unique mémorisée (zéro requête tant qu'elle n'est pas modifiée).
+
+        Équivaut à ``get_solo()`` (ou ``load()`` avec ``create=True``) pour les
+        lectures des pages publiques. L'objet renvoyé est partagé : ne pas le
+        modifier, utiliser ``load()`` pour l'édition.
+        """
+        return cached_model_value(cls, cls.load if create else cls.get_solo)
+
     @classmethod
     def clear(cls):
         """Supprime l'instance unique (s'il y en a une)."""
         cls.objects.filter(pk=1).delete()
+        invalidate_model_cache(cls)
 
     @classmethod
     def update_or_create(cls, defaults=None, **kwargs):
@@ -67,3 +148,7 @@ class SingletonModel(models.Model):
         defaults = defaults or {}
         defaults.setdefault("pk", 1)
         return cls.objects.update_or_create(pk=1, defaults=defaults, **kwargs)
+
+
+post_save.connect(_invalidate_on_change, dispatch_uid="app.models.model_cache_save")
+post_delete.connect(_invalidate_on_change, dispatch_uid="app.models.model_cache_delete")
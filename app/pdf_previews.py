@@ -0,0 +1,299 @@
+"""
+Aperçus (première page en WebP) et nombre de pages des PDF téléversés.
+
+Pour chaque PDF (journal, rapports d'activité, calendrier semestriel,
+documents de conseil et du bureau), on produit dans ``MEDIA_ROOT/derives/``,
+à côté des variantes d'images (voir ``app.images``) :
+
+    derives/<chemin du PDF sans extension>-preview.webp   (vignette)
+    derives/<chemin du PDF sans extension>-preview.json   (métadonnées)
+
+Le rendu n'a jamais lieu dans la requête d'upload : le signal
+``post_save`` place le fichier dans une file traitée par un thread de
+fond (après commit), et la commande ``generate_pdf_previews`` (cron)
+rattrape tout ce qui manque (redémarrage de worker, fichiers anciens).
+
+Le rendu utilise PyMuPDF (``fitz``) ; s'il n'est pas installé, les
+aperçus sont simplement désactivés.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_delete, post_save
+
+from app.images import DERIVATIVES_DIR
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_WIDTH = 320
+PREVIEW_QUALITY = 75
+PREVIEW_CACHE_SIZE = 1024
+
+# Champs PDF pour lesquels un aperçu est généré
+PDF_PREVIEW_FIELDS = (
+    ("journal.Journal", "document"),
+    ("rapports_activite.RapportActivite", "file"),
+    ("semestriels.SemestrielPage", "file"),
+    ("comptes_rendus.DocumentConseil", "file"),
+    ("bureau_communautaire.Document", "document"),
+)
+
+
+def _derived_name(name, suffix):
+    stem, _ext = os.path.splitext(name)
+    return f"{DERIVATIVES_DIR}/{stem}-preview.{suffix}"
+
+
+def _media_path(relative_name):
+    return os.path.join(os.fspath(settings.MEDIA_ROOT), *relative_name.split("/"))
+
+
+def preview_name(name):
+    """Chemin relatif (storage) de la vignette WebP d'un PDF."""
+    return _derived_name(name, "webp")
+
+
+def metadata_name(name):
+    """Chemin relatif (storage) du fichier JSON de métadonnées d'un PDF."""
+    return _derived_name(name, "json")
+
+
+# Aperçus trouvés par ce processus : {nom du PDF: métadonnées}. Les
+# absences ne sont pas mémorisées (aperçu produit plus tard, ailleurs)
+_previews = {}
+
+
+def clear_cache():
+    """Oublie les aperçus mémorisés par ce processus."""
+    _previews.clear()
+
+
+def _remember(name, metadata):
+    if len(_previews) >= PREVIEW_CACHE_SIZE:
+        _previews.clear()
+    _previews[name] = metadata
+
+
+def _read_metadata(name):
+    try:
+        with open(_media_path(metadata_name(name)), encoding="utf-8") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def render_preview(name, source_path, force=False):
+    """
+    Rend la première page d'un PDF et extrait son nombre de pages.
+
+    Args:
+        name: nom relatif du fichier (``FieldFile.name``).
+        source_path: chemin absolu du PDF.
+        force: re-rend même si l'aperçu est plus récent que le PDF.
+
+    Returns:
+        dict ``{"page_count", "width", "height"}`` ou None (fichier non PDF,
+        illisible, ou PyMuPDF absent).
+    """
+    if not name or not name.lower().endswith(".pdf"):
+        return None
+    try:
+        source_mtime = os.path.getmtime(source_path)
+    except OSError:
+        logger.warning("PDF introuvable pour l'aperçu: %s", name)
+        return None
+
+    meta_path = _media_path(metadata_name(name))
+    if not force:
+        try:
+            if os.path.getmtime(meta_path) >= source_mtime:
+                cached = _read_metadata(name)
+                if cached:
+                    return cached
+        except OSError:
+            pass
+
+    try:
+        import fitz
+    except ImportError:
+        logger.warning("PyMuPDF non installé - aperçus PDF désactivés")
+        return None
+
+    from PIL import Image
+
+    try:
+        with fitz.open(source_path) as document:
+            page_count = document.page_count
+            page = document.load_page(0)
+            zoom = PREVIEW_WIDTH / page.rect.width
+            pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes(
+                "RGB", (pixmap.width, pixmap.height), pixmap.samples
+            )
+    except Exception as e:
+        # PyMuPDF lève des exceptions variées (FileDataError, RuntimeError...)
+        logger.warning("Aperçu impossible pour %s: %s", name, e)
+        return None
+
+    webp_path = _media_path(preview_name(name))
+    os.makedirs(os.path.dirname(webp_path), exist_ok=True)
+    image.save(f"{webp_path}.tmp", format="WEBP", quality=PREVIEW_QUALITY)
+    os.replace(f"{webp_path}.tmp", webp_path)
+
+    metadata = {
+        "page_count": page_count,
+        "width": image.width,
+        "height": image.height,
+    }
+    with open(f"{meta_path}.tmp", "w", encoding="utf-8") as handle:
+        json.dump(metadata, handle)
+    os.replace(f"{meta_path}.tmp", meta_path)
+
+    _remember(name, metadata)
+    return metadata
+
+
+def delete_preview(name):
+    """Supprime la vignette et le JSON d'un PDF ; renvoie le nombre de fichiers."""
+    _previews.pop(name, None)
+    removed = 0
+    for derived in (preview_name(name), metadata_name(name)):
+        target = _media_path(derived)
+        try:
+            os.remove(target)
+            removed += 1
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning("Suppression aperçu impossible %s: %s", target, e)
+    return removed
+
+
+def process_instance(instance, field_name, force=False):
+    """Génère l'aperçu d'un objet et renseigne ``Journal.page_number``."""
+    field_file = getattr(instance, field_name, None)
+    if not field_file or not field_file.name:
+        return None
+    metadata = render_preview(field_file.name, field_file.path, force=force)
+    if metadata and hasattr(instance, "page_number") and not instance.page_number:
+        # update() plutôt que save() : pas de nouveau signal post_save
+        type(instance).objects.filter(pk=instance.pk).update(
+            page_number=metadata["page_count"]
+        )
+        instance.page_number = metadata["page_count"]
+    return metadata
+
+
+def get_preview(field_file):
+    """
+    Métadonnées de l'aperçu d'un PDF (avec ``url``), ou None s'il n'existe pas.
+
+    Lecture seule : ne déclenche jamais de rendu. Les aperçus trouvés sont
+    mémorisés par processus ; les absences ne le sont pas, pour qu'un
+    aperçu produit par un autre worker apparaisse sans redémarrage (une
+    absence ne relit que son propre fichier JSON).
+    """
+    from django.core.files.storage import default_storage
+
+    name = getattr(field_file, "name", None) if field_file else None
+    if not name:
+        return None
+    metadata = _previews.get(name)
+    if metadata is None:
+        metadata = _read_metadata(name)
+        if metadata is None:
+            return None
+        _remember(name, metadata)
+    return {**metadata, "url": default_storage.url(preview_name(name))}
+
+
+# --- File de traitement en arrière-plan -------------------------------------
+
+_queue = queue.Queue()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _worker_loop():
+    from django.apps import apps
+
+    while True:
+        model_label, pk, field_name = _queue.get()
+        try:
+            close_old_connections()
+            model = apps.get_model(model_label)
+            instance = model.objects.filter(pk=pk).first()
+            if instance is not None:
+                missing = get_preview(getattr(instance, field_name)) is None
+                if process_instance(instance, field_name) and missing:
+                    from home.content_versions import bump
+
+                    # Pages déjà rendues sans l'aperçu (fragments, ETag) à refaire
+                    bump(model)
+        except Exception:
+            logger.exception("Erreur d'aperçu PDF pour %s #%s", model_label, pk)
+        finally:
+            close_old_connections()
+            _queue.task_done()
+
+
+def enqueue(model_label, pk, field_name):
+    """Place un PDF dans la file du thread de fond (démarré à la demande)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_worker_loop, name="pdf-previews", daemon=True
+            )
+            _worker.start()
+    _queue.put((model_label, pk, field_name))
+
+
+def _make_post_save_handler(model_label, field_name):
+    def handler(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name, None)
+        if not field_file or not field_file.name.lower().endswith(".pdf"):
+            return
+        pk = instance.pk
+        transaction.on_commit(lambda: enqueue(model_label, pk, field_name))
+
+    return handler
+
+
+def _make_post_delete_handler(field_name):
+    def handler(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name, None)
+        if not field_file or not field_file.name.lower().endswith(".pdf"):
+            return
+        name = field_file.name
+        transaction.on_commit(lambda: delete_preview(name))
+
+    return handler
+
+
+_connected_handlers = []
+
+
+def connect_signals():
+    """
+    Branche la suppression des aperçus et, si activée, la file de rendu sur
+    ``PDF_PREVIEW_FIELDS``.
+    """
+    if _connected_handlers:
+        return
+    background = getattr(settings, "PDF_PREVIEW_BACKGROUND", True)
+    for model_label, field_name in PDF_PREVIEW_FIELDS:
+        uid = f"pdf_previews:{model_label}.{field_name}"
+        on_delete = _make_post_delete_handler(field_name)
+        post_delete.connect(on_delete, sender=model_label, weak=False, dispatch_uid=uid)
+        _connected_handlers.append(on_delete)
+        if background:
+            on_save = _make_post_save_handler(model_label, field_name)
+            post_save.connect(on_save, sender=model_label, weak=False, dispatch_uid=uid)
+            _connected_handlers.append(on_save)
@@ -0,0 +1,286 @@
+"""
+Budgets de requêtes SQL par page.
+
+Les optimisations passées (préchargements des élus, des commissions, de la
+liste des communes...) se perdent facilement : une relation ajoutée dans un
+template et la page repasse en N+1 sans qu'aucun test fonctionnel ne
+bronche. ``QUERY_BUDGETS`` fixe, pour chaque URL nommée, le nombre maximal
+de requêtes SQL de son rendu ; ``app.tests.QueryBudgetTests`` rend toutes
+les pages publiques et d'administration sur des données de mesure
+(``benchmarks.fixtures``, plusieurs objets par liste pour qu'un N+1 se
+voie) et échoue si une page dépasse son budget, exécute deux fois la même
+requête (mêmes paramètres) ou n'a pas de budget déclaré.
+
+Les budgets sont mesurés caches de modèles désactivés (configuration des
+tests) : c'est le coût d'un cache froid. Après une optimisation, abaisser
+le budget pour la verrouiller.
+"""
+
+from django.apps import apps
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from app.database import capture_queries
+
+# Nombre maximal de requêtes SQL par URL nommée (rendu GET, cache froid)
+QUERY_BUDGETS = {
+    # Pages de home et recherche
+    "home": 3,
+    "presentation": 6,
+    "marches_publics": 1,
+    "mobilite": 1,
+    "habitat": 1,
+    "collecte_dechets": 1,
+    "encombrants": 1,
+    "dechetteries": 1,
+    "maisons_sante": 1,
+    "mutuelle": 1,
+    "contrat_local_sante": 1,
+    "plui": 2,
+    "projet_plui": 1,
+    "equipe": 1,
+    "mentions_legales": 1,
+    "politique_confidentialite": 1,
+    "cookies": 1,
+    "plan_du_site": 1,
+    "accessibilite": 1,
+    "mediapass": 1,
+    "ctg": 1,
+    "guide_eco_citoyen": 1,
+    "clea": 1,
+    "documents_plui": 1,
+    "modification_simplifiee_1": 2,
+    "admin_plui_settings": 7,
+    "dev_eco": 1,
+    "kit_logos": 1,
+    "calendrier_collecte_ics": 0,
+    "search": 5,
+    "search_suggestions": 0,
+    # accounts
+    "accounts:register": 1,
+    "accounts:login": 2,
+    "accounts:profile": 0,
+    "accounts:password_reset": 1,
+    "accounts:password_reset_done": 1,
+    "accounts:password_reset_complete": 1,
+    "accounts:admin_dashboard": 13,
+    "accounts:admin_user_list": 5,
+    "accounts:admin_create_user": 3,
+    "accounts:admin_logs": 3,
+    # robots.txt
+    "robots_txt": 1,
+    # partenaires
+    "partenaires:partenaires": 5,
+    "partenaires:admin_categories_list": 6,
+    "partenaires:add_categorie": 3,
+    "partenaires:edit_categorie": 4,
+    "partenaires:admin_partenaires_list": 6,
+    "partenaires:add_partenaire": 4,
+    "partenaires:edit_partenaire": 5,
+    # conseil_communautaire
+    "conseil_communautaire:conseil": 5,
+    "conseil_communautaire:admin_add_city": 3,
+    "conseil_communautaire:admin_list_cities": 6,
+    "conseil_communautaire:admin_edit_city": 4,
+    "conseil_communautaire:admin_member_add": 5,
+    "conseil_communautaire:admin_membres_list": 9,
+    "conseil_communautaire:admin_member_edit": 10,
+    # journal
+    "journal:journal": 4,
+    "journal:journal_detail": 1,
+    "journal:add_journal": 3,
+    "journal:admin_journaux_list": 4,
+    "journal:edit_journal": 6,
+    # bureau-communautaire
+    "bureau-communautaire:elus": 9,
+    "bureau-communautaire:admin_elu_add": 7,
+    "bureau-communautaire:admin_elus_list": 6,
+    "bureau-communautaire:admin_elu_update": 9,
+    "bureau-communautaire:admin_document_add": 3,
+    "bureau-communautaire:admin_documents_list": 4,
+    "bureau-communautaire:admin_page_status": 7,
+    # semestriels
+    "semestriels:semestriel": 3,
+    "semestriels:add_content": 6,
+    "semestriels:list_content": 4,
+    # commissions
+    "commissions:commissions": 7,
+    "commissions:admin_add_commission": 5,
+    "commissions:admin_list_commissions": 9,
+    "commissions:admin_edit_commission": 7,
+    "commissions:upload_commission_doc": 6,
+    "commissions:edit_mandat": 4,
+    "commissions:admin_competences": 5,
+    "commissions:admin_add_competence": 2,
+    "commissions:admin_page_status": 7,
+    # competences
+    "competences:competences": 3,
+    "competences:admin_competences_list": 4,
+    "competences:add_competence": 3,
+    "competences:edit_competence": 4,
+    # comptes_rendus
+    "comptes_rendus:comptes_rendus": 3,
+    "comptes_rendus:proces_verbaux": 2,
+    "comptes_rendus:admin_cr_list": 6,
+    "comptes_rendus:add_conseil": 3,
+    "comptes_rendus:add_cr_link": 5,
+    # rapports_activite
+    "rapports_activite:rapports_activite": 3,
+    "rapports_activite:add_rapport_activite": 3,
+    "rapports_activite:gestion_rapports_activite": 4,
+    # linktree
+    "linktree:linktree_page": 3,
+    "linktree:admin_liens_list": 4,
+    "linktree:admin_lien_add": 3,
+    # communes-membres
+    "communes-membres:list": 2,
+    "communes-membres:commune": 3,
+    "communes-membres:admin_acte_add": 4,
+    "communes-membres:admin_acte_list": 4,
+    # services
+    "services:add_service": 3,
+    "services:admin_services_list": 5,
+    "services:reorder_services": 2,
+    # contact
+    "contact:list_contacts": 4,
+    "contact:add_contact": 3,
+    # backup
+    "backup:list_backups": 7,
+    # analytics
+    "analytics:admin_stats": 3,
+    "analytics:live_stats": 2,
+    "analytics:admin_profiling": 3,
+    "analytics:batch_delete": 2,
+    "analytics:batch_export": 2,
+    "analytics:admin_changelog": 3,
+    # Redirections des anciennes URL de comptes
+    "login_redirect": 2,
+    "register_redirect": 1,
+    "profile_redirect": 0,
+}
+
+# URL à paramètres : objet de données de mesure utilisé pour les construire
+# (modèle, argument de l'URL, champ de l'objet)
+URL_OBJECTS = {
+    "journal:journal_detail": ("journal.Journal", "id", "pk"),
+    "journal:edit_journal": ("journal.Journal", "id", "pk"),
+    "communes-membres:commune": ("conseil_communautaire.ConseilVille", "slug", "slug"),
+    "conseil_communautaire:admin_edit_city": (
+        "conseil_communautaire.ConseilVille",
+        "city_id",
+        "pk",
+    ),
+    "conseil_communautaire:admin_member_edit": (
+        "conseil_communautaire.ConseilMembre",
+        "id",
+        "pk",
+    ),
+    "bureau-communautaire:admin_elu_update": (
+        "bureau_communautaire.Elus",
+        "elu_id",
+        "pk",
+    ),
+    "commissions:admin_edit_commission": (
+        "commissions.Commission",
+        "commission_id",
+        "pk",
+    ),
+    "commissions:edit_mandat": ("commissions.Mandat", "mandat_id", "pk"),
+    "competences:edit_competence": ("competences.Competence", "competence_id", "pk"),
+    "partenaires:edit_categorie": ("partenaires.CategoriePartenaire", "id", "pk"),
+    "partenaires:edit_partenaire": ("partenaires.Partenaire", "id", "pk"),
+}
+
+# Jamais rendues : actions à effet de bord en GET, téléchargements lourds,
+# déconnexion, fichiers servis tels quels, pages en erreur
+EXCLUDED = {
+    "accounts:logout",
+    "logout_redirect",
+    "serve_media",
+    "backup:create_backup_download",
+    "backup:create_backup_store",
+    "analytics:download_all",
+    "analytics:export_pdf",
+    "analytics:send_email_report",
+    "telecharger_calendrier_verre",
+    # En erreur : noms d'URL sans espace de noms dans ``home.sitemaps``
+    "django.contrib.sitemaps.views.sitemap",
+}
+
+# Requêtes qui peuvent légitimement se répéter à l'identique
+_IGNORED_DUPLICATES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def _walk(patterns, prefix="", namespace=None):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == "admin":
+                # Administration Django : non utilisée au quotidien
+                continue
+            ns = pattern.namespace
+            if namespace and ns:
+                ns = f"{namespace}:{ns}"
+            yield from _walk(
+                pattern.url_patterns, prefix + str(pattern.pattern), ns or namespace
+            )
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            name = f"{namespace}:{pattern.name}" if namespace else pattern.name
+            yield name, pattern.pattern.regex.groupindex.keys()
+
+
+def iter_pages():
+    """
+    URL nommées du site à rendre, dans l'ordre de l'URLconf.
+
+    Returns:
+        liste de tuples ``(nom, arguments)`` ; les URL à paramètres absentes
+        de ``URL_OBJECTS`` et celles de ``EXCLUDED`` sont ignorées.
+    """
+    pages = []
+    seen = set()
+    for name, args in _walk(get_resolver().url_patterns):
+        if name in EXCLUDED or name in seen:
+            continue
+        seen.add(name)
+        if args and name not in URL_OBJECTS:
+            continue
+        pages.append((name, tuple(args)))
+    return pages
+
+
+def url_kwargs(name):
+    """Arguments de l'URL ``name``, tirés du premier objet du modèle déclaré."""
+    if name not in URL_OBJECTS:
+        return {}
+    model_label, kwarg, field = URL_OBJECTS[name]
+    obj = apps.get_model(model_label)._default_manager.order_by("pk").first()
+    if obj is None:
+        raise LookupError(f"Aucun objet {model_label} pour construire {name}")
+    return {kwarg: getattr(obj, field)}
+
+
+def is_admin_page(path):
+    """Vrai pour les pages de l'administration du site (rendues en superutilisateur)."""
+    return "adminccsa/" in path
+
+
+def measure(client, path):
+    """
+    Rend ``path`` et compte ses requêtes SQL.
+
+    Returns:
+        tuple ``(response, nombre de requêtes, requêtes exécutées plusieurs
+        fois à l'identique)``.
+    """
+    # Toutes les connexions : les lectures peuvent passer par ``readonly``
+    with capture_queries() as queries:
+        response = client.get(path)
+    seen = set()
+    duplicates = []
+    for query in queries:
+        sql = query["sql"]
+        if sql.startswith(_IGNORED_DUPLICATES):
+            continue
+        if sql in seen and sql not in duplicates:
+            duplicates.append(sql)
+        seen.add(sql)
+    return response, len(queries), duplicates
@@ -0,0 +1,78 @@
+"""
+Moteur de sessions en base à expiration glissante « paresseuse ».
+
+Avec ``SESSION_SAVE_EVERY_REQUEST``, chaque page vue par un utilisateur
+connecté réécrivait sa ligne ``django_session`` (un ``UPDATE`` par requête
+dans le même fichier SQLite que le contenu, qui sérialise les écritures).
+
+Ce moteur (``SESSION_ENGINE = "app.sessions"``) conserve le stockage en
+base (pas de cache partagé sur l'hébergement) mais ne réécrit la session
+que si ses données changent ou si son expiration a plus de
+``SESSION_REFRESH_INTERVAL`` secondes de retard sur une expiration
+fraîche : la session reste glissante, rafraîchie au plus une fois par jour.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore as DBSessionStore
+from django.utils import timezone
+
+DEFAULT_REFRESH_INTERVAL = 24 * 60 * 60
+CLEAR_BATCH_SIZE = 1000
+
+
+class SessionStore(DBSessionStore):
+    def _full_expiry_age(self, data):
+        """Durée de vie d'une session fraîche, ou None si l'échéance est fixe."""
+        expiry = data.get("_session_expiry")
+        if not expiry:
+            return settings.SESSION_COOKIE_AGE
+        if isinstance(expiry, int):
+            return expiry
+        # Date d'expiration absolue : rien à faire glisser
+        return None
+
+    def load(self):
+        session = self._get_session_from_db()
+        if session is None:
+            return {}
+        data = self.decode(session.session_data)
+        full_age = self._full_expiry_age(data)
+        if full_age is not None:
+            interval = getattr(
+                settings, "SESSION_REFRESH_INTERVAL", DEFAULT_REFRESH_INTERVAL
+            )
+            fresh_expiry = timezone.now() + timedelta(seconds=full_age)
+            if fresh_expiry - session.expire_date > timedelta(seconds=interval):
+                # SessionMiddleware réenregistre la session et renvoie le cookie
+                self.modified = True
+        return data
+
+    @classmethod
+    def clear_expired(cls, batch_size=CLEAR_BATCH_SIZE, deadline=None):
+        """
+        Supprime les sessions expirées par lots de ``batch_size``.
+
+        Chaque lot est une transaction courte : les requêtes concurrentes
+        n'attendent jamais la purge complète. S'arrête (lot en cours
+        terminé) lorsque ``time.monotonic()`` dépasse ``deadline``.
+        Utilisé par ``clearsessions`` et la commande ``maintenance``.
+
+        Returns:
+            le nombre de sessions supprimées.
+        """
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+        while deadline is None or time.monotonic() < deadline:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list(
+                    "session_key", flat=True
+                )[:batch_size]
+            )
+            if not keys:
+                break
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+        return deleted
@@ -61,9 +61,9 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    "watson.middleware.SearchContextMiddleware",
     "csp.middleware.CSPMiddleware",
     "analytics.middleware.PageTrackingMiddleware",
+    "analytics.middleware.ProfilingMiddleware",
 ]
 
 APPEND_SLASH = True
@@ -98,9 +98,31 @@ DATABASES = {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
         "CONN_MAX_AGE": env.int("CONN_MAX_AGE", default=300),
+        "OPTIONS": {
+            # Verrou d'écriture pris dès BEGIN : pas d'échec « database is
+            # locked » lors de la promotion d'une lecture en écriture
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# Pragmas appliqués à chaque connexion SQLite (WAL, synchronous=NORMAL,
+# busy_timeout, mmap, cache...) : valeurs par défaut dans ``app/database.py``,
+# surchargeables ici, par ex. {"mmap_size": 0}.
+SQLITE_PRAGMAS = {}
+
+# Alias ``readonly`` (même fichier, ``query_only``) recevant les lectures
+# hors transaction via ``ReadReplicaRouter`` ; désactivé par défaut.
+SQLITE_READ_ALIAS = env.bool("SQLITE_READ_ALIAS", default=False)
+if SQLITE_READ_ALIAS:
+    DATABASES["readonly"] = {
+        **DATABASES["default"],
+        "OPTIONS": {},
+        # Les tests partagent la connexion de ``default``
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_ROUTERS = ["app.database.ReadReplicaRouter"]
+
 # Paramètres de sécurité recommandés pour la production
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 SECURE_SSL_REDIRECT = env("SECURE_SSL_REDIRECT", default=not DEBUG)  # Force HTTPS
@@ -192,6 +214,65 @@ STATICFILES_FINDERS = [
 
 MEDIA_ROOT = BASE_DIR / "media"
 MEDIA_URL = "/media/"
+
+# Service des médias en production (``app.media.serve_media``).
+# Si un proxy frontal sait servir les fichiers, renseigner l'en-tête de
+# délégation : "X-Accel-Redirect" (nginx, avec un ``location internal``
+# sur MEDIA_ACCEL_REDIRECT_PREFIX) ou "X-Sendfile" (Apache/LiteSpeed).
+# Vide : le worker Python sert lui-même le fichier (Range + 304 gérés).
+MEDIA_SENDFILE_HEADER = env("MEDIA_SENDFILE_HEADER", default="")
+MEDIA_ACCEL_REDIRECT_PREFIX = env(
+    "MEDIA_ACCEL_REDIRECT_PREFIX", default="/protected-media/"
+)
+# Les noms de médias ne sont pas hachés : cache court, revalidé par ETag
+MEDIA_CACHE_MAX_AGE = env.int("MEDIA_CACHE_MAX_AGE", default=3600)
+
+# Aperçus des PDF (``app.pdf_previews``) : rendu dans un thread de fond
+# après l'upload. Désactivé en test ; la commande ``generate_pdf_previews``
+# (cron) rattrape de toute façon les aperçus manquants.
+PDF_PREVIEW_BACKGROUND = env.bool("PDF_PREVIEW_BACKGROUND", default=not TESTING)
+
+# Singletons de configuration et ``PageStatus`` mémorisés par processus
+# (``app.models.cached_model_value``), invalidés à chaque enregistrement.
+# Désactivé en test : les rollbacks de TestCase ne déclenchent aucun signal.
+MODEL_CACHE = env.bool("MODEL_CACHE", default=not TESTING)
+
+# Cache des résultats de recherche publique (``search.result_cache``).
+# Désactivé en test : les résultats d'un test ne doivent pas fuiter dans
+# le suivant (le LRU en mémoire survit à ``cache.clear()``).
+SEARCH_RESULT_CACHE = env.bool("SEARCH_RESULT_CACHE", default=not TESTING)
+
+# Grilles des pages conseil, commissions et élus mises en cache sans
+# expiration, sous une clé versionnée en base (``{% cachedcontent %}``).
+# Désactivé en test : les rollbacks de TestCase annulent les versions
+# mais pas le cache.
+CONTENT_FRAGMENT_CACHE = env.bool("CONTENT_FRAGMENT_CACHE", default=not TESTING)
+
+# ETag/Last-Modified et réponses 304 des pages publiques sans compte
+# (``app.conditional.conditional_page``), à partir des mêmes versions.
+CONDITIONAL_PAGES = env.bool("CONDITIONAL_PAGES", default=True)
+# Identifiant du déploiement (commit, numéro de build) ajouté aux ETag ; à
+# défaut, l'empreinte du manifeste des fichiers statiques (``collectstatic``)
+DEPLOY_ID = env("DEPLOY_ID", default="")
+
+# Profilage SQL/templates/cache par vue (``analytics.profiling``) : fraction
+# des requêtes profilées (0 : aucune, sauf staff avec l'en-tête X-Profile: 1)
+PROFILING_SAMPLE_RATE = env.float("PROFILING_SAMPLE_RATE", default=0.0)
+PROFILING_RETENTION_DAYS = env.int("PROFILING_RETENTION_DAYS", default=14)
+
+# Index de recherche mis à jour par lots après commit (``search.index_queue``)
+# plutôt qu'à chaque ``save()``. Désactivé en test : les transactions des
+# ``TestCase`` ne sont jamais validées, l'index ne serait jamais à jour.
+SEARCH_DEFERRED_INDEX = env.bool("SEARCH_DEFERRED_INDEX", default=not TESTING)
+
+# Préchauffage de chaque worker après son démarrage (``app.warmup``) : URLconf,
+# templates, caches, GeoIP et les pages les plus vues, dans un thread de fond.
+# Désactivé en test : aucun serveur WSGI n'est démarré.
+WARMUP_ON_START = env.bool("WARMUP_ON_START", default=not TESTING)
+WARMUP_TOP_PAGES = env.int("WARMUP_TOP_PAGES", default=10)
+# Recherches les plus fréquentes (30 derniers jours) gardées en cache sans
+# expiration dans chaque worker (``search.result_cache.pin_popular``)
+WARMUP_TOP_QUERIES = env.int("WARMUP_TOP_QUERIES", default=50)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 60 * 1024 * 1024  # 60 Mo
 
 # Sessions persistantes en base de données.
@@ -199,16 +280,25 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = 60 * 1024 * 1024  # 60 Mo
 # mutualisé (o2switch) ne fournit ni Redis ni memcached. Le cache LRU
 # par processus (``LocMemCache``) ne partage pas les sessions entre
 # workers, ce qui provoque des déconnexions aléatoires.
-SESSION_ENGINE = "django.contrib.sessions.backends.db"
+#
+# ``app.sessions`` : même stockage que ``backends.db``, mais la ligne n'est
+# réécrite que si les données changent ou, pour l'expiration glissante,
+# au plus une fois par ``SESSION_REFRESH_INTERVAL``.
+SESSION_ENGINE = "app.sessions"
+SESSION_REFRESH_INTERVAL = 24 * 60 * 60  # 1 jour
 
 # Durée de session : 30 jours par défaut, étendue par ``set_expiry`` dans
 # la vue de connexion lorsque la case « Se souvenir de moi » est cochée.
 SESSION_COOKIE_AGE = 30 * 24 * 60 * 60  # 30 jours
 
-# Session glissante : l'expiration est repoussée à chaque requête tant
-# que l'utilisateur reste actif. Sans ce flag, un utilisateur actif
-# serait déconnecté au bout de 30 jours sans nouvelle connexion.
-SESSION_SAVE_EVERY_REQUEST = True
+# Session glissante : l'expiration est repoussée tant que l'utilisateur
+# reste actif, par ``app.sessions`` (une écriture par jour au plus) et non
+# plus par une sauvegarde à chaque requête.
+SESSION_SAVE_EVERY_REQUEST = False
+
+# Messages flash en cookie : aucune session n'est créée pour un visiteur
+# anonyme qui reçoit un message (repli en session de ``FallbackStorage``).
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
 
 # Configuration des backups
 BACKUP_ROOT = env("BACKUP_ROOT", default=os.path.join(BASE_DIR, "backups"))
@@ -257,7 +347,16 @@ HANDLER404 = "home.views.custom_handler404"
 HANDLER500 = "home.views.custom_handler500"
 
 
-EMAIL_BACKEND = env("EMAIL_BACKEND")
+# Backend d'envoi réel (SMTP). Avec EMAIL_OUTBOX, les vues n'y accèdent
+# plus : les e-mails sont enregistrés en base (``contact.OutgoingEmail``)
+# puis envoyés par lots par un thread de fond (EMAIL_OUTBOX_WORKER) et
+# par ``python manage.py send_queued_mail`` (cron).
+EMAIL_DELIVERY_BACKEND = env("EMAIL_BACKEND")
+EMAIL_OUTBOX = env.bool("EMAIL_OUTBOX", default=True)
+EMAIL_BACKEND = (
+    "contact.outbox.OutboxEmailBackend" if EMAIL_OUTBOX else EMAIL_DELIVERY_BACKEND
+)
+EMAIL_OUTBOX_WORKER = env.bool("EMAIL_OUTBOX_WORKER", default=not TESTING)
 EMAIL_HOST = env("EMAIL_HOST", default="smtp.gmail.com")
 EMAIL_PORT = env.int("EMAIL_PORT", default=587)
 EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=False)
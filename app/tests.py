@@ -1,8 +1,34 @@
 """Tests pour les utilitaires partages de l'app ``app``."""
 
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
 from django.http import HttpRequest
-from django.test import SimpleTestCase, override_settings
+from django.test import (
+    Client,
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
 
+from analytics import analytics_data
+from app import database, images, pdf_previews, query_budgets, warmup
 from app.utils import (
     _is_within_media,
     get_client_ip,
@@ -11,6 +37,10 @@ from app.utils import (
     rate_limit,
     remove_accents,
 )
+from benchmarks import fixtures
+from conseil_communautaire.models import ConseilVille
+from home import views as home_views
+from home.content_versions import get_versions
 
 
 class GetClientIpTests(SimpleTestCase):
@@ -64,7 +94,9 @@ class HashIpTests(SimpleTestCase):
 
     def test_custom_salt(self):
         with override_settings(SECRET_KEY="other"):
-            self.assertNotEqual(hash_ip("1.2.3.4", salt="a"), hash_ip("1.2.3.4", salt="b"))
+            self.assertNotEqual(
+                hash_ip("1.2.3.4", salt="a"), hash_ip("1.2.3.4", salt="b")
+            )
 
 
 class NormalizeFilenameTests(SimpleTestCase):
@@ -152,3 +184,836 @@ class RateLimitTests(SimpleTestCase):
         # IP differente doit passer
         allowed, _, _ = rate_limit(self._req(ip="2.2.2.2"), "shared", 5, 60)
         self.assertTrue(allowed)
+
+
+class ResponsiveImagesTests(SimpleTestCase):
+    """Variantes WebP/AVIF générées pour les images téléversées."""
+
+    def setUp(self):
+        import tempfile
+
+        from PIL import Image
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        os.makedirs(os.path.join(self.media_root, "MSA", "couvertures"))
+        Image.new("RGB", (800, 600), "blue").save(
+            os.path.join(self.media_root, "MSA", "couvertures", "cover.png")
+        )
+        self.field_file = _StubFieldFile(self.media_root, "MSA/couvertures/cover.png")
+        images.clear_cache()
+
+    def tearDown(self):
+        import shutil
+
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        images.clear_cache()
+
+    def test_generates_webp_variants_without_upscaling(self):
+        variants = images.generate_derivatives(self.field_file)
+        self.assertEqual(
+            variants["webp"],
+            [
+                (320, "derives/MSA/couvertures/cover-320w.webp"),
+                (640, "derives/MSA/couvertures/cover-640w.webp"),
+            ],
+        )
+        path = os.path.join(self.media_root, "derives/MSA/couvertures/cover-320w.webp")
+        self.assertTrue(os.path.exists(path))
+
+    def test_up_to_date_variants_are_not_rewritten(self):
+        images.generate_derivatives(self.field_file)
+        path = os.path.join(self.media_root, "derives/MSA/couvertures/cover-640w.webp")
+        mtime = os.path.getmtime(path)
+        images.generate_derivatives(self.field_file)
+        self.assertEqual(os.path.getmtime(path), mtime)
+
+    def test_build_srcset(self):
+        images.generate_derivatives(self.field_file)
+        srcset = images.build_srcset(self.field_file, "webp")
+        self.assertEqual(
+            srcset,
+            "/media/derives/MSA/couvertures/cover-320w.webp 320w, "
+            "/media/derives/MSA/couvertures/cover-640w.webp 640w, "
+            "/media/MSA/couvertures/cover.png 800w",
+        )
+
+    def test_render_does_not_generate(self):
+        self.assertEqual(images.build_srcset(self.field_file, "webp"), "")
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, "derives")))
+
+    def test_missing_variants_are_rechecked(self):
+        self.assertEqual(images.get_derivatives(self.field_file), {})
+        # Génération par un autre processus : le cache de celui-ci n'est pas vidé
+        images._generate(self.field_file.name, self.field_file.path)
+        self.assertEqual(images.get_derivatives(self.field_file), {})
+        later = time.monotonic() + images.RECHECK_SECONDS + 1
+        with patch("app.images.time.monotonic", return_value=later):
+            self.assertEqual(len(images.get_derivatives(self.field_file)["webp"]), 2)
+
+    def test_replaced_original_refreshes_variants(self):
+        from PIL import Image
+
+        images.generate_derivatives(self.field_file)
+        self.assertIn("800w", images.build_srcset(self.field_file, "webp"))
+        # Variantes antérieures au nouvel original
+        past = time.time() - 60
+        for root, _dirs, files in os.walk(os.path.join(self.media_root, "derives")):
+            for filename in files:
+                os.utime(os.path.join(root, filename), (past, past))
+        Image.new("RGB", (1200, 900), "red").save(self.field_file.path)
+        # Variantes périmées : plus rien à proposer avant la régénération
+        self.assertEqual(images.build_srcset(self.field_file, "webp"), "")
+        images._generate(self.field_file.name, self.field_file.path)
+        images.clear_cache()
+        self.assertIn("1200w", images.build_srcset(self.field_file, "webp"))
+
+    def test_invalid_image_returns_empty(self):
+        with open(os.path.join(self.media_root, "broken.png"), "wb") as f:
+            f.write(b"not an image")
+        broken = _StubFieldFile(self.media_root, "broken.png")
+        self.assertEqual(images.generate_derivatives(broken), {})
+
+    def test_delete_derivatives(self):
+        images.generate_derivatives(self.field_file)
+        removed = images.delete_derivatives(self.field_file.name)
+        self.assertEqual(removed, 2 * len(images.get_available_formats()))
+        self.assertFalse(
+            os.path.exists(os.path.join(self.media_root, "derives/MSA/couvertures"))
+            and os.listdir(os.path.join(self.media_root, "derives/MSA/couvertures"))
+        )
+
+    def test_template_tag_renders_picture(self):
+        from django.template import Context, Template
+
+        images.generate_derivatives(self.field_file)
+        html = Template(
+            "{% load responsive_images %}"
+            '{% responsive_image image alt="Couverture" sizes="300px" %}'
+        ).render(Context({"image": self.field_file}))
+        self.assertIn('<picture style="display: contents">', html)
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('sizes="300px"', html)
+        self.assertIn(
+            '<img src="/media/MSA/couvertures/cover.png" alt="Couverture">', html
+        )
+
+    def test_template_tag_empty_field(self):
+        from django.template import Context, Template
+
+        html = Template(
+            "{% load responsive_images %}{% responsive_image image %}"
+        ).render(Context({"image": None}))
+        self.assertEqual(html, "")
+
+
+class ResponsiveImageSignalsTests(TestCase):
+    """Variantes des images enregistrées par les modèles."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        images.clear_cache()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        images.clear_cache()
+
+    def _png(self, name, color):
+        from io import BytesIO
+
+        from PIL import Image
+
+        buffer = BytesIO()
+        Image.new("RGB", (800, 600), color).save(buffer, format="PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def _variants(self, name):
+        return [
+            images._derivative_path(name, width, fmt)
+            for fmt in images.get_available_formats()
+            for width in (320, 640)
+        ]
+
+    def test_replaced_image_variants_are_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            city = ConseilVille.objects.create(
+                city_name="Féron",
+                mayor_first_name="A",
+                mayor_last_name="B",
+                address="1 rue",
+                postal_code="59610",
+                phone_number="0300000000",
+                nb_habitants=100,
+                image=self._png("feron.png", "blue"),
+            )
+        old_name = city.image.name
+        self.assertTrue(all(map(os.path.exists, self._variants(old_name))))
+        with self.captureOnCommitCallbacks(execute=True):
+            city.image = self._png("feron-2.png", "red")
+            city.save()
+        self.assertFalse(any(map(os.path.exists, self._variants(old_name))))
+        self.assertTrue(all(map(os.path.exists, self._variants(city.image.name))))
+
+    def test_backfill_bumps_processed_models(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            ConseilVille.objects.create(
+                city_name="Féron",
+                mayor_first_name="A",
+                mayor_last_name="B",
+                address="1 rue",
+                postal_code="59610",
+                phone_number="0300000000",
+                nb_habitants=100,
+                image=self._png("feron.png", "blue"),
+            )
+        label = "conseil_communautaire.conseilville"
+        before = get_versions([label, "journal.journal"])
+        call_command("generate_responsive_images", force=True, stdout=StringIO())
+        after = get_versions([label, "journal.journal"])
+        self.assertNotEqual(after[label], before[label])
+        # Aucun journal : version inchangée
+        self.assertEqual(after["journal.journal"], before["journal.journal"])
+
+
+class _StubFieldFile:
+    """FieldFile minimal (name/path/url) pour tester sans modèle."""
+
+    def __init__(self, media_root, name):
+        self.name = name
+        self.path = os.path.join(media_root, *name.split("/"))
+        self.url = f"/media/{name}"
+
+    def __bool__(self):
+        return bool(self.name)
+
+
+class ServeMediaTests(SimpleTestCase):
+    """Service des médias : Range, requêtes conditionnelles, délégation proxy."""
+
+    def setUp(self):
+        import tempfile
+
+        from django.test import RequestFactory
+
+        self.factory = RequestFactory()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(
+            MEDIA_ROOT=self.media_root, MEDIA_SENDFILE_HEADER=""
+        )
+        self.override.enable()
+        os.makedirs(os.path.join(self.media_root, "MSA", "documents"))
+        self.content = bytes(range(256)) * 4
+        with open(
+            os.path.join(self.media_root, "MSA", "documents", "j.pdf"), "wb"
+        ) as f:
+            f.write(self.content)
+
+    def tearDown(self):
+        import shutil
+
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _get(self, path="MSA/documents/j.pdf", **headers):
+        from app.media import serve_media
+
+        return serve_media(self.factory.get(f"/media/{path}", **headers), path)
+
+    def test_full_response(self):
+        response = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), self.content)
+
+    def test_range_request(self):
+        response = self._get(HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/1024")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), self.content[10:20])
+
+    def test_suffix_range(self):
+        response = self._get(HTTP_RANGE="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.content[-4:])
+
+    def test_unsatisfiable_range(self):
+        response = self._get(HTTP_RANGE="bytes=5000-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_if_range_mismatch_returns_full_file(self):
+        response = self._get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_if_none_match_returns_304(self):
+        etag = self._get()["ETag"]
+        response = self._get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self._get()["Last-Modified"]
+        response = self._get(HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_traversal_and_missing_raise_404(self):
+        from django.http import Http404
+
+        with self.assertRaises(Http404):
+            self._get("../etc/passwd")
+        with self.assertRaises(Http404):
+            self._get("MSA/documents/absent.pdf")
+        with self.assertRaises(Http404):
+            self._get("MSA/documents")
+
+    def test_precompressed_sidecar(self):
+        svg = os.path.join(self.media_root, "logo.svg")
+        with open(svg, "w") as f:
+            f.write("<svg></svg>")
+        with open(svg + ".gz", "wb") as f:
+            f.write(b"gzipped")
+        response = self._get("logo.svg", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(b"".join(response.streaming_content), b"gzipped")
+        plain = self._get("logo.svg")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertNotEqual(plain["ETag"], response["ETag"])
+
+    def test_x_accel_redirect(self):
+        with override_settings(
+            MEDIA_SENDFILE_HEADER="X-Accel-Redirect",
+            MEDIA_ACCEL_REDIRECT_PREFIX="/protected-media/",
+        ):
+            response = self._get()
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/MSA/documents/j.pdf"
+        )
+        self.assertEqual(response.content, b"")
+
+
+def _fitz_available():
+    try:
+        import fitz  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@skipUnless(_fitz_available(), "PyMuPDF non installé")
+class PdfPreviewTests(SimpleTestCase):
+    """Aperçu de première page et nombre de pages des PDF."""
+
+    def setUp(self):
+        import tempfile
+
+        from reportlab.pdfgen import canvas
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        os.makedirs(os.path.join(self.media_root, "MSA", "documents"))
+        self.name = "MSA/documents/journal.pdf"
+        self.path = os.path.join(self.media_root, "MSA", "documents", "journal.pdf")
+        pdf = canvas.Canvas(self.path)
+        for page in range(3):
+            pdf.drawString(100, 750, f"Page {page + 1}")
+            pdf.showPage()
+        pdf.save()
+        pdf_previews.clear_cache()
+
+    def tearDown(self):
+        import shutil
+
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        pdf_previews.clear_cache()
+
+    def test_render_preview_writes_webp_and_metadata(self):
+        metadata = pdf_previews.render_preview(self.name, self.path)
+        self.assertEqual(metadata["page_count"], 3)
+        self.assertEqual(metadata["width"], pdf_previews.PREVIEW_WIDTH)
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(
+                    self.media_root, "derives/MSA/documents/journal-preview.webp"
+                )
+            )
+        )
+
+    def test_get_preview_is_read_only(self):
+        field_file = _StubFieldFile(self.media_root, self.name)
+        self.assertIsNone(pdf_previews.get_preview(field_file))
+        pdf_previews.render_preview(self.name, self.path)
+        preview = pdf_previews.get_preview(field_file)
+        self.assertEqual(preview["page_count"], 3)
+        self.assertEqual(
+            preview["url"], "/media/derives/MSA/documents/journal-preview.webp"
+        )
+
+    def test_missing_preview_does_not_evict_others(self):
+        pdf_previews.render_preview(self.name, self.path)
+        pdf_previews.clear_cache()
+        with_preview = _StubFieldFile(self.media_root, self.name)
+        pending = _StubFieldFile(self.media_root, "MSA/documents/nouveau.pdf")
+        with patch.object(
+            pdf_previews, "_read_metadata", wraps=pdf_previews._read_metadata
+        ) as read:
+            # Trois rendus d'une liste : un PDF avec aperçu, un en attente
+            for _ in range(3):
+                self.assertEqual(
+                    pdf_previews.get_preview(with_preview)["page_count"], 3
+                )
+                self.assertIsNone(pdf_previews.get_preview(pending))
+        reads = [call.args[0] for call in read.call_args_list]
+        self.assertEqual(reads.count(self.name), 1)
+        self.assertEqual(reads.count(pending.name), 3)
+
+    def test_delete_preview_removes_files_and_memo(self):
+        field_file = _StubFieldFile(self.media_root, self.name)
+        pdf_previews.render_preview(self.name, self.path)
+        self.assertIsNotNone(pdf_previews.get_preview(field_file))
+        self.assertEqual(pdf_previews.delete_preview(self.name), 2)
+        self.assertIsNone(pdf_previews.get_preview(field_file))
+
+    def test_non_pdf_and_invalid_files_are_ignored(self):
+        self.assertIsNone(pdf_previews.render_preview("doc.docx", self.path))
+        broken = os.path.join(self.media_root, "broken.pdf")
+        with open(broken, "wb") as f:
+            f.write(b"not a pdf")
+        self.assertIsNone(pdf_previews.render_preview("broken.pdf", broken))
+
+    def test_process_instance_fills_page_number(self):
+        from unittest.mock import MagicMock
+
+        class FakeJournal:
+            objects = MagicMock()
+
+        instance = FakeJournal()
+        instance.pk = 1
+        instance.document = _StubFieldFile(self.media_root, self.name)
+        instance.page_number = 0
+        pdf_previews.process_instance(instance, "document")
+        self.assertEqual(instance.page_number, 3)
+        FakeJournal.objects.filter.return_value.update.assert_called_once_with(
+            page_number=3
+        )
+
+
+class SQLiteTuningTests(TestCase):
+    """Pragmas appliqués aux connexions et routage vers l'alias de lecture."""
+
+    def _pragma(self, name):
+        from django.db import connection
+
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied_on_connection(self):
+        # Appliqués par le signal connection_created à l'ouverture
+        self.assertEqual(self._pragma("busy_timeout"), 5000)
+        self.assertEqual(self._pragma("synchronous"), 1)  # NORMAL
+        self.assertEqual(self._pragma("temp_store"), 2)  # MEMORY
+
+    def test_settings_override_and_read_alias_pragmas(self):
+        with override_settings(SQLITE_PRAGMAS={"busy_timeout": 100}):
+            self.assertEqual(database.get_pragmas()["busy_timeout"], 100)
+        readonly = database.get_pragmas(database.READ_ALIAS)
+        self.assertNotIn("journal_mode", readonly)
+        self.assertEqual(readonly["query_only"], 1)
+
+    def test_router_without_read_alias_defers_to_default(self):
+        router = database.ReadReplicaRouter()
+        self.assertIsNone(router.db_for_read(None))
+        self.assertEqual(router.db_for_write(None), "default")
+        self.assertFalse(router.allow_migrate(database.READ_ALIAS, "home"))
+
+    def test_router_reads_from_alias_outside_transactions(self):
+        from django.conf import settings
+
+        router = database.ReadReplicaRouter()
+        with patch.dict(settings.DATABASES, {database.READ_ALIAS: {}}):
+            # TestCase enveloppe chaque test dans un bloc atomic
+            self.assertEqual(router.db_for_read(None), "default")
+            with patch("app.database.connections") as connections:
+                connections.__getitem__.return_value.in_atomic_block = False
+                self.assertEqual(router.db_for_read(None), database.READ_ALIAS)
+
+
+class BenchmarkSQLiteCommandTests(SimpleTestCase):
+    def test_reports_both_modes(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("benchmark_sqlite", workers=[2], duration=0.2, rows=50, stdout=out)
+        output = out.getvalue()
+        self.assertIn("défaut", output)
+        self.assertIn("optimisé", output)
+
+
+class MediaOrphansTests(TestCase):
+    """Détection des médias non référencés en un seul parcours."""
+
+    def setUp(self):
+        import tempfile
+
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        old = 0  # mtime au 1er janvier 1970 : au-delà de tout âge minimal
+        for name in (
+            "rapports_activite/rapports/rapport.pdf",
+            "rapports_activite/rapports/ancien.pdf",
+            "derives/rapports_activite/rapports/rapport-preview.webp",
+            "derives/rapports_activite/rapports/ancien-640w.webp",
+            "recent.pdf",
+        ):
+            path = os.path.join(self.media_root, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(b"x" * 10)
+            if name != "recent.pdf":
+                os.utime(path, (old, old))
+
+        from rapports_activite.models import RapportActivite
+
+        RapportActivite.objects.create(
+            year=2024, file="rapports_activite/rapports/rapport.pdf"
+        )
+
+    def tearDown(self):
+        import shutil
+
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def test_find_orphans_skips_referenced_derivatives_and_recent(self):
+        from app import media_orphans
+
+        orphans = sorted(media_orphans.find_orphans())
+        self.assertEqual(
+            orphans,
+            [
+                ("derives/rapports_activite/rapports/ancien-640w.webp", 10),
+                ("rapports_activite/rapports/ancien.pdf", 10),
+            ],
+        )
+
+    def test_command_is_dry_run_unless_delete(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("find_orphan_media", stdout=out)
+        self.assertIn("2 médias orphelins", out.getvalue())
+        orphan = os.path.join(
+            self.media_root, "rapports_activite", "rapports", "ancien.pdf"
+        )
+        self.assertTrue(os.path.exists(orphan))
+
+        call_command("find_orphan_media", delete=True, stdout=out)
+        self.assertFalse(os.path.exists(orphan))
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(
+                    self.media_root, "rapports_activite", "rapports", "rapport.pdf"
+                )
+            )
+        )
+
+
+@override_settings(MODEL_CACHE=True)
+class ModelCacheTests(TestCase):
+    """Singletons et ``PageStatus`` lus sans requête jusqu'à leur modification."""
+
+    def setUp(self):
+        from django.core.cache import cache
+
+        from app import models as app_models
+
+        cache.clear()
+        app_models._local_model_cache.clear()
+        self.addCleanup(app_models._local_model_cache.clear)
+
+    def test_singleton_cached_until_saved(self):
+        from home.models import PLUISettings
+
+        with self.assertNumQueries(1):
+            self.assertIsNone(PLUISettings.get_cached())
+            self.assertIsNone(PLUISettings.get_cached())
+
+        settings_obj = PLUISettings.load()
+        settings_obj.modification_simplifiee_1_visible = True
+        settings_obj.save()
+        with self.assertNumQueries(1):
+            self.assertTrue(PLUISettings.get_cached().modification_simplifiee_1_visible)
+            PLUISettings.get_cached()
+
+    def test_version_change_from_another_process_reloads(self):
+        from django.core.cache import cache
+
+        from app.models import _model_version_key
+        from home.models import PLUISettings
+
+        PLUISettings.get_cached()
+        # Un autre worker a enregistré le singleton
+        cache.set(_model_version_key(PLUISettings), "autre-version", None)
+        with self.assertNumQueries(1):
+            PLUISettings.get_cached()
+
+    def test_page_status_cached_and_invalidated(self):
+        from bureau_communautaire.models import PageStatus
+
+        with self.assertNumQueries(1):
+            self.assertTrue(PageStatus.is_page_active("commissions")[0])
+            self.assertTrue(PageStatus.is_page_active("bureau-communautaire")[0])
+
+        PageStatus.objects.create(
+            page_name="commissions", is_active=False, maintenance_message="Travaux"
+        )
+        self.assertEqual(PageStatus.is_page_active("commissions"), (False, "Travaux"))
+
+
+class ConditionalPageTests(TestCase):
+    """ETag / Last-Modified des pages publiques (``app.conditional``)."""
+
+    def setUp(self):
+        from django.urls import reverse
+
+        self.url = reverse("linktree:linktree_page")
+
+    def test_repeat_visit_gets_304_until_content_changes(self):
+        from linktree.models import Lien
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+        Lien.objects.create(titre="Facebook", url="https://facebook.com/ccsa")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, "Facebook")
+
+    def test_personalised_pages_are_not_conditional(self):
+        from django.contrib.auth import get_user_model
+
+        self.client.cookies["messages"] = "x"
+        self.assertNotIn("ETag", self.client.get(self.url))
+
+        del self.client.cookies["messages"]
+        user = get_user_model().objects.create_user("agent@example.com", password="x")
+        self.client.force_login(user)
+        self.assertNotIn("ETag", self.client.get(self.url))
+
+    @override_settings(CONDITIONAL_PAGES=False)
+    def test_setting_disables_etag(self):
+        self.assertNotIn("ETag", self.client.get(self.url))
+
+    def test_city_menu_matches_etag_version(self):
+        from django.core.cache import cache
+        from django.urls import reverse
+
+        from app.context_processors import ALL_CITIES_KEY
+        from conseil_communautaire.models import ConseilVille
+        from home import content_versions
+
+        city = ConseilVille.objects.create(
+            city_name="Avesnes", slug="avesnes", nb_habitants=100
+        )
+        # Page avec le menu des communes (la page des liens n'en a pas)
+        url = reverse("competences:competences")
+        etag = self.client.get(url)["ETag"]
+        # Autre worker : la commune change sans toucher au cache de ce processus
+        cached = cache.get(ALL_CITIES_KEY)
+        ConseilVille.objects.filter(pk=city.pk).update(city_name="Avesnelles")
+        content_versions.bump(ConseilVille)
+        cache.set(ALL_CITIES_KEY, cached, 300)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Avesnelles")
+
+    def test_city_change_invalidates_menu(self):
+        from django.core.cache import cache
+
+        from app.context_processors import ALL_CITIES_KEY, get_all_cities
+        from conseil_communautaire.models import ConseilVille
+
+        get_all_cities()
+        ConseilVille.objects.create(
+            city_name="Avesnes", slug="avesnes", nb_habitants=100
+        )
+        self.assertIsNone(cache.get(ALL_CITIES_KEY))
+        self.assertEqual([city.slug for city in get_all_cities()], ["avesnes"])
+
+    def test_deploy_id_changes_etag(self):
+        from app import conditional
+
+        etag = self.client.get(self.url)["ETag"]
+        conditional.deploy_token.cache_clear()
+        try:
+            with override_settings(DEPLOY_ID="build-2"):
+                self.assertNotEqual(self.client.get(self.url)["ETag"], etag)
+        finally:
+            conditional.deploy_token.cache_clear()
+
+
+class QueryBudgetTests(TestCase):
+    """Budgets de requêtes SQL des pages (``app.query_budgets``)."""
+
+    @classmethod
+    def setUpTestData(cls):
+        fixtures.seed_database(
+            dict(
+                fixtures.DEFAULT_VOLUMES,
+                communes=4,
+                membres_par_commune=3,
+                elus=4,
+                commissions=3,
+                competences=4,
+                journaux=4,
+                partenaires=4,
+            )
+        )
+        cls.admin = get_user_model().objects.create_superuser("budget@example.com", "x")
+
+    def test_pages_within_budget(self):
+        admin_client = Client()
+        admin_client.force_login(self.admin)
+        for name, _ in query_budgets.iter_pages():
+            with self.subTest(url=name):
+                self.assertIn(name, query_budgets.QUERY_BUDGETS, "Budget non déclaré")
+                path = reverse(name, kwargs=query_budgets.url_kwargs(name))
+                client = (
+                    admin_client if query_budgets.is_admin_page(path) else self.client
+                )
+                # Pages en cache (cache_page, communes du menu) : mesure à froid
+                cache.clear()
+                response, count, duplicates = query_budgets.measure(client, path)
+                self.assertLess(response.status_code, 500)
+                self.assertLessEqual(count, query_budgets.QUERY_BUDGETS[name])
+                self.assertEqual(duplicates, [], "Requête SQL exécutée deux fois")
+
+    def test_no_stale_budget(self):
+        pages = {name for name, _ in query_budgets.iter_pages()}
+        self.assertEqual(set(query_budgets.QUERY_BUDGETS) - pages, set())
+
+    def test_duplicate_queries_detected(self):
+        class DuplicatingClient:
+            def get(self, path):
+                for _ in range(2):
+                    with connection.cursor() as cursor:
+                        cursor.execute("SELECT 1")
+                return RequestFactory().get(path)
+
+        _, count, duplicates = query_budgets.measure(DuplicatingClient(), "/")
+        self.assertEqual(count, 2)
+        self.assertEqual(duplicates, ["SELECT 1"])
+
+    def test_city_lists_follow_city_changes(self):
+        # Accueil et présentation lisent la liste des communes en cache
+        # (vues appelées sans leur ``cache_page``)
+        for view in (home_views.home, home_views.presentation):
+            with self.subTest(view=view.__name__):
+                view.__wrapped__(RequestFactory().get("/"))
+                city = ConseilVille.objects.order_by("pk").first()
+                city.city_name = f"Renommée {view.__name__}"
+                city.save()
+                response = view.__wrapped__(RequestFactory().get("/"))
+                self.assertContains(response, city.city_name)
+
+
+class WarmupTests(TestCase):
+    """Préchauffage des workers (``app.warmup``)."""
+
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        patcher = patch.object(analytics_data, "ANALYTICS_DIR", self.tmp)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        visits = (
+            [("/competences/", 200)] * 5
+            + [("/journal/", 200)] * 3
+            + [("/adminccsa/", 200)] * 9
+            + [("/wp-login.php", 200)] * 8
+            + [("/ancienne/page/", 200)] * 7
+            + [("/partenaires/", 404)] * 6
+            + [("/", 200)]
+        )
+        (self.tmp / f"{date.today().isoformat()}.jsonl").write_text(
+            "\n".join(
+                json.dumps({"url": url, "status": status}) for url, status in visits
+            ),
+            encoding="utf-8",
+        )
+        # Comme le client de test : la connexion de la transaction du test ne
+        # doit pas être fermée par les signaux de fin des requêtes internes
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def test_top_pages_keeps_public_pages_by_visits(self):
+        self.assertEqual(warmup.top_pages(10), ["/competences/", "/journal/", "/"])
+        self.assertEqual(warmup.top_pages(1), ["/competences/"])
+
+    def test_warm_up_runs_every_step(self):
+        cache.clear()
+        with patch("django.db.close_old_connections"):
+            durations = warmup.warm_up()
+        self.assertEqual([name for name, _ in warmup.STEPS], list(durations))
+        self.assertNotIn(None, durations.values())
+        self.assertIsNotNone(cache.get("all_cities"))
+
+    def test_pages_requested_through_wsgi_handler(self):
+        with (
+            override_settings(WARMUP_TOP_PAGES=2),
+            self.assertLogs("app.warmup", "DEBUG") as logs,
+            patch("django.test.Client", side_effect=AssertionError),
+        ):
+            warmup._warm_pages()
+        self.assertEqual(
+            [line.split(":", 2)[-1] for line in logs.output],
+            [
+                "Préchauffage de /competences/ : 200 OK",
+                "Préchauffage de /journal/ : 200 OK",
+            ],
+        )
+
+    def test_warmup_requests_are_marked(self):
+        factory = RequestFactory()
+        marked = factory.get("/", **{warmup.WARMUP_ENVIRON_KEY: True})
+        self.assertTrue(warmup.is_warmup_request(marked))
+        self.assertFalse(
+            warmup.is_warmup_request(factory.get("/", HTTP_APP_WARMUP="1"))
+        )
+
+    def test_start_once_per_process_when_enabled(self):
+        with (
+            patch.object(warmup, "_started", False),
+            patch("threading.Thread") as thread,
+        ):
+            with override_settings(WARMUP_ON_START=False):
+                self.assertFalse(warmup.start())
+            with override_settings(WARMUP_ON_START=True):
+                self.assertTrue(warmup.start())
+                self.assertFalse(warmup.start())
+        thread.return_value.start.assert_called_once()
@@ -4,8 +4,8 @@ from django.contrib import admin
 from django.contrib.sitemaps.views import sitemap
 from django.urls import include, path
 from django.views.generic import RedirectView, TemplateView
-from django.views.static import serve
 
+from app.media import serve_media
 from home.sitemaps import CommunesSitemap, JournalSitemap, StaticViewSitemap
 
 sitemaps = {
@@ -75,7 +75,13 @@ if settings.DEBUG:
 else:
     # En production :
     # - Les fichiers statiques sont servis par WhiteNoise (via WSGI)
-    # - Les fichiers médias sont servis par Django (en attendant la configuration nginx)
+    # - Les fichiers médias sont servis par ``serve_media`` (Range, 304,
+    #   délégation X-Accel-Redirect/X-Sendfile si MEDIA_SENDFILE_HEADER)
     urlpatterns += [
-        path("media/<path:path>", serve, {"document_root": settings.MEDIA_ROOT}),
+        path(
+            "media/<path:path>",
+            serve_media,
+            {"document_root": settings.MEDIA_ROOT},
+            name="serve_media",
+        ),
     ]
@@ -2,8 +2,6 @@
 
 from django.core.exceptions import ValidationError
 
-from PIL import Image, UnidentifiedImageError
-
 
 def validate_image_mime(value):
     """
@@ -14,6 +12,9 @@ def validate_image_mime(value):
     Cette validation ouvre le contenu avec Pillow pour s'assurer qu'il
     s'agit d'une vraie image (PNG, JPEG, WEBP, GIF, BMP, TIFF...).
     """
+    # Pillow importé au premier upload : hors du démarrage des workers
+    from PIL import Image, UnidentifiedImageError
+
     try:
         value.seek(0)
         with Image.open(value) as img:
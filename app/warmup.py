@@ -0,0 +1,230 @@
+"""
+Préchauffage d'un worker après son démarrage.
+
+Passenger (o2switch) lance et arrête souvent les workers ; chacun démarre
+avec un cache LocMem vide, des templates non compilés, un URLconf non
+chargé et un lecteur GeoIP fermé. Sans préchauffage, le premier visiteur
+de chaque worker paie tout cela. ``start()`` lance, dans un thread de
+fond, les étapes suivantes :
+
+1. ``urls`` : chargement de l'URLconf (import des vues) et de la table
+   de résolution inverse ;
+2. ``templates`` : compilation des templates communs à toutes les pages
+   (chargeur en cache hors DEBUG) ;
+3. ``caches`` : communes du menu, liste publique des communes, document
+   des commissions, statuts des pages ;
+4. ``geoip`` : ouverture de la base GeoLite2 ;
+5. ``search`` : les ``WARMUP_TOP_QUERIES`` recherches les plus fréquentes,
+   gardées en cache sans expiration et recalculées à chaque mise à jour de
+   l'index (``search.result_cache.pin_popular``) ;
+6. ``pages`` : requêtes internes vers les ``WARMUP_TOP_PAGES`` pages les
+   plus vues des 7 derniers jours (statistiques), qui remplissent aussi
+   les caches ``cache_page``.
+
+Les requêtes internes ne sont pas comptées dans les statistiques de
+visite. Elles passent par un ``WSGIHandler`` comme celles du serveur (pas
+par ``django.test.Client``, qui déconnecte ``close_old_connections`` et
+charge unittest). Lancé par ``app.wsgi`` dans chaque worker
+(``WARMUP_ON_START``) ; sous gunicorn, par le hook ``post_worker_init``
+(voir ``docs/deployment.md``).
+"""
+
+import io
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Clé WSGI marquant les requêtes internes : les en-têtes HTTP arrivent
+# préfixés par ``HTTP_``, un client ne peut donc pas la positionner
+WARMUP_ENVIRON_KEY = "app.warmup"
+
+COMMON_TEMPLATES = (
+    "base.html",
+    "header.html",
+    "footer.html",
+    "cookie_banner.html",
+    "404.html",
+)
+
+# Jours de statistiques lus pour choisir les pages à préchauffer
+TOP_PAGES_DAYS = 7
+
+_started = False
+_lock = threading.Lock()
+
+
+def _warm_urls():
+    from django.urls import get_resolver, reverse
+
+    resolver = get_resolver()
+    resolver.url_patterns
+    reverse("home")
+
+
+def _warm_templates():
+    from django.template.loader import get_template
+
+    for name in COMMON_TEMPLATES:
+        get_template(name)
+
+
+def _warm_caches():
+    from app.context_processors import get_all_cities
+    from bureau_communautaire.models import PageStatus
+    from commissions.models import Document
+    from communes_membres.services import CommuneListingService
+
+    get_all_cities()
+    CommuneListingService.get_communes_for_listing()
+    Document.get_cached()
+    PageStatus.is_page_active("commissions")
+
+
+def _warm_geoip():
+    from analytics import geo
+
+    geo._get_reader()
+
+
+def _warm_search():
+    from search import result_cache
+    from search.services import warm_popular_queries
+
+    result_cache.pin_popular(warm_popular_queries)
+
+
+def top_pages(limit, days=TOP_PAGES_DAYS):
+    """
+    Pages publiques les plus vues (réponse 200) des ``days`` derniers jours.
+
+    Les pages d'administration, les fichiers et les URL de robots sont
+    écartés, ainsi que les chemins qui ne résolvent plus.
+    """
+    from django.urls import Resolver404, resolve
+
+    from analytics.analytics_data import is_bot_url, load_range
+    from analytics.middleware import IGNORE_PREFIXES
+
+    end = date.today()
+    counts = Counter()
+    for entries in load_range(end - timedelta(days=days - 1), end).values():
+        for entry in entries:
+            url = entry.get("url") or ""
+            if entry.get("status") == 200 and url.startswith("/"):
+                counts[url] += 1
+
+    pages = []
+    for url, _ in counts.most_common():
+        if len(pages) >= limit:
+            break
+        if is_bot_url(url) or any(url.startswith(p) for p in IGNORE_PREFIXES):
+            continue
+        try:
+            resolve(url)
+        except Resolver404:
+            continue
+        pages.append(url)
+    return pages
+
+
+def _environ(host, url):
+    """Environnement WSGI minimal d'une requête GET interne en HTTPS."""
+    path, _, query = url.partition("?")
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "SCRIPT_NAME": "",
+        "SERVER_NAME": host,
+        "SERVER_PORT": "443",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "HTTP_HOST": host,
+        "REMOTE_ADDR": "127.0.0.1",
+        "wsgi.url_scheme": "https",
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0),
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        WARMUP_ENVIRON_KEY: True,
+    }
+
+
+def _warm_pages():
+    from django.core.handlers.wsgi import WSGIHandler
+
+    limit = getattr(settings, "WARMUP_TOP_PAGES", 10)
+    if limit <= 0:
+        return
+    # Même hôte et même schéma que les visiteurs : clés ``cache_page`` identiques
+    host = next(
+        (h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost"
+    )
+    handler = WSGIHandler()
+    statuses = []
+
+    def start_response(status, headers, exc_info=None):
+        statuses.append(status)
+
+    for url in top_pages(limit):
+        response = handler(_environ(host, url), start_response)
+        try:
+            for _chunk in response:
+                pass
+        finally:
+            response.close()
+        logger.debug("Préchauffage de %s : %s", url, statuses[-1])
+
+
+STEPS = (
+    ("urls", _warm_urls),
+    ("templates", _warm_templates),
+    ("caches", _warm_caches),
+    ("geoip", _warm_geoip),
+    ("search", _warm_search),
+    ("pages", _warm_pages),
+)
+
+
+def warm_up():
+    """Exécute toutes les étapes ; renvoie leurs durées en ms (``None`` : échec)."""
+    from django.db import close_old_connections
+
+    durations = {}
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+            durations[name] = round((time.perf_counter() - start) * 1000, 1)
+        except Exception:
+            logger.exception("Préchauffage : échec de l'étape %s", name)
+            durations[name] = None
+    close_old_connections()
+    logger.info("Worker préchauffé : %s", durations)
+    return durations
+
+
+def is_warmup_request(request):
+    """Vrai pour les requêtes internes du préchauffage."""
+    return bool(request.META.get(WARMUP_ENVIRON_KEY))
+
+
+def start():
+    """Lance le préchauffage en arrière-plan (une fois par processus, si activé)."""
+    global _started
+    if not getattr(settings, "WARMUP_ON_START", True):
+        return False
+    with _lock:
+        if _started:
+            return False
+        _started = True
+    threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+    return True
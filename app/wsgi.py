@@ -8,9 +8,18 @@ https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
 """
 
 import os
+import sys
 
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "app.settings")
 
 application = get_wsgi_application()
+
+# Préchauffage du worker (Passenger) en arrière-plan. Sous gunicorn, le
+# module peut être chargé dans le processus maître (``preload_app``) :
+# le hook ``post_worker_init`` s'en charge dans chaque worker.
+if "gunicorn" not in sys.modules:
+    from app import warmup
+
+    warmup.start()
@@ -22,6 +22,7 @@ from backup.utils import (
     get_backup_dir,
     get_stored_backups,
     send_backup_notification,
+    snapshot_database,
 )
 
 User = get_user_model()
@@ -74,6 +75,27 @@ class BackupUtilsTests(TestCase):
             self.assertTrue(result.exists())
             self.assertTrue(zipfile.is_zipfile(result))
 
+    def test_snapshot_database_includes_wal_transactions(self):
+        """La copie contient les transactions encore dans le fichier WAL."""
+        import sqlite3
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "db.sqlite3")
+            conn = sqlite3.connect(db_path)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA wal_autocheckpoint = 0")
+            conn.execute("CREATE TABLE t (v INTEGER)")
+            conn.execute("INSERT INTO t VALUES (42)")
+            conn.commit()
+
+            snapshot = os.path.join(temp_dir, "snapshot.sqlite3")
+            snapshot_database(db_path, snapshot)
+            conn.close()
+
+            copy = sqlite3.connect(snapshot)
+            self.assertEqual(copy.execute("SELECT v FROM t").fetchone(), (42,))
+            copy.close()
+
     def test_format_size(self):
         """Test le formatage des tailles."""
         self.assertEqual(format_size(512), "512.0 B")
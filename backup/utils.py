@@ -1,5 +1,7 @@
 import os
 import shutil
+import sqlite3
+import tempfile
 import zipfile
 from datetime import datetime
 from pathlib import Path
@@ -14,6 +16,23 @@ def get_backup_dir():
     return Path(settings.BACKUP_ROOT)
 
 
+def snapshot_database(db_path, target_path):
+    """
+    Copie cohérente de la base SQLite via l'API de sauvegarde.
+
+    En mode WAL, les dernières transactions peuvent résider dans
+    ``db.sqlite3-wal`` : copier le seul fichier principal donnerait une
+    sauvegarde incomplète.
+    """
+    source = sqlite3.connect(db_path)
+    target = sqlite3.connect(target_path)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
 def create_backup_zip(output_path=None):
     """
     Crée un backup ZIP contenant la BDD SQLite et le dossier media.
@@ -36,7 +55,10 @@ def create_backup_zip(output_path=None):
         # 1. Base de données SQLite
         db_path = settings.DATABASES['default']['NAME']
         if os.path.exists(db_path):
-            zipf.write(db_path, f'db/db.sqlite3')
+            with tempfile.TemporaryDirectory() as tmpdir:
+                snapshot = os.path.join(tmpdir, 'db.sqlite3')
+                snapshot_database(db_path, snapshot)
+                zipf.write(snapshot, 'db/db.sqlite3')
         
         # 2. Dossier media
         media_root = settings.MEDIA_ROOT
@@ -0,0 +1,12 @@
+"""
+Banc de mesure des chemins critiques (pages publiques, administration,
+exports, sauvegarde).
+
+    python manage.py run_benchmarks --output bench.json
+    python manage.py run_benchmarks --baseline bench.json --max-regression 20
+
+``fixtures`` remplit une base temporaire avec des volumes réalistes,
+``scenarios`` décrit les chemins mesurés et ``runner`` mesure latence,
+nombre de requêtes SQL et pic mémoire de chacun, puis compare au besoin
+le résultat JSON à une référence enregistrée.
+"""
@@ -0,0 +1,225 @@
+"""
+Données de mesure : volumes proches (ou au-delà) de la production.
+
+Les objets sont créés par ``bulk_create`` (sans signaux : ni index de
+recherche, ni images dérivées, ni versions de contenu), puis l'index de
+recherche est reconstruit en une fois. Les fichiers référencés
+(portraits, PDF...) n'existent pas sur le disque : les pages les traitent
+comme indisponibles, comme après une restauration partielle.
+"""
+
+import io
+import json
+import random
+from datetime import date, timedelta
+
+from django.core.management import call_command
+from django.db import transaction
+from django.utils.text import slugify
+
+DEFAULT_VOLUMES = {
+    "communes": 40,
+    "membres_par_commune": 8,
+    "elus": 15,
+    "commissions": 12,
+    "competences": 40,
+    "journaux": 2000,
+    "partenaires": 1500,
+    "analytics_jours": 365,
+    "analytics_par_jour": 300,
+}
+
+PAGES = (
+    "/",
+    "/conseil-communautaire/",
+    "/commissions/",
+    "/bureau-communautaire/",
+    "/journal/",
+    "/partenaires/",
+    "/competences/",
+    "/recherche/",
+    "/collecte/",
+)
+
+
+@transaction.atomic
+def seed_database(volumes, seed=0):
+    """Remplit la base (vide) ; renvoie le nombre d'objets créés par modèle."""
+    from bureau_communautaire.models import Elus
+    from commissions.models import Commission, CommissionCompetence, Mandat
+    from competences.models import Competence
+    from conseil_communautaire.models import ConseilMembre, ConseilVille
+    from journal.models import Journal
+    from partenaires.models import CategoriePartenaire, Partenaire
+
+    rng = random.Random(seed)
+    counts = {}
+
+    cities = ConseilVille.objects.bulk_create(
+        ConseilVille(
+            city_name=f"Commune {i:02d}",
+            slug=slugify(f"commune-{i:02d}"),
+            mayor_first_name="Prénom",
+            mayor_last_name=f"Maire {i}",
+            address=f"{i} place de la Mairie",
+            postal_code="59000",
+            phone_number="0327000000",
+            image=f"villes/commune-{i}.jpg",
+            nb_habitants=rng.randint(300, 15000),
+        )
+        for i in range(volumes["communes"])
+    )
+    counts["ConseilVille"] = len(cities)
+
+    commissions = Commission.objects.bulk_create(
+        Commission(title=f"Commission {i}", icon="<svg></svg>")
+        for i in range(volumes["commissions"])
+    )
+    CommissionCompetence.objects.bulk_create(
+        CommissionCompetence(commission=commission, title=f"Compétence {j}", order=j)
+        for commission in commissions
+        for j in range(4)
+    )
+    Mandat.objects.create(start_year=2020, end_year=2026)
+    counts["Commission"] = len(commissions)
+
+    members = ConseilMembre.objects.bulk_create(
+        ConseilMembre(
+            first_name=f"Prénom{i}",
+            last_name=f"NOM{i}",
+            city=city,
+            is_suppleant=i % 4 == 3,
+        )
+        for city in cities
+        for i in range(volumes["membres_par_commune"])
+    )
+    ConseilMembre.linked_commission.through.objects.bulk_create(
+        ConseilMembre.linked_commission.through(
+            conseilmembre_id=member.pk, commission_id=commission.pk
+        )
+        for member in members
+        for commission in rng.sample(commissions, min(2, len(commissions)))
+    )
+    counts["ConseilMembre"] = len(members)
+
+    elus = Elus.objects.bulk_create(
+        Elus(
+            first_name=f"Élu{i}",
+            last_name=f"NOM{i}",
+            rank=i,
+            role=Elus.Role.PRESIDENT if i == 0 else Elus.Role.VICE_PRESIDENT,
+            picture=f"bureau_commu/elus/elu-{i}.jpg",
+            city=cities[i % len(cities)],
+            function="Délégation",
+        )
+        for i in range(volumes["elus"] + 1)
+    )
+    Elus.linked_commission.through.objects.bulk_create(
+        Elus.linked_commission.through(elus_id=elu.pk, commission_id=commission.pk)
+        for elu in elus
+        for commission in rng.sample(commissions, min(2, len(commissions)))
+    )
+    counts["Elus"] = len(elus)
+
+    categories = Competence.Category.values
+    Competence.objects.bulk_create(
+        Competence(
+            title=f"Compétence {i}",
+            icon="<svg></svg>",
+            description="Description de la compétence. " * 5,
+            category=categories[i % len(categories)],
+        )
+        for i in range(volumes["competences"])
+    )
+    counts["Competence"] = volumes["competences"]
+
+    start = date(2000, 1, 1)
+    Journal.objects.bulk_create(
+        Journal(
+            title=f"Journal n°{i}",
+            document=f"MSA/documents/journal-{i}.pdf",
+            cover=f"MSA/couvertures/journal-{i}.jpg",
+            release_date=start + timedelta(days=7 * i),
+            number=i,
+        )
+        for i in range(1, volumes["journaux"] + 1)
+    )
+    counts["Journal"] = volumes["journaux"]
+
+    partner_categories = CategoriePartenaire.objects.bulk_create(
+        CategoriePartenaire(
+            nom=f"Catégorie {i}",
+            type_section="subvention" if i % 5 == 4 else "normal",
+            ordre=i,
+        )
+        for i in range(10)
+    )
+    Partenaire.objects.bulk_create(
+        Partenaire(
+            nom=f"Partenaire {i}",
+            categorie=rng.choice(partner_categories) if i % 10 else None,
+            description="Présentation du partenaire. " * 3,
+            site_web=f"https://partenaire-{i}.example.org",
+            ordre=i,
+        )
+        for i in range(volumes["partenaires"])
+    )
+    counts["Partenaire"] = volumes["partenaires"]
+
+    transaction.on_commit(
+        lambda: call_command("rebuild_search_index", verbosity=0, stdout=io.StringIO())
+    )
+    return counts
+
+
+def seed_analytics(directory, days, per_day, seed=0):
+    """Écrit ``days`` jours de statistiques JSONL ; renvoie le nombre de lignes."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    today = date.today()
+    devices = ("desktop", "mobile", "tablet")
+    regions = ("Hauts-de-France", "Île-de-France", "Grand Est")
+    total = 0
+    for offset in range(days):
+        day = today - timedelta(days=offset)
+        lines = []
+        for i in range(per_day):
+            visitor = rng.randrange(per_day * 3)
+            hour = i * 86400 // per_day // 3600
+            lines.append(
+                json.dumps(
+                    {
+                        "url": rng.choice(PAGES),
+                        "status": 404 if rng.random() < 0.02 else 200,
+                        "response_time_ms": rng.randint(20, 900),
+                        "ip": f"10.0.{visitor // 250}.{visitor % 250}",
+                        "ip_hash": f"h{visitor}",
+                        "session_key": f"s{visitor}",
+                        "visitor_id": f"v{visitor}",
+                        "user_id": None,
+                        "timestamp": f"{day.isoformat()}T{hour:02d}:"
+                        f"{rng.randrange(60):02d}:{rng.randrange(60):02d}",
+                        "referrer": rng.choice(("", "https://www.google.fr/")),
+                        "language": "fr-FR",
+                        "device": {
+                            "type": rng.choice(devices),
+                            "os": "Android",
+                            "browser": "Chrome",
+                            "brand": None,
+                        },
+                        "geo": {
+                            "country": "FR",
+                            "city": "Maubeuge",
+                            "region": rng.choice(regions),
+                            "lat": 50.28,
+                            "lon": 3.97,
+                        },
+                    },
+                    ensure_ascii=False,
+                )
+            )
+        (directory / f"{day.isoformat()}.jsonl").write_text(
+            "\n".join(lines) + "\n", encoding="utf-8"
+        )
+        total += len(lines)
+    return total
@@ -0,0 +1,124 @@
+"""
+Mesure des scénarios et comparaison à une référence.
+
+Pour chaque scénario : ``warmup`` exécutions non mesurées (templates
+compilés, caches remplis), puis ``iterations`` exécutions chronométrées
+(médiane, P95, minimum), puis une exécution instrumentée pour le nombre
+de requêtes SQL et le pic mémoire Python (``tracemalloc``), séparée pour
+ne pas fausser les temps.
+"""
+
+import platform
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+
+import django
+from django.core.cache import cache
+
+from app.database import capture_queries
+from benchmarks.scenarios import execute
+
+
+def _percentile(sorted_values, ratio):
+    return sorted_values[min(int(len(sorted_values) * ratio), len(sorted_values) - 1)]
+
+
+def measure(
+    scenario, client, admin_client, workdir, iterations=5, warmup=1, cold=False
+):
+    """Mesure un scénario ; renvoie un dict JSON-sérialisable."""
+    for _ in range(warmup):
+        execute(scenario, client, admin_client, workdir)
+
+    durations = []
+    for _ in range(iterations):
+        if cold:
+            cache.clear()
+        start = time.perf_counter()
+        execute(scenario, client, admin_client, workdir)
+        durations.append((time.perf_counter() - start) * 1000)
+    durations.sort()
+
+    if cold:
+        cache.clear()
+    tracemalloc.start()
+    try:
+        with capture_queries() as queries:
+            execute(scenario, client, admin_client, workdir)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_ms": round(statistics.median(durations), 2),
+        "p95_ms": round(_percentile(durations, 0.95), 2),
+        "min_ms": round(durations[0], 2),
+        "queries": len(queries),
+        "peak_memory_kb": round(peak / 1024),
+    }
+
+
+def run(
+    scenarios,
+    client,
+    admin_client,
+    workdir,
+    iterations=5,
+    warmup=1,
+    cold=False,
+    meta=None,
+):
+    """Mesure tous les scénarios ; renvoie le rapport (``meta`` + ``results``)."""
+    report = {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "machine": platform.node(),
+            "iterations": iterations,
+            "cold": cold,
+            **(meta or {}),
+        },
+        "results": {},
+    }
+    for scenario in scenarios:
+        report["results"][scenario.name] = measure(
+            scenario, client, admin_client, workdir, iterations, warmup, cold
+        )
+    return report
+
+
+def compare(report, baseline, max_regression=20.0):
+    """
+    Compare un rapport à une référence.
+
+    Un scénario régresse si sa médiane dépasse celle de la référence de plus
+    de ``max_regression`` % ou s'il exécute plus de requêtes SQL.
+
+    Returns:
+        liste de dicts (``name``, ``median_ms``, ``baseline_ms``, ``delta_pct``,
+        ``queries``, ``baseline_queries``, ``regression``) pour les scénarios
+        présents des deux côtés.
+    """
+    rows = []
+    for name, result in report["results"].items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        base_ms = reference["median_ms"]
+        delta = (result["median_ms"] - base_ms) / base_ms * 100 if base_ms else 0.0
+        rows.append(
+            {
+                "name": name,
+                "median_ms": result["median_ms"],
+                "baseline_ms": base_ms,
+                "delta_pct": round(delta, 1),
+                "queries": result["queries"],
+                "baseline_queries": reference["queries"],
+                "regression": delta > max_regression
+                or result["queries"] > reference["queries"],
+            }
+        )
+    return rows
@@ -0,0 +1,95 @@
+"""
+Chemins mesurés par ``run_benchmarks``.
+
+Chaque scénario est soit une URL nommée (appelée avec le client de test,
+en visiteur anonyme ou en superutilisateur), soit une fonction appelée
+directement (sauvegarde ZIP, hors requête HTTP).
+"""
+
+import itertools
+from collections import namedtuple
+from datetime import date, timedelta
+
+from django.urls import reverse
+
+Scenario = namedtuple(
+    "Scenario", "name url_name params admin call", defaults=(None, None, False, None)
+)
+
+# Adresse IP distincte à chaque appel : le téléchargement PDF est limité à
+# 10 requêtes par minute et par IP
+_ips = (f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}" for n in itertools.count(1))
+
+
+def _export_range(days):
+    def params():
+        end = date.today()
+        return {
+            "date_start": (end - timedelta(days=days - 1)).isoformat(),
+            "date_end": end.isoformat(),
+            "format": "json",
+        }
+
+    return params
+
+
+def _first_commune():
+    from home.data.collecte_data import city_data
+
+    return {"commune": next(iter(city_data))}
+
+
+def _backup_zip(workdir):
+    from backup.utils import create_backup_zip
+
+    path = workdir / "backup.zip"
+    create_backup_zip(path)
+    path.unlink(missing_ok=True)
+
+
+SCENARIOS = (
+    Scenario("home", "home"),
+    Scenario("conseil", "conseil_communautaire:conseil"),
+    Scenario("commissions", "commissions:commissions"),
+    Scenario("elus", "bureau-communautaire:elus"),
+    Scenario("search", "search", {"q": "commune"}),
+    Scenario("admin_stats_7", "analytics:admin_stats", {"period": "7"}, admin=True),
+    Scenario("admin_stats_90", "analytics:admin_stats", {"period": "90"}, admin=True),
+    Scenario("admin_stats_365", "analytics:admin_stats", {"period": "365"}, admin=True),
+    Scenario(
+        "batch_export_90", "analytics:batch_export", _export_range(90), admin=True
+    ),
+    Scenario("calendrier_verre", "telecharger_calendrier_verre", _first_commune),
+    Scenario("backup_zip", call=_backup_zip),
+)
+
+
+def get_scenarios(names=None):
+    """
+    Scénarios à exécuter, dans l'ordre de ``SCENARIOS``.
+
+    Lève ``ValueError`` si un nom est inconnu.
+    """
+    if not names:
+        return list(SCENARIOS)
+    known = {scenario.name for scenario in SCENARIOS}
+    unknown = sorted(set(names) - known)
+    if unknown:
+        raise ValueError(f"Scénario(s) inconnu(s) : {', '.join(unknown)}")
+    return [scenario for scenario in SCENARIOS if scenario.name in names]
+
+
+def execute(scenario, client, admin_client, workdir):
+    """Exécute une fois le scénario ; ``AssertionError`` si la réponse n'est pas 200."""
+    if scenario.call is not None:
+        scenario.call(workdir)
+        return
+    params = scenario.params() if callable(scenario.params) else scenario.params
+    response = (admin_client if scenario.admin else client).get(
+        reverse(scenario.url_name), params or {}, REMOTE_ADDR=next(_ips)
+    )
+    if response.status_code != 200:
+        raise AssertionError(f"{scenario.name} : statut HTTP {response.status_code}")
+    # Les réponses en flux (exports) ne sont produites qu'à la lecture
+    if response.streaming:
+        b"".join(response.streaming_content)
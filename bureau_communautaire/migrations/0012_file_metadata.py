@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bureau_communautaire', '0011_alter_elus_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='file_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.core.validators import FileExtensionValidator
 from django.db import models
 
+from app import file_metadata
+from app.models import cached_model_value, register_cached_model
 from app.validators import validate_image_mime
 from conseil_communautaire.models import Commission, ConseilVille
 from journal.models import validate_taille_fichier
@@ -75,10 +77,17 @@ class Document(models.Model):
         blank=False,
         null=False,
     )
+    # Taille, date et SHA-256 du fichier (voir app.file_metadata)
+    file_metadata = models.JSONField(default=dict, blank=True, editable=False)
+
+    @property
+    def disponible(self):
+        """Le fichier est-il présent sur le disque (valeur mémorisée en base) ?"""
+        return file_metadata.file_exists(self, "document")
 
     def get_document_size(self):
-        """Retourne la taille du document en Ko."""
-        return self.document.size / 1024
+        """Retourne la taille du document en Ko (0 si le fichier est absent)."""
+        return (file_metadata.file_size(self, "document") or 0) / 1024
 
     def __str__(self):
         return f"{self.title} {self.document} {self.type} {self.get_document_size()} Ko"
@@ -111,12 +120,26 @@ class PageStatus(models.Model):
         status = "Active" if self.is_active else "En maintenance"
         return f"{self.get_page_name_display()} - {status}"
 
+    @classmethod
+    def _load_statuses(cls):
+        return {
+            page_name: (is_active, maintenance_message)
+            for page_name, is_active, maintenance_message in cls.objects.values_list(
+                "page_name", "is_active", "maintenance_message"
+            )
+        }
+
     @classmethod
     def is_page_active(cls, page_name):
-        """Vérifie si une page est active."""
-        try:
-            page_status = cls.objects.get(page_name=page_name)
-            return page_status.is_active, page_status.maintenance_message
-        except cls.DoesNotExist:
-            # Si le statut n'existe pas, on considère la page comme active
-            return True, "La page est en cours de mise à jour."
+        """
+        Vérifie si une page est active.
+
+        Tous les statuts sont lus en une requête puis mémorisés jusqu'à la
+        prochaine modification (``app.models.cached_model_value``).
+        """
+        statuses = cached_model_value(cls, cls._load_statuses)
+        # Si le statut n'existe pas, on considère la page comme active
+        return statuses.get(page_name, (True, "La page est en cours de mise à jour."))
+
+
+register_cached_model(PageStatus)
@@ -1,11 +1,11 @@
 import logging
-import os
 
 from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
 from django.db import transaction
 from django.db.models import Count, Prefetch, Q
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
 
 from app.utils import secure_file_removal
 from conseil_communautaire.models import Commission
@@ -40,28 +40,14 @@ def elus(request):
         .order_by("rank", "last_name", "first_name")
     )
 
-    vice_presidents = list(elus_qs.filter(role=Elus.Role.VICE_PRESIDENT))
-    elus = vice_presidents if vice_presidents else None
-
-    president = elus_qs.filter(role=Elus.Role.PRESIDENT).first()
-
-    # Récupérer les documents
-    documents_raw = list(Document.objects.all())
-    documents = None
-    if documents_raw:
-        documents = []
-        for doc in documents_raw:
-            # Vérifie l'existence physique du fichier
-            try:
-                file_path = doc.document.path
-            except ValueError:
-                file_path = None
-            disponible = file_path and os.path.exists(file_path)
-            # On ajoute une propriété dynamique pour le template
-            doc.disponible = disponible
-            documents.append(doc)
-    else:
-        documents = None
+    # Évaluation paresseuse : aucune requête si la grille est en cache
+    elus = elus_qs.filter(role=Elus.Role.VICE_PRESIDENT)
+    president = SimpleLazyObject(
+        lambda: elus_qs.filter(role=Elus.Role.PRESIDENT).first()
+    )
+
+    # Récupérer les documents (disponibilité lue en base, sans accès disque)
+    documents = list(Document.objects.all()) or None
     context = {
         "elus": elus,
         "president": president,
@@ -1,9 +1,9 @@
 from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
-from django.core.cache import cache
 from django.db import transaction
 from django.db.models import Prefetch
 from django.shortcuts import get_list_or_404, get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
 
 from app.utils import secure_file_removal
 from bureau_communautaire.models import Elus, PageStatus
@@ -13,6 +13,15 @@ from .forms import CommissionDocForm, CommissionForm, MandatForm
 from .models import Commission, CommissionCompetence, Document, Mandat
 
 
+def _current_mandat():
+    mandat = Mandat.objects.first()
+    if not mandat:
+        # Crée un mandat par défaut si aucun n'existe
+        mandat = Mandat(start_year=2020, end_year=2026)
+        mandat.save()
+    return mandat
+
+
 def commissions(request):
     """
     Affiche la page des commissions.
@@ -29,35 +38,35 @@ def commissions(request):
         )
 
     # Récupération optimisée avec prefetch_related pour les relations ManyToMany
+    # Communes jointes (select_related) : un préchargement séparé par relation
+    # relirait deux fois les mêmes communes
     elus_prefetch = Prefetch(
-        "elus", queryset=Elus.objects.order_by("last_name", "first_name")
+        "elus",
+        queryset=Elus.objects.select_related("city").order_by(
+            "last_name", "first_name"
+        ),
     )
     membres_prefetch = Prefetch(
-        "membres", queryset=ConseilMembre.objects.order_by("last_name", "first_name")
+        "membres",
+        queryset=ConseilMembre.objects.select_related("city").order_by(
+            "last_name", "first_name"
+        ),
     )
     commissions_qs = Commission.objects.order_by("title").prefetch_related(
-        elus_prefetch, "elus__city", membres_prefetch, "membres__city"
+        elus_prefetch, membres_prefetch
     )
-    commissions_list = list(commissions_qs)
-    nb_commissions = len(commissions_list) if commissions_list else 0
-
-    # Document et mandat (avec cache de 5 minutes)
-    document = cache.get("commissions_document")
-    if document is None:
-        document = Document.get_solo()
-        cache.set("commissions_document", document, 300)
-
-    mandat = cache.get("commissions_mandat")
-    if mandat is None:
-        mandat = Mandat.objects.first()
-        if not mandat:
-            # Crée un mandat par défaut si aucun n'existe
-            mandat = Mandat(start_year=2020, end_year=2026)
-            mandat.save()
-        cache.set("commissions_mandat", mandat, 300)
+    # QuerySet non évalué : aucune requête si la liste est en cache
+    nb_commissions = SimpleLazyObject(lambda: len(commissions_qs))
+
+    # Document mémorisé jusqu'à sa modification
+    document = Document.get_cached()
+
+    # Mandat lu seulement si la grille n'est pas en cache : le fragment est
+    # versionné par ``commissions.Mandat`` et reconstruit à chaque modification
+    mandat = SimpleLazyObject(_current_mandat)
 
     context = {
-        "commissions": commissions_list if commissions_list else None,
+        "commissions": commissions_qs,
         "document": document,
         "nb_commissions": nb_commissions,
         "mandat": mandat,
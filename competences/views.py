@@ -5,10 +5,13 @@ from operator import attrgetter
 from django.contrib.auth.decorators import permission_required
 from django.shortcuts import get_list_or_404, get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
+
 from .forms import CompetenceForm
 from .models import Competence
 
 
+@conditional_page("competences.Competence")
 def competences(request):
     # 1 seule requête puis groupement en Python (au lieu de 4 parcours)
     toutes = list(Competence.objects.all().order_by("category", "title"))
@@ -14,7 +14,7 @@ from .models import CompteRendu, Conseil, DocumentConseil
 
 # Partie publique
 def comptes_rendus(request):
-    comptes_rendus = CompteRendu.get_solo()
+    comptes_rendus = CompteRendu.get_cached()
 
     # Afficher les conseils depuis 2 jours avant aujourd'hui (conservés 2 jours après)
     # et limiter aux 5 prochains
@@ -36,7 +36,7 @@ def comptes_rendus(request):
 
 
 def proces_verbaux(request):
-    proces_verbaux = CompteRendu.get_solo()
+    proces_verbaux = CompteRendu.get_cached()
 
     context = {
         "proces_verbaux": proces_verbaux,
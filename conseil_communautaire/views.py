@@ -7,6 +7,7 @@ from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import get_list_or_404, get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
@@ -22,11 +23,14 @@ def conseil(request):
     cities_list = ConseilVille.objects.all().order_by("city_name")
     city_number = cities_list.count()
 
-    # Pré-grouper les membres par ville pour éviter O(n×m) dans le template
-    members_by_city = defaultdict(lambda: {"titulaires": [], "suppleants": []})
-    for member in ConseilMembre.objects.select_related("city"):
-        key = "suppleants" if member.is_suppleant else "titulaires"
-        members_by_city[member.city_id][key].append(member)
+    # Pré-grouper les membres par ville pour éviter O(n×m) dans le template.
+    # Calcul paresseux : rien n'est lu si la grille est en cache.
+    def group_members_by_city():
+        members_by_city = defaultdict(lambda: {"titulaires": [], "suppleants": []})
+        for member in ConseilMembre.objects.select_related("city"):
+            key = "suppleants" if member.is_suppleant else "titulaires"
+            members_by_city[member.city_id][key].append(member)
+        return dict(members_by_city)
 
     # Afficher les conseils depuis 2 jours avant aujourd'hui
     today = timezone.now().date()
@@ -38,7 +42,7 @@ def conseil(request):
 
     context = {
         "cities_list": cities_list,
-        "members_by_city": dict(members_by_city),
+        "members_by_city": SimpleLazyObject(group_members_by_city),
         "city_number": city_number,
         "conseils": conseils if conseils else None,
         "next_conseil": next_conseil,
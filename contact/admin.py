@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ContactEmail
+from .models import ContactEmail, OutgoingEmail
 
 
 class CustomContactAdmin(admin.ModelAdmin):
@@ -18,3 +18,26 @@ class CustomContactAdmin(admin.ModelAdmin):
 
 
 admin.site.register(ContactEmail, CustomContactAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    """
+    Suivi de la file d'envoi des e-mails (lecture seule, sans le contenu).
+    """
+
+    list_display = ("subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("subject",)
+    exclude = ("body", "alternatives")
+    readonly_fields = [
+        field.name
+        for field in OutgoingEmail._meta.fields
+        if field.name not in ("body", "alternatives")
+    ]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
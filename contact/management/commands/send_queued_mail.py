@@ -0,0 +1,60 @@
+"""
+Commande Django d'envoi des e-mails en file (``contact.OutgoingEmail``).
+À exécuter via cron (par ex. toutes les 5 minutes) : rattrape les e-mails
+que le thread de fond n'a pas envoyés (redémarrage, SMTP indisponible) et
+les nouvelles tentatives arrivées à échéance.
+
+    python manage.py send_queued_mail [--batch-size 50] [--purge-days 30]
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from contact.models import OutgoingEmail
+from contact.outbox import BATCH_SIZE, deliver_all
+
+
+class Command(BaseCommand):
+    help = "Envoie par lots les e-mails en attente (une connexion SMTP par lot)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"E-mails envoyés par connexion (défaut : {BATCH_SIZE})",
+        )
+        parser.add_argument(
+            "--purge-days",
+            type=int,
+            default=30,
+            help=(
+                "Supprime les e-mails envoyés ou en échec depuis plus de N jours "
+                "(0 : jamais)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        sent, failed = deliver_all(batch_size=options["batch_size"])
+        message = f"{sent} e-mails envoyés, {failed} échecs."
+        self.stdout.write(
+            self.style.WARNING(message) if failed else self.style.SUCCESS(message)
+        )
+
+        if options["purge_days"]:
+            limit = timezone.now() - timedelta(days=options["purge_days"])
+            purged, _ = OutgoingEmail.objects.filter(
+                Q(status=OutgoingEmail.SENT, sent_at__lt=limit)
+                | Q(status=OutgoingEmail.FAILED, created_at__lt=limit)
+            ).delete()
+            if purged:
+                self.stdout.write(
+                    f"{purged} e-mails anciens (envoyés ou en échec) supprimés."
+                )
+
+        pending = OutgoingEmail.objects.filter(status=OutgoingEmail.PENDING).count()
+        if pending:
+            self.stdout.write(f"{pending} e-mails en attente de nouvelle tentative.")
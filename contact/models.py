@@ -13,3 +13,49 @@ class ContactEmail(models.Model):
 
     def __str__(self):
         return f"{self.email}"
+
+
+class OutgoingEmail(models.Model):
+    """
+    E-mail en file d'envoi (``contact.outbox``).
+
+    Les vues n'ouvrent plus de connexion SMTP : le backend d'e-mail
+    enregistre une ligne, envoyée ensuite par lots hors requête.
+    """
+
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "En attente"),
+        (SENT, "Envoyé"),
+        (FAILED, "Échec définitif"),
+    ]
+
+    subject = models.CharField(verbose_name="Objet", max_length=998)
+    from_email = models.CharField(verbose_name="Expéditeur", max_length=254)
+    # {"to": [...], "cc": [...], "bcc": [...], "reply_to": [...]}
+    recipients = models.JSONField(verbose_name="Destinataires", default=dict)
+    body = models.TextField(verbose_name="Texte", blank=True)
+    # [[contenu, type MIME], ...] (ex. version HTML)
+    alternatives = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    status = models.CharField(
+        verbose_name="Statut", max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(verbose_name="Tentatives", default=0)
+    next_attempt_at = models.DateTimeField(verbose_name="Prochaine tentative")
+    last_error = models.TextField(verbose_name="Dernière erreur", blank=True)
+    created_at = models.DateTimeField(verbose_name="Créé le", auto_now_add=True)
+    sent_at = models.DateTimeField(verbose_name="Envoyé le", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "E-mail en file d'envoi"
+        verbose_name_plural = "E-mails en file d'envoi"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} ({self.get_status_display()})"
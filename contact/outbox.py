@@ -0,0 +1,269 @@
+"""
+File d'envoi durable des e-mails.
+
+Le formulaire de contact ouvrait deux connexions SMTP pendant la requête
+POST (mail au service + confirmation au visiteur), comme les e-mails de
+compte, de sauvegarde et de statistiques : un serveur SMTP lent bloquait
+un worker gunicorn plusieurs secondes.
+
+``OutboxEmailBackend`` (``EMAIL_BACKEND``) remplace l'envoi par
+l'insertion d'une ligne ``OutgoingEmail`` : ``send_mail``,
+``EmailMessage.send()``... retournent immédiatement, sans modification
+des appelants. L'envoi réel est fait par lots, via le backend
+``EMAIL_DELIVERY_BACKEND`` (SMTP), avec une seule connexion par lot :
+
+- par un thread de fond réveillé après le commit (``EMAIL_OUTBOX_WORKER``) ;
+- par la commande ``send_queued_mail`` (cron), qui rattrape aussi les
+  e-mails laissés par un processus arrêté.
+
+Le contenu (texte et versions HTML) est effacé dès qu'un e-mail est
+envoyé ou en échec définitif : seuls l'objet, les destinataires et le
+statut restent pour le suivi. Les e-mails contenant un secret (mot de
+passe temporaire, lien de réinitialisation) ne passent pas par la file :
+ils sont envoyés immédiatement via ``get_direct_connection()``.
+
+En cas d'échec, un e-mail est retenté avec un délai doublé à chaque
+tentative (1 min, 2 min, 4 min... plafonné à 6 h), puis marqué en échec
+définitif après ``MAX_ATTEMPTS`` tentatives.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 60  # secondes
+RETRY_MAX_DELAY = 6 * 60 * 60
+# Durée pendant laquelle un e-mail pris par un expéditeur n'est pas repris
+# par un autre (si l'expéditeur meurt, l'e-mail redevient disponible)
+CLAIM_LEASE = timedelta(minutes=10)
+# Contenu effacé une fois l'e-mail envoyé ou abandonné
+CLEARED_CONTENT = {"body": "", "alternatives": []}
+# Le thread de fond vérifie aussi périodiquement les e-mails à retenter
+WORKER_POLL_INTERVAL = 60
+
+
+def retry_delay(attempts):
+    """Délai avant la tentative suivante, après ``attempts`` échecs."""
+    return timedelta(
+        seconds=min(RETRY_BASE_DELAY * 2 ** max(attempts - 1, 0), RETRY_MAX_DELAY)
+    )
+
+
+def serialize(message):
+    """Champs ``OutgoingEmail`` d'un ``EmailMessage`` (sans pièces jointes)."""
+    return {
+        "subject": message.subject,
+        "from_email": message.from_email or settings.DEFAULT_FROM_EMAIL,
+        "recipients": {
+            "to": list(message.to),
+            "cc": list(message.cc),
+            "bcc": list(message.bcc),
+            "reply_to": list(message.reply_to),
+        },
+        "body": message.body,
+        "alternatives": [
+            [content, mimetype]
+            for content, mimetype in getattr(message, "alternatives", [])
+        ],
+        "headers": dict(message.extra_headers),
+    }
+
+
+def get_direct_connection(**kwargs):
+    """
+    Connexion d'envoi immédiat, hors file (contenu jamais stocké en base).
+
+    ``EMAIL_DELIVERY_BACKEND`` si ``EMAIL_BACKEND`` est la file, sinon
+    ``EMAIL_BACKEND`` lui-même (ex. backend ``locmem`` des tests).
+    """
+    backend = settings.EMAIL_BACKEND
+    if backend == f"{__name__}.OutboxEmailBackend":
+        backend = settings.EMAIL_DELIVERY_BACKEND
+    return get_connection(backend, **kwargs)
+
+
+def to_message(email, connection=None):
+    """Reconstruit l'``EmailMultiAlternatives`` d'une ligne ``OutgoingEmail``."""
+    recipients = email.recipients
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=recipients.get("to", []),
+        cc=recipients.get("cc", []),
+        bcc=recipients.get("bcc", []),
+        reply_to=recipients.get("reply_to", []),
+        headers=email.headers,
+        connection=connection,
+    )
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """
+    Backend d'e-mail qui enregistre les messages en file au lieu de les envoyer.
+
+    Les messages avec pièces jointes (non sérialisées) partent directement
+    par ``EMAIL_DELIVERY_BACKEND``.
+    """
+
+    def send_messages(self, email_messages):
+        from contact.models import OutgoingEmail
+
+        now = timezone.now()
+        messages = [message for message in email_messages if message.recipients()]
+        direct = [message for message in messages if message.attachments]
+        rows = [
+            OutgoingEmail(next_attempt_at=now, **serialize(message))
+            for message in messages
+            if not message.attachments
+        ]
+        count = 0
+        if direct:
+            connection = get_connection(
+                settings.EMAIL_DELIVERY_BACKEND, fail_silently=self.fail_silently
+            )
+            count += connection.send_messages(direct) or 0
+        if rows:
+            OutgoingEmail.objects.bulk_create(rows)
+            count += len(rows)
+            if getattr(settings, "EMAIL_OUTBOX_WORKER", True):
+                transaction.on_commit(wake_worker)
+        return count
+
+
+def _claim(email, now):
+    """Réserve ``email`` pour cet expéditeur ; False si un autre l'a pris."""
+    from contact.models import OutgoingEmail
+
+    claimed = OutgoingEmail.objects.filter(
+        pk=email.pk,
+        status=OutgoingEmail.PENDING,
+        next_attempt_at=email.next_attempt_at,
+    ).update(next_attempt_at=now + CLAIM_LEASE, attempts=F("attempts") + 1)
+    email.attempts += 1
+    return claimed == 1
+
+
+def _record_failure(email, error):
+    from contact.models import OutgoingEmail
+
+    final = email.attempts >= MAX_ATTEMPTS
+    fields = {
+        "status": OutgoingEmail.FAILED if final else OutgoingEmail.PENDING,
+        "next_attempt_at": timezone.now() + retry_delay(email.attempts),
+        "last_error": str(error)[:2000],
+    }
+    if final:
+        fields.update(CLEARED_CONTENT)
+    OutgoingEmail.objects.filter(pk=email.pk).update(**fields)
+    log = logger.error if final else logger.warning
+    log(
+        "Échec d'envoi de l'e-mail #%s (tentative %s) : %s",
+        email.pk,
+        email.attempts,
+        error,
+    )
+
+
+def deliver_pending(batch_size=BATCH_SIZE):
+    """
+    Envoie un lot d'e-mails échus sur une seule connexion.
+
+    Returns:
+        tuple ``(envoyés, échecs)`` ; ``(0, 0)`` si la file est vide.
+    """
+    from contact.models import OutgoingEmail
+
+    now = timezone.now()
+    due = list(
+        OutgoingEmail.objects.filter(
+            status=OutgoingEmail.PENDING, next_attempt_at__lte=now
+        ).order_by("next_attempt_at", "pk")[:batch_size]
+    )
+    claimed = [email for email in due if _claim(email, now)]
+    if not claimed:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in claimed:
+            _record_failure(email, error)
+        return 0, len(claimed)
+    try:
+        for email in claimed:
+            try:
+                connection.send_messages([to_message(email, connection)])
+            except Exception as error:
+                _record_failure(email, error)
+                failed += 1
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status=OutgoingEmail.SENT,
+                    sent_at=timezone.now(),
+                    last_error="",
+                    **CLEARED_CONTENT,
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent, failed
+
+
+def deliver_all(batch_size=BATCH_SIZE):
+    """Envoie les lots successifs jusqu'à épuisement des e-mails échus."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_pending(batch_size)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
+
+
+# --- Thread d'envoi en arrière-plan -------------------------------------------
+
+_wake_event = threading.Event()
+_worker_lock = threading.Lock()
+_worker = None
+
+
+def _worker_loop():
+    while True:
+        _wake_event.wait(WORKER_POLL_INTERVAL)
+        _wake_event.clear()
+        try:
+            close_old_connections()
+            deliver_all()
+        except Exception:
+            logger.exception("Erreur du thread d'envoi des e-mails")
+        finally:
+            close_old_connections()
+
+
+def wake_worker():
+    """Réveille le thread d'envoi (démarré à la demande)."""
+    global _worker
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_worker_loop, name="email-outbox", daemon=True
+            )
+            _worker.start()
+    _wake_event.set()
@@ -590,3 +590,203 @@ class ContactEmailIntegrationTestCase(TestCase):
         response = self.client.post(reverse("home"), form_data)
         self.assertEqual(response.status_code, 302)
         # Le formulaire devrait être traité même avec le contact inactif
+
+
+@override_settings(
+    EMAIL_BACKEND="contact.outbox.OutboxEmailBackend",
+    EMAIL_DELIVERY_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    EMAIL_OUTBOX_WORKER=False,
+)
+class OutboxTestCase(TestCase):
+    """File d'envoi : la requête n'insère qu'une ligne, l'envoi se fait par lots."""
+
+    def _queue(self, count=1):
+        from django.core.mail import EmailMultiAlternatives
+
+        for i in range(count):
+            message = EmailMultiAlternatives(
+                subject=f"Sujet {i}",
+                body="Texte",
+                to=["agent@example.com"],
+                reply_to=["visiteur@example.com"],
+            )
+            message.attach_alternative("<p>HTML</p>", "text/html")
+            message.send()
+
+    def test_send_only_inserts_row(self):
+        from django.core import mail
+
+        from .models import OutgoingEmail
+
+        self._queue()
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutgoingEmail.objects.get()
+        self.assertEqual(email.status, OutgoingEmail.PENDING)
+        self.assertEqual(email.recipients["reply_to"], ["visiteur@example.com"])
+
+    def test_batch_delivered_over_one_connection(self):
+        from unittest.mock import patch
+
+        from django.core import mail
+
+        from . import outbox
+        from .models import OutgoingEmail
+
+        self._queue(3)
+        with patch(
+            "contact.outbox.get_connection", wraps=outbox.get_connection
+        ) as get_connection:
+            self.assertEqual(outbox.deliver_all(), (3, 0))
+        get_connection.assert_called_once()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertEqual(mail.outbox[0].reply_to, ["visiteur@example.com"])
+        self.assertFalse(
+            OutgoingEmail.objects.exclude(status=OutgoingEmail.SENT).exists()
+        )
+
+    def test_failure_is_retried_with_backoff_then_abandoned(self):
+        from smtplib import SMTPException
+        from unittest.mock import patch
+
+        from django.utils import timezone
+
+        from . import outbox
+        from .models import OutgoingEmail
+
+        self._queue()
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=SMTPException("boom"),
+        ):
+            self.assertEqual(outbox.deliver_pending(), (0, 1))
+            email = OutgoingEmail.objects.get()
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.status, OutgoingEmail.PENDING)
+            self.assertGreater(email.next_attempt_at, timezone.now())
+            # Pas encore échu : rien à envoyer
+            self.assertEqual(outbox.deliver_pending(), (0, 0))
+
+            OutgoingEmail.objects.update(
+                attempts=outbox.MAX_ATTEMPTS - 1, next_attempt_at=timezone.now()
+            )
+            outbox.deliver_pending()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutgoingEmail.FAILED)
+        self.assertIn("boom", email.last_error)
+
+    def test_retry_delay_doubles_and_is_capped(self):
+        from . import outbox
+
+        self.assertEqual(outbox.retry_delay(1).total_seconds(), 60)
+        self.assertEqual(outbox.retry_delay(3).total_seconds(), 240)
+        self.assertEqual(outbox.retry_delay(30).total_seconds(), outbox.RETRY_MAX_DELAY)
+
+    def test_send_queued_mail_command(self):
+        from io import StringIO
+
+        from django.core import mail
+        from django.core.management import call_command
+
+        self._queue(2)
+        out = StringIO()
+        call_command("send_queued_mail", stdout=out)
+        self.assertIn("2 e-mails envoyés", out.getvalue())
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_content_cleared_once_sent_or_failed(self):
+        from datetime import timedelta
+        from smtplib import SMTPException
+        from unittest.mock import patch
+
+        from django.utils import timezone
+
+        from . import outbox
+        from .models import OutgoingEmail
+
+        self._queue(2)
+        first, second = OutgoingEmail.objects.order_by("pk")
+        OutgoingEmail.objects.filter(pk=second.pk).update(
+            attempts=outbox.MAX_ATTEMPTS - 1,
+            next_attempt_at=timezone.now() + timedelta(minutes=1),
+        )
+        outbox.deliver_pending()
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutgoingEmail.SENT)
+        self.assertEqual((first.body, first.alternatives), ("", []))
+
+        OutgoingEmail.objects.filter(pk=second.pk).update(
+            next_attempt_at=timezone.now()
+        )
+        with patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=SMTPException("boom"),
+        ):
+            outbox.deliver_pending()
+        second.refresh_from_db()
+        self.assertEqual(second.status, OutgoingEmail.FAILED)
+        self.assertEqual((second.body, second.alternatives), ("", []))
+
+    def test_purge_removes_old_sent_and_failed(self):
+        from datetime import timedelta
+        from io import StringIO
+
+        from django.core.management import call_command
+        from django.utils import timezone
+
+        from .models import OutgoingEmail
+
+        self._queue(3)
+        old = timezone.now() - timedelta(days=40)
+        sent, failed, pending = OutgoingEmail.objects.order_by("pk")
+        OutgoingEmail.objects.filter(pk=sent.pk).update(
+            status=OutgoingEmail.SENT, sent_at=old
+        )
+        OutgoingEmail.objects.filter(pk=failed.pk).update(
+            status=OutgoingEmail.FAILED, created_at=old
+        )
+        OutgoingEmail.objects.filter(pk=pending.pk).update(
+            created_at=old, next_attempt_at=timezone.now() + timedelta(hours=1)
+        )
+        call_command("send_queued_mail", stdout=StringIO())
+        self.assertEqual(
+            list(OutgoingEmail.objects.values_list("pk", flat=True)), [pending.pk]
+        )
+
+    def test_account_emails_bypass_queue(self):
+        from django.core import mail
+
+        from accounts.views import _send_welcome_email
+
+        from .models import OutgoingEmail
+
+        class _StubRequest:
+            scheme = "https"
+
+            def get_host(self):
+                return "example.com"
+
+        user = get_user_model().objects.create_user(
+            "nouveau@example.com", "Secret-123!"
+        )
+        self.assertTrue(_send_welcome_email(user, "Secret-123!", _StubRequest()))
+        self.assertFalse(OutgoingEmail.objects.exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn("Secret-123!", mail.outbox[0].body)
+
+    def test_admin_hides_content(self):
+        from .admin import OutgoingEmailAdmin
+        from .models import OutgoingEmail
+
+        self._queue()
+        admin_user = get_user_model().objects.create_superuser(
+            "root@example.com", "pass"
+        )
+        self.client.force_login(admin_user)
+        email = OutgoingEmail.objects.get()
+        response = self.client.get(
+            reverse("admin:contact_outgoingemail_change", args=[email.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, "&lt;p&gt;HTML&lt;/p&gt;")
+        self.assertNotIn("body", OutgoingEmailAdmin.readonly_fields)
@@ -39,3 +39,27 @@ class HomeConfig(AppConfig):
                 return url
 
         watson.register(StaticPage, StaticPageAdapter, fields=("title", "content", "description"))
+
+        from app import (
+            context_processors,
+            database,
+            file_metadata,
+            images,
+            pdf_previews,
+        )
+
+        from . import content_versions
+
+        # WAL et pragmas de production sur chaque connexion SQLite
+        database.connect_signals()
+        # Variantes WebP/AVIF des images téléversées (tous modèles confondus)
+        images.connect_signals()
+        # Aperçus (1re page) et nombre de pages des PDF, hors requête d'upload
+        pdf_previews.connect_signals()
+        # Taille/date/SHA-256 des documents mémorisés en base (listes sans stat)
+        file_metadata.connect_signals()
+        # Liste des communes du menu périmée à chaque modification d'une commune
+        context_processors.connect_signals()
+        # Versions de contenu des fragments mis en cache (après les images :
+        # le dernier incrément suit la génération des dérivés)
+        content_versions.connect_signals()
@@ -0,0 +1,130 @@
+"""
+Versions de contenu des modèles affichés par les pages publiques lourdes.
+
+Les pages du conseil communautaire, des commissions et des élus rendent
+toutes les communes, tous les membres et toutes les commissions à chaque
+requête. Leurs grilles sont mises en cache sans expiration par le tag
+``{% cachedcontent %}`` (``home.templatetags.content_cache``), sous une clé
+qui contient la version de chaque modèle utilisé : toute modification
+(``post_save``, ``post_delete``, ``m2m_changed``) incrémente la version en
+base (``ContentVersion``) et le fragment est reconstruit à la requête
+suivante, dans tous les workers.
+
+Les mêmes versions servent d'ETag/Last-Modified aux pages publiques
+(``app.conditional.conditional_page``).
+
+Les ``QuerySet.update()`` et ``bulk_create`` ne déclenchent pas de signal :
+appeler ``bump()`` après ce type d'écriture.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.utils import timezone
+
+# Modèles dont dépendent les fragments mis en cache (``{% cachedcontent %}``)
+# et les pages conditionnelles (``@conditional_page``). Liste statique : un
+# worker qui enregistre une modification doit suivre le modèle même s'il
+# n'a jamais importé la vue qui l'affiche.
+TRACKED_MODELS = {
+    "bureau_communautaire.elus",
+    "commissions.commission",
+    "commissions.commissioncompetence",
+    "commissions.mandat",
+    "competences.competence",
+    "conseil_communautaire.conseilmembre",
+    "conseil_communautaire.conseilville",
+    "journal.journal",
+    "linktree.lien",
+    "partenaires.categoriepartenaire",
+    "partenaires.partenaire",
+    "rapports_activite.rapportactivite",
+    "semestriels.semestrielpage",
+}
+
+
+def _label(model_or_label):
+    if isinstance(model_or_label, str):
+        return model_or_label.lower()
+    return model_or_label._meta.label_lower
+
+
+def untracked(models_or_labels):
+    """Labels de ``models_or_labels`` absents de ``TRACKED_MODELS``."""
+    return [
+        _label(model)
+        for model in models_or_labels
+        if _label(model) not in TRACKED_MODELS
+    ]
+
+
+def bump(model_or_label):
+    """Incrémente la version de contenu d'un modèle (ou d'un label ``app.modèle``)."""
+    from .models import ContentVersion
+
+    label = _label(model_or_label)
+    fields = {"version": F("version") + 1, "updated_at": timezone.now()}
+    if ContentVersion.objects.filter(label=label).update(**fields):
+        return
+    try:
+        with transaction.atomic():
+            ContentVersion.objects.create(label=label, version=1)
+    except IntegrityError:
+        # Ligne créée entre-temps par un autre processus
+        ContentVersion.objects.filter(label=label).update(**fields)
+
+
+def get_state(labels):
+    """
+    Versions des ``labels`` et date de la dernière modification, en une requête.
+
+    Returns:
+        tuple ``({label: "version.horodatage"}, datetime ou None)``.
+        L'horodatage distingue deux états de même numéro (base restaurée,
+        transaction annulée) ; un modèle jamais modifié vaut ``"0"``.
+    """
+    from .models import ContentVersion
+
+    labels = [_label(label) for label in labels]
+    rows = ContentVersion.objects.filter(label__in=labels).values_list(
+        "label", "version", "updated_at"
+    )
+    found = {}
+    last_modified = None
+    for label, version, updated_at in rows:
+        found[label] = f"{version}.{updated_at.timestamp():.6f}"
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+    return {label: found.get(label, "0") for label in labels}, last_modified
+
+
+def get_versions(labels):
+    """État ``{label: "version.horodatage"}`` des ``labels`` (voir ``get_state``)."""
+    return get_state(labels)[0]
+
+
+def _bump_now_and_on_commit(label):
+    bump(label)
+    # Un fragment rendu par un autre worker avant le commit (ancienne
+    # version) ou avant la génération des images dérivées (on_commit
+    # enregistré plus tôt) ne doit pas rester en cache
+    transaction.on_commit(lambda: bump(label))
+
+
+def _on_change(sender, **kwargs):
+    label = sender._meta.label_lower
+    if label in TRACKED_MODELS:
+        _bump_now_and_on_commit(label)
+
+
+def _on_m2m_change(sender, instance, action, model, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    for label in {_label(type(instance)), _label(model)} & TRACKED_MODELS:
+        _bump_now_and_on_commit(label)
+
+
+def connect_signals():
+    post_save.connect(_on_change, dispatch_uid="content_versions_save")
+    post_delete.connect(_on_change, dispatch_uid="content_versions_delete")
+    m2m_changed.connect(_on_m2m_change, dispatch_uid="content_versions_m2m")
@@ -0,0 +1,183 @@
+"""Génération des flux iCalendar (.ics) de collecte des déchets.
+
+Les données de ``city_data`` sont figées dans le code : un flux donné
+(commune, rue) ne change donc qu'au redéploiement. Chaque flux est rendu
+une seule fois par processus puis mémorisé avec son ETag fort, ce qui
+permet aux applications d'agenda d'interroger l'URL à volonté en ne
+recevant que des réponses 304.
+"""
+
+import datetime
+import hashlib
+from functools import lru_cache
+from typing import List, NamedTuple, Optional
+
+from home.data.collecte_data import city_data, get_dates_verre, get_jour_ordures
+
+PRODID = "-//Communaute de Communes Sud-Avesnois//Collecte des dechets//FR"
+UID_DOMAIN = "cc-sudavesnois.fr"
+
+# Jours français -> codes BYDAY de la RFC 5545
+JOURS_ICS = {
+    "lundi": "MO",
+    "mardi": "TU",
+    "mercredi": "WE",
+    "jeudi": "TH",
+    "vendredi": "FR",
+    "samedi": "SA",
+    "dimanche": "SU",
+}
+JOURS_INDEX = {jour: index for index, jour in enumerate(JOURS_ICS)}
+
+
+class CalendrierICS(NamedTuple):
+    """Flux iCalendar pré-rendu et son empreinte."""
+
+    content: bytes
+    etag: str
+    filename: str
+
+
+def _escape_text(value: str) -> str:
+    """Échappe une valeur TEXT selon la RFC 5545 (section 3.3.11)."""
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> List[str]:
+    """Replie une ligne à 75 octets maximum (RFC 5545, section 3.1)."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return [line]
+    parts = []
+    current = ""
+    limit = 75
+    for char in line:
+        if len((current + char).encode("utf-8")) > limit:
+            parts.append(current)
+            current = " "
+            limit = 75
+        current += char
+    parts.append(current)
+    return parts
+
+
+def _slug(value: str) -> str:
+    return hashlib.sha1(value.lower().encode("utf-8")).hexdigest()[:12]
+
+
+def _first_weekday_on_or_after(start: datetime.date, jour: str) -> datetime.date:
+    delta = (JOURS_INDEX[jour] - start.weekday()) % 7
+    return start + datetime.timedelta(days=delta)
+
+
+def _event_lines(uid, dtstart, summary, description, rrule=None):
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}@{UID_DOMAIN}",
+        f"DTSTAMP:{dtstart:%Y%m%d}T000000Z",
+        f"DTSTART;VALUE=DATE:{dtstart:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{dtstart + datetime.timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape_text(summary)}",
+        f"DESCRIPTION:{_escape_text(description)}",
+        "TRANSP:TRANSPARENT",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+    lines.append("END:VEVENT")
+    return lines
+
+
+def _build_calendar(commune: str, rue: str) -> Optional[CalendrierICS]:
+    jour_ordures, rue_trouvee = get_jour_ordures(commune, rue or None)
+    dates_verre = get_dates_verre(commune, jour_ordures)
+    if not dates_verre:
+        return None
+
+    lieu = f"{commune} - {rue_trouvee}" if rue_trouvee else commune
+    uid_base = f"collecte-{_slug(commune)}-{_slug(rue_trouvee or '')}"
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape_text(f'Collecte des déchets - {lieu}')}",
+        "X-WR-TIMEZONE:Europe/Paris",
+        "REFRESH-INTERVAL;VALUE=DURATION:P1D",
+        "X-PUBLISHED-TTL:P1D",
+    ]
+
+    for date_str in dates_verre:
+        date_obj = datetime.date.fromisoformat(date_str)
+        lines.extend(
+            _event_lines(
+                uid=f"{uid_base}-verre-{date_obj:%Y%m%d}",
+                dtstart=date_obj,
+                summary="Collecte du verre",
+                description=f"Collecte du verre à {lieu}.",
+            )
+        )
+
+    # Ordures ménagères : événement hebdomadaire borné à la période couverte
+    # par le calendrier du verre (données publiées par la CCSA).
+    if jour_ordures and jour_ordures.lower() in JOURS_ICS:
+        jour = jour_ordures.lower()
+        debut = datetime.date.fromisoformat(dates_verre[0]).replace(day=1)
+        fin = datetime.date.fromisoformat(dates_verre[-1]).replace(month=12, day=31)
+        lines.extend(
+            _event_lines(
+                uid=f"{uid_base}-ordures",
+                dtstart=_first_weekday_on_or_after(debut, jour),
+                summary="Collecte des ordures ménagères",
+                description=(
+                    "Collecte des ordures ménagères et déchets recyclables "
+                    f"à {lieu}."
+                ),
+                rrule=f"FREQ=WEEKLY;BYDAY={JOURS_ICS[jour]};UNTIL={fin:%Y%m%d}",
+            )
+        )
+
+    lines.append("END:VCALENDAR")
+
+    folded = []
+    for line in lines:
+        folded.extend(_fold(line))
+    content = ("\r\n".join(folded) + "\r\n").encode("utf-8")
+    etag = hashlib.sha256(content).hexdigest()
+
+    return CalendrierICS(content=content, etag=etag, filename=uid_base + ".ics")
+
+
+@lru_cache(maxsize=512)
+def _get_calendrier_cached(commune: str, rue: str) -> Optional[CalendrierICS]:
+    return _build_calendar(commune, rue)
+
+
+def get_calendrier_ics(commune: str, rue: str = "") -> Optional[CalendrierICS]:
+    """
+    Retourne le flux iCalendar de collecte pour une commune (et une rue).
+
+    Le rendu est mémorisé par processus : ``city_data`` étant constant,
+    les appels suivants ne coûtent qu'une recherche dans le cache LRU.
+
+    Args:
+        commune: Nom de la commune (clé de ``city_data``).
+        rue: Nom de la rue (requis pour Fourmies/Trélon).
+
+    Returns:
+        ``CalendrierICS`` ou None si la commune/rue est inconnue.
+    """
+    if commune not in city_data:
+        return None
+    if isinstance(city_data[commune].get("ordures"), str):
+        # Commune mono-jour : la rue n'influe pas sur le calendrier
+        rue = ""
+    # Normalisation pour que "RUE GAMBETTA" et "rue gambetta" partagent
+    # la même entrée de cache et le même ETag.
+    return _get_calendrier_cached(commune, (rue or "").strip().lower())
@@ -9,6 +9,7 @@ from home.data.collecte_data import (
     get_jour_ordures,
     validate_city_data,
 )
+from home.data.collecte_ics import get_calendrier_ics
 
 
 class CollecteDataTestCase(SimpleTestCase):
@@ -71,3 +72,40 @@ class CollecteDataTestCase(SimpleTestCase):
         for commune, data in city_data.items():
             self.assertIn("verre", data, f"{commune} sans 'verre'")
             self.assertIn("ordures", data, f"{commune} sans 'ordures'")
+
+
+class CollecteICSTestCase(SimpleTestCase):
+    def test_unknown_commune_returns_none(self):
+        self.assertIsNone(get_calendrier_ics("Atlantis"))
+
+    def test_mono_jour_contains_verre_and_ordures(self):
+        calendrier = get_calendrier_ics("Anor")
+        content = calendrier.content.decode("utf-8")
+        self.assertTrue(content.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(content.endswith("END:VCALENDAR\r\n"))
+        # 24 dates de verre + 1 événement hebdomadaire pour les ordures
+        self.assertEqual(content.count("BEGIN:VEVENT"), 25)
+        self.assertIn("DTSTART;VALUE=DATE:20260107", content)
+        self.assertIn("RRULE:FREQ=WEEKLY;BYDAY=WE;UNTIL=20271231", content)
+
+    def test_etag_is_stable_and_memoized(self):
+        first = get_calendrier_ics("Anor")
+        self.assertIs(first, get_calendrier_ics("Anor"))
+        # La rue n'influe pas sur une commune mono-jour
+        self.assertIs(first, get_calendrier_ics("Anor", "rue quelconque"))
+        self.assertEqual(len(first.etag), 64)
+
+    def test_rue_is_case_insensitive(self):
+        lower = get_calendrier_ics("Fourmies", "rue gambetta")
+        upper = get_calendrier_ics("Fourmies", "RUE GAMBETTA")
+        self.assertIsNotNone(lower)
+        self.assertIs(lower, upper)
+        self.assertIn("BYDAY=MO", lower.content.decode("utf-8"))
+
+    def test_fourmies_without_rue_returns_none(self):
+        self.assertIsNone(get_calendrier_ics("Fourmies"))
+
+    def test_lines_are_folded(self):
+        calendrier = get_calendrier_ics("Fourmies", "rue gambetta")
+        for line in calendrier.content.split(b"\r\n"):
+            self.assertLessEqual(len(line), 75)
@@ -0,0 +1,165 @@
+"""
+Commande Django de mesure de la concurrence SQLite.
+
+    python manage.py benchmark_sqlite --workers 1 4 8 --duration 5
+
+Lance N processus (comme N workers gunicorn) qui lisent et écrivent dans
+une base temporaire (table imitant ``django_session``), d'abord avec la
+configuration SQLite par défaut (journal ``DELETE``), puis avec les pragmas
+de ``app.database`` (WAL...) et des transactions ``IMMEDIATE``. Affiche le
+débit et le nombre d'erreurs « database is locked » de chaque mode.
+
+La base de production n'est pas touchée.
+"""
+
+import multiprocessing
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.database import get_pragmas
+
+MODES = ("défaut", "optimisé")
+
+
+def _create_database(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = DELETE")
+    conn.execute(
+        "CREATE TABLE bench_session ("
+        " session_key TEXT PRIMARY KEY, session_data TEXT, expire_date REAL)"
+    )
+    conn.executemany(
+        "INSERT INTO bench_session VALUES (?, ?, ?)",
+        ((f"key{i}", "x" * 200, time.time()) for i in range(rows)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _worker(path, pragmas, immediate, deadline, rows, write_ratio, seed, results):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path, timeout=5, isolation_level=None)
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    reads = writes = locked = 0
+    while time.time() < deadline:
+        key = f"key{rng.randrange(rows)}"
+        try:
+            if rng.random() < write_ratio:
+                conn.execute("BEGIN IMMEDIATE" if immediate else "BEGIN")
+                conn.execute(
+                    "SELECT session_data FROM bench_session WHERE session_key = ?",
+                    (key,),
+                ).fetchone()
+                conn.execute(
+                    "UPDATE bench_session SET expire_date = ? WHERE session_key = ?",
+                    (time.time(), key),
+                )
+                conn.execute("COMMIT")
+                writes += 1
+            else:
+                conn.execute(
+                    "SELECT session_data FROM bench_session WHERE session_key = ?",
+                    (key,),
+                ).fetchone()
+                conn.execute(
+                    "SELECT COUNT(*) FROM bench_session WHERE expire_date > ?",
+                    (time.time() - 60,),
+                ).fetchone()
+                reads += 1
+        except sqlite3.OperationalError:
+            locked += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    conn.close()
+    results.put((reads, writes, locked))
+
+
+def run_benchmark(mode, workers, duration, rows, write_ratio):
+    """Exécute un mode ; renvoie ``(opérations/s, lectures, écritures, verrous)``."""
+    if mode == "optimisé":
+        pragmas, immediate = get_pragmas(), True
+    else:
+        pragmas, immediate = {}, False
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "bench.sqlite3")
+        _create_database(path, rows)
+        results = context.Queue()
+        # Démarrage commun après le lancement de tous les processus
+        deadline = time.time() + 1 + duration
+        processes = [
+            context.Process(
+                target=_worker,
+                args=(
+                    path,
+                    pragmas,
+                    immediate,
+                    deadline,
+                    rows,
+                    write_ratio,
+                    seed,
+                    results,
+                ),
+            )
+            for seed in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        totals = [results.get() for _ in processes]
+        for process in processes:
+            process.join()
+    reads = sum(t[0] for t in totals)
+    writes = sum(t[1] for t in totals)
+    locked = sum(t[2] for t in totals)
+    return (reads + writes) / duration, reads, writes, locked
+
+
+class Command(BaseCommand):
+    help = "Compare le débit SQLite concurrent avant/après WAL et pragmas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            nargs="+",
+            default=[1, 4],
+            help="Nombres de processus concurrents à tester (défaut : 1 4)",
+        )
+        parser.add_argument(
+            "--duration", type=float, default=3.0, help="Durée par mesure en secondes"
+        )
+        parser.add_argument(
+            "--write-ratio",
+            type=float,
+            default=0.2,
+            help="Part des opérations qui écrivent (défaut : 0.2)",
+        )
+        parser.add_argument(
+            "--rows", type=int, default=2000, help="Lignes de la table de test"
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'mode':<10} {'workers':>7} {'ops/s':>10} {'lectures':>9} "
+            f"{'écritures':>9} {'verrous':>8}"
+        )
+        for workers in options["workers"]:
+            for mode in MODES:
+                ops, reads, writes, locked = run_benchmark(
+                    mode,
+                    workers,
+                    options["duration"],
+                    options["rows"],
+                    options["write_ratio"],
+                )
+                line = (
+                    f"{mode:<10} {workers:>7} {ops:>10.0f} {reads:>9} "
+                    f"{writes:>9} {locked:>8}"
+                )
+                self.stdout.write(self.style.WARNING(line) if locked else line)
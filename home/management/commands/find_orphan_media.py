@@ -0,0 +1,60 @@
+"""
+Commande Django de détection des médias orphelins.
+
+    python manage.py find_orphan_media            # rapport seul (dry-run)
+    python manage.py find_orphan_media --delete   # suppression
+    python manage.py find_orphan_media -v 2       # liste de chaque fichier
+
+Un fichier de ``MEDIA_ROOT`` est orphelin s'il n'est référencé par aucun
+``FileField``/``ImageField`` (ou, pour ``derives/``, si son original ne
+l'est plus). Les fichiers modifiés depuis moins de ``--min-age`` heures
+sont ignorés.
+"""
+
+from django.core.management.base import BaseCommand
+
+from app.file_metadata import format_size
+from app.media_orphans import DEFAULT_MIN_AGE, delete_orphans, find_orphans
+
+
+class Command(BaseCommand):
+    help = "Signale (ou supprime avec --delete) les médias non référencés en base"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Supprime les fichiers orphelins (par défaut : rapport seul)",
+        )
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=DEFAULT_MIN_AGE / 3600,
+            help="Âge minimal en heures d'un fichier pour être traité (défaut : 24)",
+        )
+
+    def handle(self, *args, **options):
+        orphans = list(find_orphans(min_age=options["min_age"] * 3600))
+        total = sum(size for _, size in orphans)
+        if options["verbosity"] >= 2:
+            for name, size in orphans:
+                self.stdout.write(f"{name} ({format_size(size)})")
+
+        if not orphans:
+            self.stdout.write(self.style.SUCCESS("Aucun média orphelin."))
+            return
+        if not options["delete"]:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{len(orphans)} médias orphelins ({format_size(total)}). "
+                    "Relancer avec --delete pour les supprimer."
+                )
+            )
+            return
+        freed = delete_orphans(orphans)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(orphans)} médias orphelins supprimés, "
+                f"{format_size(freed)} libérés."
+            )
+        )
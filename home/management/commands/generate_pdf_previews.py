@@ -0,0 +1,49 @@
+"""
+Commande Django pour générer les aperçus (1re page) et le nombre de pages
+des PDF téléversés. À exécuter via cron : elle rattrape les aperçus que le
+thread de fond n'a pas pu produire (redémarrage de worker, anciens fichiers).
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from app.pdf_previews import PDF_PREVIEW_FIELDS, get_preview, process_instance
+from home.content_versions import bump
+
+
+class Command(BaseCommand):
+    help = "Génère les aperçus WebP et le nombre de pages des PDF téléversés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénère tous les aperçus, même à jour",
+        )
+
+    def handle(self, *args, **options):
+        rendered = 0
+        failed = 0
+        for model_label, field_name in PDF_PREVIEW_FIELDS:
+            model = apps.get_model(model_label)
+            created = 0
+            queryset = model.objects.exclude(**{field_name: ""}).exclude(
+                **{f"{field_name}__isnull": True}
+            )
+            for instance in queryset.iterator():
+                if not getattr(instance, field_name).name.lower().endswith(".pdf"):
+                    continue
+                missing = get_preview(getattr(instance, field_name)) is None
+                if process_instance(instance, field_name, force=options["force"]):
+                    rendered += 1
+                    created += missing
+                else:
+                    failed += 1
+            if created:
+                # Nouvelles vignettes : pages publiques à rendre à nouveau
+                bump(model)
+            self.stdout.write(f"{model_label}.{field_name} : traité")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{rendered} aperçus disponibles, {failed} échecs.")
+        )
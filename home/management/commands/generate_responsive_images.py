@@ -0,0 +1,67 @@
+"""
+Commande Django pour générer les variantes WebP/AVIF des images existantes.
+À exécuter une fois après déploiement, puis au besoin (ex: --force après
+modification des largeurs dans ``app.images.RESPONSIVE_WIDTHS``).
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from app.images import (
+    RESPONSIVE_IMAGE_FIELDS,
+    generate_derivatives,
+    get_available_formats,
+)
+from home.content_versions import bump
+
+
+class Command(BaseCommand):
+    help = "Génère les variantes responsives (WebP/AVIF) des images téléversées"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Régénère toutes les variantes, même à jour",
+        )
+
+    def handle(self, *args, **options):
+        formats = get_available_formats()
+        if not formats:
+            self.stdout.write(
+                self.style.ERROR("Pillow ne supporte ni WebP ni AVIF : abandon.")
+            )
+            return
+        self.stdout.write(
+            self.style.NOTICE(f"Formats disponibles : {', '.join(formats)}")
+        )
+
+        total_images = 0
+        total_variants = 0
+        processed = set()
+        for model_label, field_name in RESPONSIVE_IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            queryset = (
+                model.objects.exclude(**{field_name: ""})
+                .exclude(**{f"{field_name}__isnull": True})
+                .only("pk", field_name)
+            )
+            for instance in queryset.iterator():
+                variants = generate_derivatives(
+                    getattr(instance, field_name), force=options["force"]
+                )
+                total_images += 1
+                total_variants += sum(len(v) for v in variants.values())
+                processed.add(model_label)
+            self.stdout.write(f"{model_label}.{field_name} : traité")
+
+        # Fragments ``{% cachedcontent %}`` et ETag rendus sans srcset : à refaire
+        for model_label in sorted(processed):
+            bump(model_label)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total_images} images traitées, "
+                f"{total_variants} variantes disponibles."
+            )
+        )
@@ -0,0 +1,144 @@
+"""
+Commande Django d'entretien périodique (cron quotidien ou hebdomadaire).
+
+    python manage.py maintenance [--max-seconds 60] [--delete-orphans] [--vacuum]
+
+Étapes, dans l'ordre :
+
+1. ``sessions`` : suppression par lots des sessions expirées (bornée par
+   ``--max-seconds``), ``django_session`` ne grossit plus indéfiniment ;
+2. ``analytics`` : fichiers de statistiques au-delà de la rétention ;
+3. ``backups`` : archives au-delà des N plus récentes ;
+4. ``media`` : médias orphelins, signalés (supprimés avec ``--delete-orphans``) ;
+5. ``sqlite`` : vacuum incrémental, ``PRAGMA optimize`` et checkpoint WAL
+   (``--vacuum`` : conversion unique en ``auto_vacuum=INCREMENTAL``).
+
+Chaque étape affiche ce qu'elle a libéré.
+"""
+
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from app.file_metadata import format_size
+
+STEPS = ("sessions", "analytics", "backups", "media", "sqlite")
+
+
+def _dir_size(path):
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class Command(BaseCommand):
+    help = (
+        "Purge sessions expirées, statistiques et sauvegardes anciennes, "
+        "optimise SQLite"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-seconds",
+            type=float,
+            default=60.0,
+            help="Durée maximale de suppression des sessions (défaut : 60 s)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions supprimées par transaction (défaut : 1000)",
+        )
+        parser.add_argument(
+            "--backups-retention",
+            type=int,
+            default=4,
+            help="Nombre de sauvegardes conservées (défaut : 4)",
+        )
+        parser.add_argument(
+            "--delete-orphans",
+            action="store_true",
+            help="Supprime les médias orphelins (par défaut : simple rapport)",
+        )
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="VACUUM complet et passage en auto_vacuum incrémental (une fois)",
+        )
+        parser.add_argument(
+            "--skip",
+            nargs="+",
+            choices=STEPS,
+            default=[],
+            help="Étapes à ignorer",
+        )
+
+    def handle(self, *args, **options):
+        for step in STEPS:
+            if step in options["skip"]:
+                continue
+            message = getattr(self, f"step_{step}")(options)
+            self.stdout.write(f"{step} : {message}")
+        self.stdout.write(self.style.SUCCESS("Maintenance terminée."))
+
+    def step_sessions(self, options):
+        from app.sessions import SessionStore as BatchedSessionStore
+
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        if not issubclass(store, BatchedSessionStore):
+            # Autre moteur : purge native, sans lots
+            store.clear_expired()
+            return "sessions expirées supprimées"
+        deadline = time.monotonic() + options["max_seconds"]
+        deleted = store.clear_expired(
+            batch_size=options["batch_size"], deadline=deadline
+        )
+        suffix = " (limite de temps atteinte)" if time.monotonic() >= deadline else ""
+        return f"{deleted} sessions expirées supprimées{suffix}"
+
+    def step_analytics(self, options):
+        from analytics import analytics_data
+
+        directory = analytics_data.ANALYTICS_DIR
+        if not directory.exists():
+            return "aucun dossier"
+        before = _dir_size(directory)
+        deleted = analytics_data.purge_old_data()
+        freed = before - _dir_size(directory)
+        return f"{len(deleted)} fichiers supprimés, {format_size(freed)} libérés"
+
+    def step_backups(self, options):
+        from backup.utils import cleanup_old_backups, get_backup_dir
+
+        directory = get_backup_dir()
+        if not directory.exists():
+            return "aucun dossier"
+        before = _dir_size(directory)
+        deleted = cleanup_old_backups(retention_count=options["backups_retention"])
+        freed = before - _dir_size(directory)
+        return f"{len(deleted)} sauvegardes supprimées, {format_size(freed)} libérés"
+
+    def step_media(self, options):
+        from app.media_orphans import delete_orphans, find_orphans
+
+        orphans = list(find_orphans())
+        total = format_size(sum(size for _, size in orphans))
+        if not options["delete_orphans"]:
+            return f"{len(orphans)} médias orphelins ({total}), non supprimés"
+        freed = delete_orphans(orphans)
+        return (
+            f"{len(orphans)} médias orphelins supprimés, {format_size(freed)} libérés"
+        )
+
+    def step_sqlite(self, options):
+        from app.database import optimize_database
+
+        result = optimize_database(vacuum=options["vacuum"])
+        message = f"{format_size(result['freed_bytes'])} rendus au système"
+        if result["free_pages"] and result["auto_vacuum"] != 2:
+            message += (
+                f", {result['free_pages']} pages libres non récupérées "
+                "(relancer avec --vacuum)"
+            )
+        return message
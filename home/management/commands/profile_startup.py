@@ -0,0 +1,212 @@
+"""
+Commande Django de profilage du démarrage d'un worker.
+
+    python manage.py profile_startup [--path /] [--top 15] [--json]
+
+Lance un nouvel interpréteur avec ``python -X importtime`` qui reproduit
+le démarrage d'un worker Passenger/gunicorn : ``django.setup()`` (import
+des applications, ``ready()``), création de l'application WSGI
+(middlewares), chargement de l'URLconf (import de toutes les vues), puis
+une première requête (``--path``, ``/robots.txt`` par défaut : hors
+statistiques de visite).
+
+Affiche la durée de chaque phase, puis le temps d'import agrégé par
+paquet (applications du projet, Django, dépendances, bibliothèque
+standard) et les modules les plus coûteux.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Exécuté dans l'interpréteur profilé ; écrit les durées des phases en JSON
+# sur la sortie standard (``-X importtime`` écrit sur la sortie d'erreur)
+_PROBE = """
+import json, sys, time
+phases = {}
+start = time.perf_counter()
+import django
+django.setup()
+phases["setup"] = time.perf_counter() - start
+mark = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+phases["wsgi"] = time.perf_counter() - mark
+mark = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+phases["urlconf"] = time.perf_counter() - mark
+status = None
+path = sys.argv[1]
+if path:
+    import io
+    from django.conf import settings
+    hosts = [h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"]
+    host = hosts[0] if hosts else "localhost"
+    # Environnement WSGI minimal (django.test importerait unittest)
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": "",
+        "SCRIPT_NAME": "", "SERVER_NAME": host, "SERVER_PORT": "443",
+        "SERVER_PROTOCOL": "HTTP/1.1", "HTTP_HOST": host,
+        "REMOTE_ADDR": "127.0.0.1", "wsgi.url_scheme": "https",
+        "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr,
+        "wsgi.version": (1, 0), "wsgi.multithread": False,
+        "wsgi.multiprocess": True, "wsgi.run_once": False,
+    }
+    mark = time.perf_counter()
+    def start_response(s, headers, exc_info=None):
+        global status
+        status = s
+    response = application(environ, start_response)
+    b"".join(response)
+    response.close()
+    phases["first_request"] = time.perf_counter() - mark
+phases["total"] = time.perf_counter() - start
+print(json.dumps({"phases": phases, "status": status}))
+"""
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def parse_importtime(output):
+    """
+    Lit la sortie de ``-X importtime``.
+
+    Returns:
+        liste de tuples ``(module, temps propre µs, temps cumulé µs, profondeur)``.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def classify(module, project_packages):
+    """Catégorie d'un module : ``projet``, ``django``, ``stdlib`` ou ``dépendance``."""
+    top = module.split(".")[0]
+    if top in project_packages:
+        return "projet"
+    if top == "django":
+        return "django"
+    if top in sys.stdlib_module_names or top.startswith("_"):
+        return "stdlib"
+    return "dépendance"
+
+
+def aggregate_by_package(modules, project_packages):
+    """Temps d'import propre par paquet de premier niveau, trié du plus lent."""
+    totals = defaultdict(int)
+    for name, self_us, _, _ in modules:
+        totals[name.split(".")[0]] += self_us
+    return sorted(
+        (
+            {
+                "package": package,
+                "category": classify(package, project_packages),
+                "ms": round(us / 1000, 1),
+            }
+            for package, us in totals.items()
+        ),
+        key=lambda row: -row["ms"],
+    )
+
+
+def _project_packages():
+    base = Path(settings.BASE_DIR).resolve()
+    packages = set()
+    for entry in base.iterdir():
+        if (entry / "__init__.py").exists():
+            packages.add(entry.name)
+    return packages
+
+
+class Command(BaseCommand):
+    help = "Mesure le démarrage d'un worker (phases et temps d'import par paquet)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            default="/robots.txt",
+            help="Première requête à mesurer (défaut : /robots.txt ; vide pour aucune)",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="Paquets et modules affichés (défaut : 15)",
+        )
+        parser.add_argument("--json", action="store_true", help="Sortie JSON")
+
+    def handle(self, *args, **options):
+        env = dict(
+            os.environ,
+            DJANGO_SETTINGS_MODULE=os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "app.settings"
+            ),
+        )
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE, options["path"]],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        try:
+            probe = json.loads(result.stdout.strip().splitlines()[-1])
+        except (IndexError, ValueError):
+            raise CommandError(
+                "Échec du démarrage profilé :\n"
+                + "\n".join(result.stderr.splitlines()[-20:])
+            )
+
+        modules = parse_importtime(result.stderr)
+        project = _project_packages()
+        packages = aggregate_by_package(modules, project)
+        # Modules du projet importés directement par Django (applications,
+        # middlewares, URLconf) : leur temps cumulé inclut leurs dépendances
+        slowest = sorted(
+            (
+                {"module": name, "cumulative_ms": round(cumulative / 1000, 1)}
+                for name, _, cumulative, _ in modules
+                if classify(name, project) == "projet"
+            ),
+            key=lambda row: -row["cumulative_ms"],
+        )
+        report = {
+            "phases_ms": {k: round(v * 1000, 1) for k, v in probe["phases"].items()},
+            "first_request_status": probe["status"],
+            "imports_ms": round(sum(m[1] for m in modules) / 1000, 1),
+            "packages": packages[: options["top"]],
+            "project_modules": slowest[: options["top"]],
+        }
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write("Phases du démarrage :")
+        for phase, ms in report["phases_ms"].items():
+            self.stdout.write(f"  {phase:<14} {ms:>8} ms")
+        if report["first_request_status"]:
+            self.stdout.write(
+                f"  (première requête {options['path']} : {probe['status']})"
+            )
+        self.stdout.write(f"\nImports : {report['imports_ms']} ms au total\n")
+        self.stdout.write(f"{'paquet':<28} {'catégorie':<11} {'ms':>8}")
+        for row in report["packages"]:
+            self.stdout.write(
+                f"{row['package']:<28} {row['category']:<11} {row['ms']:>8}"
+            )
+        self.stdout.write(f"\n{'module du projet':<40} {'cumulé ms':>10}")
+        for row in report["project_modules"]:
+            self.stdout.write(f"{row['module']:<40} {row['cumulative_ms']:>10}")
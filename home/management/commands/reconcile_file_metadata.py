@@ -0,0 +1,49 @@
+"""
+Commande Django pour resynchroniser les métadonnées de fichiers en base.
+À exécuter après déploiement (remplissage initial) puis périodiquement (cron)
+pour détecter les fichiers supprimés, remplacés ou restaurés hors application.
+"""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from app.file_metadata import FILE_METADATA_FIELDS, refresh_metadata
+
+
+class Command(BaseCommand):
+    help = "Met à jour taille, date, SHA-256 et présence des fichiers téléversés"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rehash",
+            action="store_true",
+            help="Recalcule le SHA-256 même si taille et date sont inchangées",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        updated = 0
+        missing = []
+        for model_label, field_names in FILE_METADATA_FIELDS:
+            model = apps.get_model(model_label)
+            queryset = model.objects.only("pk", "file_metadata", *field_names)
+            for instance in queryset.iterator():
+                total += 1
+                if refresh_metadata(
+                    instance, field_names, force_hash=options["rehash"]
+                ):
+                    updated += 1
+                for field_name in field_names:
+                    metadata = instance.file_metadata.get(field_name)
+                    if metadata and not metadata["exists"]:
+                        missing.append(metadata["name"])
+            self.stdout.write(f"{model_label} : traité")
+
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f"Fichier absent : {name}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} objets vérifiés, {updated} mis à jour, "
+                f"{len(missing)} fichiers absents."
+            )
+        )
@@ -0,0 +1,227 @@
+"""
+Commande Django de mesure des chemins critiques (voir ``benchmarks``).
+
+    python manage.py run_benchmarks --output bench.json
+    python manage.py run_benchmarks --baseline bench.json --max-regression 20
+    python manage.py run_benchmarks --scenarios conseil search --volume 3
+
+Crée une base SQLite temporaire (migrations appliquées), la remplit avec
+des volumes réalistes (``--volume`` les multiplie) ainsi qu'un an de
+statistiques JSONL synthétiques dans un dossier temporaire, puis mesure
+chaque scénario avec le client de test. La base, les médias et les
+statistiques de production ne sont pas touchés : les autres alias de base
+(``readonly`` avec ``SQLITE_READ_ALIAS``) pointent sur la base temporaire
+le temps de la mesure, et la commande refuse de tourner si l'un d'eux
+n'est pas un miroir de ``default`` (``TEST["MIRROR"]``).
+
+Avec ``--baseline``, la commande échoue (code de sortie non nul) si un
+scénario régresse au-delà de ``--max-regression`` % ou exécute plus de
+requêtes SQL que la référence.
+"""
+
+import json
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from analytics import analytics_data, profiling
+from analytics import views as analytics_views
+from benchmarks import fixtures, runner
+from benchmarks.scenarios import SCENARIOS, get_scenarios
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure latence, requêtes SQL et mémoire des pages critiques "
+        "sur données synthétiques"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            metavar="NOM",
+            help="Scénarios à mesurer (défaut : tous) : "
+            + ", ".join(scenario.name for scenario in SCENARIOS),
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=5,
+            help="Mesures par scénario (défaut : 5)",
+        )
+        parser.add_argument(
+            "--volume",
+            type=float,
+            default=1.0,
+            help="Multiplicateur des volumes de données (défaut : 1)",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Vide le cache avant chaque mesure",
+        )
+        parser.add_argument("--output", help="Fichier JSON où écrire le rapport")
+        parser.add_argument("--baseline", help="Rapport JSON de référence à comparer")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=20.0,
+            help=(
+                "Hausse tolérée de la médiane par rapport à la référence, "
+                "en %% (défaut : 20)"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        try:
+            scenarios = get_scenarios(options["scenarios"])
+        except ValueError as e:
+            raise CommandError(e)
+        baseline = None
+        if options["baseline"]:
+            try:
+                baseline = json.loads(
+                    Path(options["baseline"]).read_text(encoding="utf-8")
+                )
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Référence illisible : {e}")
+
+        volumes = {
+            key: max(1, round(value * options["volume"]))
+            for key, value in fixtures.DEFAULT_VOLUMES.items()
+        }
+        # Un an de statistiques au plus : au-delà, admin_stats ne lit rien de plus
+        volumes["analytics_jours"] = min(volumes["analytics_jours"], 366)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report = self._run(Path(tmpdir), scenarios, volumes, options)
+
+        self._print_report(report)
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+            )
+            self.stdout.write(f"Rapport écrit dans {options['output']}")
+        if baseline is not None:
+            self._check_baseline(report, baseline, options["max_regression"])
+
+    def _run(self, workdir, scenarios, volumes, options):
+        analytics_dir = workdir / "analytics_data"
+        media_root = workdir / "media"
+        media_root.mkdir()
+
+        mirrors = self._mirror_aliases()
+        old_name = connection.settings_dict["NAME"]
+        test_settings = connection.settings_dict["TEST"]
+        old_test_name = test_settings.get("NAME")
+        test_settings["NAME"] = str(workdir / "bench.sqlite3")
+        old_mirror_settings = {
+            alias: connections[alias].settings_dict for alias in mirrors
+        }
+        setup_test_environment()
+        try:
+            connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+            # Lectures de ``readonly`` sur la base temporaire, pas la production
+            for alias in mirrors:
+                connections[alias].close()
+                connections[alias].creation.set_as_test_mirror(connection.settings_dict)
+            with (
+                override_settings(
+                    MEDIA_ROOT=str(media_root), BACKUP_ROOT=str(workdir / "backups")
+                ),
+                patch.object(analytics_data, "ANALYTICS_DIR", analytics_dir),
+                patch.object(analytics_views, "ANALYTICS_DIR", analytics_dir),
+                patch.object(profiling, "PROFILING_DIR", analytics_dir / "profiling"),
+            ):
+                cache.clear()
+                self.stdout.write("Création des données de mesure...")
+                counts = fixtures.seed_database(volumes)
+                counts["analytics"] = fixtures.seed_analytics(
+                    analytics_dir,
+                    volumes["analytics_jours"],
+                    volumes["analytics_par_jour"],
+                )
+                self.stdout.write(
+                    "  "
+                    + ", ".join(f"{name} : {count}" for name, count in counts.items())
+                )
+
+                admin = get_user_model().objects.create_superuser(
+                    "benchmark@example.com", "benchmark"
+                )
+                admin_client = Client()
+                admin_client.force_login(admin)
+
+                report = runner.run(
+                    scenarios,
+                    Client(),
+                    admin_client,
+                    workdir,
+                    iterations=options["iterations"],
+                    cold=options["cold"],
+                    meta={"volume": options["volume"], "counts": counts},
+                )
+                cache.clear()
+        except AssertionError as e:
+            raise CommandError(e)
+        finally:
+            for alias, settings_dict in old_mirror_settings.items():
+                connections[alias].close()
+                connections[alias].settings_dict = settings_dict
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings["NAME"] = old_test_name
+            teardown_test_environment()
+        return report
+
+    def _mirror_aliases(self):
+        """Alias autres que ``default`` ; erreur si l'un n'en est pas le miroir."""
+        aliases = [alias for alias in connections if alias != DEFAULT_DB_ALIAS]
+        for alias in aliases:
+            mirror = connections[alias].settings_dict.get("TEST", {}).get("MIRROR")
+            if mirror != DEFAULT_DB_ALIAS:
+                raise CommandError(
+                    f"Alias de base « {alias} » sans TEST['MIRROR'] = 'default' : "
+                    "la mesure lirait une autre base que la base temporaire."
+                )
+        return aliases
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"{'scénario':<18} {'médiane':>9} {'p95':>9} {'min':>9} "
+            f"{'SQL':>5} {'mémoire':>10}"
+        )
+        for name, result in report["results"].items():
+            self.stdout.write(
+                f"{name:<18} {result['median_ms']:>7} ms {result['p95_ms']:>6} ms "
+                f"{result['min_ms']:>6} ms {result['queries']:>5} "
+                f"{result['peak_memory_kb']:>7} Ko"
+            )
+
+    def _check_baseline(self, report, baseline, max_regression):
+        rows = runner.compare(report, baseline, max_regression)
+        regressions = [row for row in rows if row["regression"]]
+        for row in rows:
+            line = (
+                f"{row['name']:<18} {row['baseline_ms']:>7} → {row['median_ms']} ms "
+                f"({row['delta_pct']:+} %), "
+                f"SQL {row['baseline_queries']} → {row['queries']}"
+            )
+            self.stdout.write(self.style.ERROR(line) if row["regression"] else line)
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} scénario(s) en régression : "
+                + ", ".join(row["name"] for row in regressions)
+            )
+        self.stdout.write(
+            self.style.SUCCESS("Aucune régression par rapport à la référence")
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:48
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_pluisettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('label', models.CharField(max_length=100, unique=True, verbose_name='Modèle')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Version')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Modifié le')),
+            ],
+            options={
+                'verbose_name': 'Version de contenu',
+                'verbose_name_plural': 'Versions de contenu',
+            },
+        ),
+    ]
@@ -71,3 +71,24 @@ class StaticPage(models.Model):
             except Exception:
                 return self.url
         return self.url
+
+
+class ContentVersion(models.Model):
+    """
+    Numéro de version du contenu d'un modèle, incrémenté à chaque modification.
+
+    Sert de clé aux fragments de templates mis en cache (``{% cachedcontent %}``,
+    ``home.content_versions``). Stocké en base plutôt que dans le cache
+    Django : le ``LocMemCache`` n'est pas partagé entre workers.
+    """
+
+    label = models.CharField(max_length=100, unique=True, verbose_name="Modèle")
+    version = models.PositiveIntegerField(default=0, verbose_name="Version")
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name="Modifié le")
+
+    class Meta:
+        verbose_name = "Version de contenu"
+        verbose_name_plural = "Versions de contenu"
+
+    def __str__(self):
+        return f"{self.label} v{self.version}"
@@ -0,0 +1,60 @@
+import hashlib
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from home.content_versions import get_versions
+
+register = template.Library()
+
+
+class ContentCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, labels):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.labels = labels
+
+    def render(self, context):
+        if not getattr(settings, "CONTENT_FRAGMENT_CACHE", True):
+            return self.nodelist.render(context)
+        labels = [label.resolve(context) for label in self.labels]
+        versions = get_versions(labels)
+        state = "|".join(f"{label}={versions[label]}" for label in sorted(versions))
+        digest = hashlib.md5(state.encode(), usedforsecurity=False).hexdigest()
+        key = f"content-fragment:{self.fragment_name}:{digest}"
+        value = cache.get(key)
+        if value is None:
+            value = self.nodelist.render(context)
+            cache.set(key, value, None)
+        return value
+
+
+@register.tag("cachedcontent")
+def do_cachedcontent(parser, token):
+    """
+    Met en cache un fragment jusqu'à la modification d'un des modèles listés.
+
+    Usage :
+        {% load content_cache %}
+        {% cachedcontent "liens" "linktree.Lien" %}
+            ... liste coûteuse ...
+        {% endcachedcontent %}
+
+    La clé contient la version de contenu de chaque modèle
+    (``home.content_versions``) : pas d'expiration, le fragment est
+    reconstruit dès qu'un objet est créé, modifié ou supprimé. Le contenu
+    ne doit dépendre que de ces modèles (rien de propre à l'utilisateur).
+    Les données du fragment peuvent être passées paresseusement
+    (``QuerySet``, ``SimpleLazyObject``) : aucune requête en cas de succès.
+    """
+    nodelist = parser.parse(("endcachedcontent",))
+    parser.delete_first_token()
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' attend un nom de fragment et au moins un modèle."
+        )
+    fragment_name = bits[1].strip("'\"")
+    labels = [parser.compile_filter(bit) for bit in bits[2:]]
+    return ContentCacheNode(nodelist, fragment_name, labels)
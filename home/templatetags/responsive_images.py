@@ -0,0 +1,65 @@
+from django import template
+from django.utils.html import format_html, format_html_join
+
+from app.images import build_srcset, get_available_formats
+from app.pdf_previews import get_preview
+
+register = template.Library()
+
+DEFAULT_SIZES = "100vw"
+
+
+@register.simple_tag
+def responsive_image(field_file, sizes=DEFAULT_SIZES, **attrs):
+    """
+    Rend un ``<picture>`` avec des sources AVIF/WebP redimensionnées.
+
+    Usage :
+        {% responsive_image journal.cover alt="Couverture" sizes="300px" %}
+
+    Les attributs supplémentaires sont recopiés sur la balise ``<img>``
+    (qui pointe toujours vers l'original, en repli). Le ``<picture>`` est
+    rendu en ``display: contents`` pour ne pas perturber la mise en page
+    existante (tailles en %, sélecteurs parent/enfant).
+    """
+    if not field_file:
+        return ""
+
+    sources = []
+    for fmt in get_available_formats():
+        srcset = build_srcset(field_file, fmt)
+        if srcset:
+            sources.append((f"image/{fmt}", srcset, sizes))
+
+    img_attrs = format_html_join(
+        " ", '{}="{}"', ((key.replace("_", "-"), value) for key, value in attrs.items())
+    )
+    img = format_html('<img src="{}" {}>', field_file.url, img_attrs)
+    if not sources:
+        return img
+
+    return format_html(
+        '<picture style="display: contents">{}{}</picture>',
+        format_html_join("", '<source type="{}" srcset="{}" sizes="{}">', sources),
+        img,
+    )
+
+
+@register.simple_tag
+def responsive_srcset(field_file, fmt="webp"):
+    """Valeur ``srcset`` seule, pour les ``<img>`` qui ne peuvent être enveloppés."""
+    if not field_file:
+        return ""
+    return build_srcset(field_file, fmt)
+
+
+@register.simple_tag
+def pdf_preview(field_file):
+    """
+    Aperçu d'un PDF : dict ``url``/``page_count``/``width``/``height`` ou None.
+
+    Usage :
+        {% pdf_preview rapport.file as preview %}
+        {% if preview %}<img src="{{ preview.url }}" ...>{% endif %}
+    """
+    return get_preview(field_file)
@@ -1,8 +1,6 @@
-import re
-
 from django import template
-from django.utils.html import conditional_escape
-from django.utils.safestring import mark_safe
+
+from search.highlight import get_highlighter
 
 register = template.Library()
 
@@ -11,24 +9,14 @@ register = template.Library()
 def highlight(text, query):
     """
     Met en gras les termes de la recherche dans le texte.
+
+    Le motif (tous les mots de la requête, insensible à la casse et aux
+    accents) est compilé une fois par requête et le texte parcouru en une
+    seule passe ; voir ``search.highlight``.
     """
     if not text or not query:
         return text
-
-    # Échapper les caractères spéciaux de regex
-    escaped_query = re.escape(query)
-
-    # Remplacer les termes trouvés par leur version surlignée (insensible à la casse)
-    # On utilise une fonction de remplacement pour préserver la casse originale
-    # tout en échappant le HTML potentiel dans le texte
-    def _wrap_match(m):
-        return f'<mark class="bg-yellow-200 dark:bg-yellow-700 px-1 rounded">{conditional_escape(m.group(1))}</mark>'
-
-    highlighted = re.sub(
-        f"({escaped_query})", _wrap_match, str(text), flags=re.IGNORECASE
-    )
-
-    return mark_safe(highlighted)
+    return get_highlighter(query).highlight(text)
 
 
 @register.filter
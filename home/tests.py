@@ -6,7 +6,13 @@ from django.contrib.auth import get_user_model
 from django.core import mail
 from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 from django.urls import reverse
 
 from conseil_communautaire.models import ConseilVille
@@ -617,6 +623,47 @@ class ErrorHandlerTestCase(TestCase):
         self.assertIsNotNone(response.content)
 
 
+class CalendrierCollecteICSViewTestCase(SimpleTestCase):
+    """Tests pour le flux iCalendar de collecte"""
+
+    def test_ics_view_returns_calendar(self):
+        response = self.client.get(
+            reverse("calendrier_collecte_ics"), {"commune": "Anor"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        self.assertIn("max-age=86400", response["Cache-Control"])
+        self.assertIn("public", response["Cache-Control"])
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn(b"BEGIN:VCALENDAR", response.content)
+
+    def test_ics_view_returns_304_on_matching_etag(self):
+        url = reverse("calendrier_collecte_ics")
+        first = self.client.get(url, {"commune": "Anor"})
+        response = self.client.get(
+            url, {"commune": "Anor"}, HTTP_IF_NONE_MATCH=first["ETag"]
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertIn("max-age=86400", response["Cache-Control"])
+
+    def test_ics_view_missing_commune(self):
+        response = self.client.get(reverse("calendrier_collecte_ics"))
+        self.assertEqual(response.status_code, 400)
+
+    def test_ics_view_unknown_commune(self):
+        response = self.client.get(
+            reverse("calendrier_collecte_ics"), {"commune": "Atlantis"}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_ics_view_rejects_post(self):
+        response = self.client.post(
+            reverse("calendrier_collecte_ics"), {"commune": "Anor"}
+        )
+        self.assertEqual(response.status_code, 405)
+
+
 @override_settings(MEDIA_ROOT="test_media_home")
 class EdgeCasesTestCase(TestCase):
     """Tests pour les cas particuliers et la couverture complète"""
@@ -930,3 +977,351 @@ class AdminPLUISettingsTestCase(TestCase):
         self.assertEqual(response.status_code, 302)
         settings = PLUISettings.load()
         self.assertFalse(settings.modification_simplifiee_1_visible)
+
+
+class MaintenanceCommandTestCase(TestCase):
+    """Commande ``maintenance`` : purge par lots et rapport."""
+
+    def _create_sessions(self, expired, fresh):
+        from datetime import timedelta
+
+        from django.contrib.sessions.models import Session
+        from django.utils import timezone
+
+        now = timezone.now()
+        for i in range(expired):
+            Session.objects.create(
+                session_key=f"expired{i}",
+                session_data="",
+                expire_date=now - timedelta(days=1),
+            )
+        for i in range(fresh):
+            Session.objects.create(
+                session_key=f"fresh{i}",
+                session_data="",
+                expire_date=now + timedelta(days=1),
+            )
+
+    def _run(self, **options):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("maintenance", stdout=out, **options)
+        return out.getvalue()
+
+    def test_expired_sessions_deleted_in_batches(self):
+        from django.contrib.sessions.models import Session
+
+        self._create_sessions(expired=5, fresh=2)
+        output = self._run(
+            skip=["analytics", "backups", "media", "sqlite"], batch_size=2
+        )
+        self.assertIn("5 sessions expirées supprimées", output)
+        self.assertEqual(
+            sorted(Session.objects.values_list("session_key", flat=True)),
+            ["fresh0", "fresh1"],
+        )
+
+    def test_session_purge_is_time_boxed(self):
+        from django.contrib.sessions.models import Session
+
+        self._create_sessions(expired=3, fresh=0)
+        output = self._run(
+            skip=["analytics", "backups", "media", "sqlite"], max_seconds=0
+        )
+        self.assertIn("limite de temps atteinte", output)
+        self.assertEqual(Session.objects.count(), 3)
+
+    def test_old_backups_pruned(self):
+        import tempfile
+        from pathlib import Path
+
+        with tempfile.TemporaryDirectory() as backup_dir:
+            for i in range(3):
+                path = Path(backup_dir) / f"backup_2026010{i}_000000.zip"
+                path.write_bytes(b"x" * 1024)
+                os.utime(path, (i, i))
+            with override_settings(BACKUP_ROOT=backup_dir):
+                output = self._run(
+                    skip=["sessions", "analytics", "media", "sqlite"],
+                    backups_retention=1,
+                )
+            self.assertIn("2 sauvegardes supprimées, 2.0 Ko libérés", output)
+            self.assertEqual(os.listdir(backup_dir), ["backup_20260102_000000.zip"])
+
+
+class MaintenanceSQLiteTestCase(TransactionTestCase):
+    """``PRAGMA optimize`` et checkpoint exigent d'être hors transaction."""
+
+    def test_sqlite_step_reports_reclaimed_space(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command(
+            "maintenance",
+            skip=["sessions", "analytics", "backups", "media"],
+            stdout=out,
+        )
+        self.assertIn("rendus au système", out.getvalue())
+
+
+@override_settings(CONTENT_FRAGMENT_CACHE=True)
+class ContentFragmentCacheTestCase(TestCase):
+    """Tests des fragments mis en cache sous une version de contenu"""
+
+    def setUp(self):
+        cache.clear()
+        self.city = ConseilVille.objects.create(
+            city_name="Fourmies",
+            mayor_first_name="Jean",
+            mayor_last_name="Dupont",
+            address="1 rue de la Mairie",
+            postal_code="59610",
+            phone_number="0321234567",
+            image="villes/fourmies.jpg",
+            nb_habitants=10000,
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_bump_creates_then_increments_version(self):
+        from .content_versions import bump
+        from .models import ContentVersion
+
+        bump("test.modele")
+        bump("test.modele")
+        self.assertEqual(ContentVersion.objects.get(label="test.modele").version, 2)
+
+    def test_get_versions_defaults_to_zero(self):
+        from .content_versions import get_versions
+
+        self.assertEqual(get_versions(["test.inconnu"]), {"test.inconnu": "0"})
+
+    def test_save_and_m2m_change_bump_versions(self):
+        from bureau_communautaire.models import Elus
+        from commissions.models import Commission
+
+        from .content_versions import get_versions
+
+        labels = ["bureau_communautaire.elus", "commissions.commission"]
+        before = get_versions(labels)
+        commission = Commission.objects.create(
+            title="Environnement", icon="<svg></svg>"
+        )
+        elu = Elus.objects.create(
+            first_name="Anne", last_name="Martin", picture="elus/a.jpg", city=self.city
+        )
+        after_save = get_versions(labels)
+        self.assertNotEqual(
+            before["commissions.commission"], after_save["commissions.commission"]
+        )
+
+        elu.linked_commission.add(commission)
+        after_m2m = get_versions(labels)
+        for label in labels:
+            self.assertNotEqual(after_save[label], after_m2m[label])
+
+    def test_fragment_served_from_cache_until_content_changes(self):
+        from conseil_communautaire.models import ConseilMembre
+
+        url = reverse("conseil_communautaire:conseil")
+        ConseilMembre.objects.create(
+            first_name="Paul", last_name="Durand", city=self.city
+        )
+        first = self.client.get(url)
+        self.assertContains(first, "Paul DURAND")
+
+        with self.assertNumQueries(3):
+            # villes (compteur), conseils, versions de contenu : pas de membres
+            cached = self.client.get(url)
+        self.assertContains(cached, "Paul DURAND")
+
+        ConseilMembre.objects.create(
+            first_name="Lucie", last_name="Petit", city=self.city
+        )
+        self.assertContains(self.client.get(url), "Lucie PETIT")
+
+    def test_mandat_change_rebuilds_commissions_grid(self):
+        from commissions.models import Mandat
+
+        url = reverse("commissions:commissions")
+        mandat = Mandat.objects.create(start_year=2020, end_year=2026)
+        self.assertContains(self.client.get(url), "2020-2026")
+        mandat.end_year = 2027
+        mandat.save()
+        self.assertContains(self.client.get(url), "2020-2027")
+
+    def test_conditional_page_models_are_tracked_statically(self):
+        from django.core.exceptions import ImproperlyConfigured
+
+        from app.conditional import conditional_page
+
+        from .content_versions import untracked
+
+        labels = [
+            "journal.Journal",
+            "partenaires.Partenaire",
+            "partenaires.CategoriePartenaire",
+            "linktree.Lien",
+            "competences.Competence",
+            "rapports_activite.RapportActivite",
+            "semestriels.SemestrielPage",
+            "conseil_communautaire.ConseilVille",
+        ]
+        self.assertEqual(untracked(labels), [])
+        with self.assertRaises(ImproperlyConfigured):
+            conditional_page("home.StaticPage")
+
+    def test_tag_requires_fragment_name_and_model(self):
+        from django.template import Template, TemplateSyntaxError
+
+        with self.assertRaises(TemplateSyntaxError):
+            Template(
+                '{% load content_cache %}{% cachedcontent "x" %}{% endcachedcontent %}'
+            )
+
+
+class BenchmarksTestCase(TestCase):
+    """Banc de mesure ``benchmarks`` : données synthétiques, mesures, comparaison."""
+
+    def test_seed_and_measure_public_page(self):
+        import tempfile
+        from pathlib import Path
+
+        from benchmarks import fixtures, runner
+        from benchmarks.scenarios import get_scenarios
+
+        volumes = dict(
+            fixtures.DEFAULT_VOLUMES,
+            communes=3,
+            journaux=5,
+            partenaires=5,
+            competences=4,
+        )
+        counts = fixtures.seed_database(volumes)
+        self.assertEqual(counts["ConseilVille"], 3)
+        self.assertEqual(counts["ConseilMembre"], 3 * volumes["membres_par_commune"])
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.assertEqual(fixtures.seed_analytics(Path(tmpdir), 2, 10), 20)
+            self.assertEqual(len(list(Path(tmpdir).glob("*.jsonl"))), 2)
+            report = runner.run(
+                get_scenarios(["conseil"]),
+                Client(),
+                Client(),
+                Path(tmpdir),
+                iterations=2,
+            )
+
+        result = report["results"]["conseil"]
+        self.assertEqual(
+            set(result), {"median_ms", "p95_ms", "min_ms", "queries", "peak_memory_kb"}
+        )
+        self.assertGreater(result["queries"], 0)
+        self.assertEqual(report["meta"]["iterations"], 2)
+
+    def test_unknown_scenario_rejected(self):
+        from benchmarks.scenarios import get_scenarios
+
+        with self.assertRaises(ValueError):
+            get_scenarios(["inexistant"])
+
+    def test_compare_flags_slower_or_chattier_scenarios(self):
+        from benchmarks.runner import compare
+
+        baseline = {
+            "results": {
+                "a": {"median_ms": 100, "queries": 5},
+                "b": {"median_ms": 100, "queries": 5},
+                "c": {"median_ms": 100, "queries": 5},
+            }
+        }
+        report = {
+            "results": {
+                "a": {"median_ms": 110, "queries": 5},
+                "b": {"median_ms": 130, "queries": 5},
+                "c": {"median_ms": 90, "queries": 6},
+                "nouveau": {"median_ms": 1, "queries": 1},
+            }
+        }
+        rows = {
+            row["name"]: row for row in compare(report, baseline, max_regression=20)
+        }
+        self.assertEqual(set(rows), {"a", "b", "c"})
+        self.assertFalse(rows["a"]["regression"])
+        self.assertTrue(rows["b"]["regression"])
+        self.assertTrue(rows["c"]["regression"])
+        self.assertEqual(rows["b"]["delta_pct"], 30.0)
+
+    def test_other_aliases_must_mirror_default(self):
+        from types import SimpleNamespace
+
+        from django.core.management import CommandError
+
+        from .management.commands.run_benchmarks import Command
+
+        def alias(test):
+            return SimpleNamespace(settings_dict={"TEST": test})
+
+        mirrored = {"default": alias({}), "readonly": alias({"MIRROR": "default"})}
+        with patch("home.management.commands.run_benchmarks.connections", mirrored):
+            self.assertEqual(Command()._mirror_aliases(), ["readonly"])
+
+        separate = {"default": alias({}), "readonly": alias({})}
+        with patch("home.management.commands.run_benchmarks.connections", separate):
+            with self.assertRaises(CommandError):
+                Command()._mirror_aliases()
+
+    def test_capture_queries_counts_every_alias(self):
+        from django.db import connections
+
+        from app.database import capture_queries
+
+        with capture_queries() as queries:
+            ConseilVille.objects.count()
+            connections["default"].cursor().execute("SELECT 1")
+        self.assertEqual(len(queries), 2)
+
+
+class ProfileStartupCommandTestCase(SimpleTestCase):
+    """Lecture de ``-X importtime`` par ``profile_startup``."""
+
+    OUTPUT = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       300 |        300 |     _json\n"
+        "import time:      1000 |       1300 |   json\n"
+        "import time:      2000 |       2000 |     django.utils\n"
+        "import time:       500 |       2500 |   django\n"
+        "import time:      4000 |       7800 | home.views\n"
+    )
+
+    def test_parse_and_aggregate(self):
+        from home.management.commands.profile_startup import (
+            aggregate_by_package,
+            parse_importtime,
+        )
+
+        modules = parse_importtime(self.OUTPUT)
+        self.assertEqual(modules[0], ("_json", 300, 300, 2))
+        self.assertEqual(modules[-1], ("home.views", 4000, 7800, 0))
+
+        rows = aggregate_by_package(modules, {"home"})
+        self.assertEqual(
+            rows,
+            [
+                {"package": "home", "category": "projet", "ms": 4.0},
+                {"package": "django", "category": "django", "ms": 2.5},
+                {"package": "json", "category": "stdlib", "ms": 1.0},
+                {"package": "_json", "category": "stdlib", "ms": 0.3},
+            ],
+        )
+
+    def test_third_party_packages(self):
+        from home.management.commands.profile_startup import classify
+
+        self.assertEqual(classify("watson.search", {"home"}), "dépendance")
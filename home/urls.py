@@ -68,6 +68,12 @@ urlpatterns = [
         views.telecharger_calendrier_verre,
         name="telecharger_calendrier_verre",
     ),
+    # Abonnement agenda (.ics) aux collectes
+    path(
+        "collecte/calendrier.ics",
+        views.calendrier_collecte_ics,
+        name="calendrier_collecte_ics",
+    ),
 ]
 
 if settings.DEBUG:
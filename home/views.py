@@ -10,13 +10,16 @@ from django.db.models import Count, Sum
 from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render
 from django.template.loader import render_to_string
-from django.views.decorators.cache import cache_page
+from django.views.decorators.cache import cache_control, cache_page
+from django.views.decorators.http import condition, require_safe
 
+from app.context_processors import get_all_cities
 from app.utils import get_client_ip, hash_ip, normalize_filename, rate_limit
 from conseil_communautaire.models import ConseilVille
 from contact.forms import ContactForm
 from contact.models import ContactEmail
 from home.data.collecte_data import city_data, get_dates_verre, get_jour_ordures
+from home.data.collecte_ics import get_calendrier_ics
 from home.models import PLUISettings
 from journal.models import Journal
 
@@ -34,10 +37,8 @@ def home(request):
     )
     nb_communes = communes_stats["nb"] or 0
     nb_habitants = communes_stats["total_hab"] or 0
-    communes = list(
-        ConseilVille.objects.only("city_name", "slug").order_by("city_name")
-    )
-    communes = communes if communes else None
+    # Même liste que le menu : une seule requête pour la page
+    communes = get_all_cities() or None
 
     # Récupérer le dernier journal (trié par numéro décroissant)
     dernier_journal = Journal.objects.order_by("-number").first()
@@ -192,10 +193,8 @@ def presentation(request):
     )
     nb_communes = communes_stats["nb"] or 0
     nb_habitants = communes_stats["total_hab"] or 0
-    communes = list(
-        ConseilVille.objects.only("city_name", "slug").order_by("city_name")
-    )
-    communes = communes if communes else None
+    # Même liste que le menu : une seule requête pour la page
+    communes = get_all_cities() or None
 
     context = {
         "communes": communes,
@@ -257,7 +256,7 @@ def plui(request):
         request,
         "plui",
         "home/plui.html",
-        extra_context={"plui_settings": PLUISettings.get_solo()},
+        extra_context={"plui_settings": PLUISettings.get_cached()},
     )
 
 
@@ -385,7 +384,7 @@ def documents_plui(request):
 
 def modification_simplifiee_1(request):
     """Vue pour la page Modification Simplifiée n°1 du PLUi."""
-    settings = PLUISettings.get_solo()
+    settings = PLUISettings.get_cached()
     if not settings or not settings.modification_simplifiee_1_visible:
         raise Http404("Page non disponible")
     return render(request, "home/modification-simplifiee-1.html")
@@ -769,3 +768,47 @@ def telecharger_calendrier_verre(request):
         response["Content-Disposition"] = f'attachment; filename="{filename}"'
 
     return response
+
+
+def _calendrier_ics_etag(request):
+    calendrier = get_calendrier_ics(
+        request.GET.get("commune", ""), request.GET.get("rue", "")
+    )
+    return calendrier.etag if calendrier else None
+
+
+@require_safe
+@cache_control(public=True, max_age=60 * 60 * 24)
+@condition(etag_func=_calendrier_ics_etag)
+def calendrier_collecte_ics(request):
+    """
+    Flux iCalendar (.ics) de collecte du verre et des ordures ménagères.
+
+    Alternative légère au PDF de ``telecharger_calendrier_verre`` : le flux
+    est pré-rendu une fois par processus (``get_calendrier_ics``) et servi
+    avec un ETag fort. Les applications d'agenda qui s'y abonnent
+    revalident avec ``If-None-Match`` et reçoivent un 304 sans corps.
+    Pas de rate limit : le coût d'une réponse est négligeable.
+    """
+    commune = request.GET.get("commune", "")
+    rue = request.GET.get("rue", "")
+
+    if not commune:
+        return HttpResponse(
+            b"Parametre 'commune' requis", status=400, content_type="text/plain"
+        )
+
+    calendrier = get_calendrier_ics(commune, rue)
+    if calendrier is None:
+        return HttpResponse(
+            f"Aucun calendrier de collecte trouve pour {commune}".encode("utf-8"),
+            status=404,
+            content_type="text/plain",
+        )
+
+    response = HttpResponse(
+        calendrier.content, content_type="text/calendar; charset=utf-8"
+    )
+    response["Content-Language"] = "fr"
+    response["Content-Disposition"] = f'inline; filename="{calendrier.filename}"'
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-19 14:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('journal', '0003_alter_journal_cover_alter_journal_release_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='journal',
+            name='file_metadata',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.core.exceptions import ValidationError
 from django.core.validators import FileExtensionValidator
 from django.db import models
 
+from app import file_metadata
+
 
 def validate_taille_fichier(value):
     max_upload_size = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
@@ -34,29 +36,16 @@ class Journal(models.Model):
 
     number = models.IntegerField(default=0, db_index=True)  # Numéro du journal
     page_number = models.IntegerField(default=0)  # Nombre de pages du journal
+    # Taille, date et SHA-256 des fichiers (voir app.file_metadata)
+    file_metadata = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return self.title
 
     def get_document_size(self):
-        """Retourne la taille du document ou 'Indisponible' si le fichier est absent."""
-        try:
-            ko_size = self.document.size / 1024
-            if ko_size > 1024:
-                return f"{ko_size / 1024:.1f} Mo"
-            else:
-                return f"{ko_size:.1f} Ko"
-        except (FileNotFoundError, ValueError, OSError):
-            return False
+        """Retourne la taille du document, ou False si le fichier est absent."""
+        return file_metadata.format_size(file_metadata.file_size(self, "document"))
 
     def get_cover_size(self):
-        """Retourne la taille de la couverture ou 'Indisponible' si \
-            le fichier est absent."""
-        try:
-            ko_size = self.cover.size / 1024
-            if ko_size > 1024:
-                return f"{ko_size / 1024:.1f} Mo"
-            else:
-                return f"{ko_size:.1f} Ko"
-        except (FileNotFoundError, ValueError, OSError):
-            return False
+        """Retourne la taille de la couverture, ou False si le fichier est absent."""
+        return file_metadata.format_size(file_metadata.file_size(self, "cover"))
@@ -1,12 +1,15 @@
+import hashlib
 import os
 import shutil
 from datetime import date
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest import mock
 
 from django.contrib import messages
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth import get_user_model
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from PIL import Image
@@ -730,9 +733,11 @@ class JournalModelTestCase(TestCase):
             cover=self.cover_file,
         )
 
-        # Supprimer le fichier physique
+        # Supprimer le fichier physique puis resynchroniser les métadonnées
         if os.path.exists(journal.document.path):
             os.remove(journal.document.path)
+        call_command("reconcile_file_metadata", stdout=StringIO())
+        journal.refresh_from_db()
 
         size = journal.get_document_size()
         self.assertFalse(size)
@@ -786,13 +791,50 @@ class JournalModelTestCase(TestCase):
             cover=self.cover_file,
         )
 
-        # Supprimer le fichier physique
+        # Supprimer le fichier physique puis resynchroniser les métadonnées
         if os.path.exists(journal.cover.path):
             os.remove(journal.cover.path)
+        call_command("reconcile_file_metadata", stdout=StringIO())
+        journal.refresh_from_db()
 
         size = journal.get_cover_size()
         self.assertFalse(size)
 
+    def test_file_metadata_filled_on_save(self):
+        """Taille, date et SHA-256 sont calculés à l'enregistrement"""
+        journal = Journal.objects.create(
+            title="Test Journal",
+            number=1,
+            release_date=date(2024, 1, 1),
+            document=self.document_file,
+            cover=self.cover_file,
+        )
+        journal.refresh_from_db()
+        document = journal.file_metadata["document"]
+        self.assertTrue(document["exists"])
+        self.assertEqual(document["size"], len(self.document_content))
+        self.assertEqual(
+            document["sha256"], hashlib.sha256(self.document_content).hexdigest()
+        )
+        self.assertEqual(
+            journal.file_metadata["cover"]["size"], len(self.image_content)
+        )
+
+    def test_get_document_size_reads_metadata_without_stat(self):
+        """Le rendu des tailles ne touche pas au système de fichiers"""
+        journal = Journal.objects.create(
+            title="Test Journal",
+            number=1,
+            release_date=date(2024, 1, 1),
+            document=self.document_file,
+            cover=self.cover_file,
+        )
+        journal = Journal.objects.get(pk=journal.pk)
+        with mock.patch("os.stat") as stat_mock:
+            self.assertIn("Ko", journal.get_document_size())
+            self.assertIn("Ko", journal.get_cover_size())
+        stat_mock.assert_not_called()
+
     def test_journal_default_values(self):
         """Test des valeurs par défaut du modèle"""
         journal = Journal(
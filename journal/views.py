@@ -4,12 +4,14 @@ from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
 from app.utils import secure_file_removal_by_path
 
 from .forms import JournalForm
 from .models import Journal
 
 
+@conditional_page("journal.Journal")
 def journal(request):
     journals = Journal.objects.all().order_by("-number")
     paginator = Paginator(journals, 3)
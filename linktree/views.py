@@ -2,10 +2,13 @@ from django.contrib import messages
 from django.contrib.auth.decorators import permission_required
 from django.shortcuts import get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
+
 from .forms import LienForm
 from .models import Lien
 
 
+@conditional_page("linktree.Lien")
 def linktree_page(request):
     """Vue publique de la page LinkTree"""
     liens = Lien.objects.filter(actif=True).order_by('ordre', 'titre')
@@ -4,6 +4,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
 from app.utils import remove_accents
 
 from .forms import CategoriePartenaireForm, PartenaireForm
@@ -12,6 +13,7 @@ from .models import CategoriePartenaire, Partenaire
 # ==================== VUES PUBLIQUES ====================
 
 
+@conditional_page("partenaires.Partenaire", "partenaires.CategoriePartenaire")
 def partenaires(request):
     """Vue publique affichant tous les partenaires actifs groupés par catégorie"""
     all_partenaires = list(
@@ -2,6 +2,7 @@ from django.contrib.auth.decorators import permission_required
 from django.db import transaction
 from django.shortcuts import get_list_or_404, get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
 from app.utils import secure_file_removal
 
 from .forms import RapportActiviteForm
@@ -14,6 +15,7 @@ modifier_rapport = "rapports_activite/admin-rapport-edit.html"
 supprimer_rapport = "rapports_activite/admin-rapport-delete.html"
 
 
+@conditional_page("rapports_activite.RapportActivite")
 def rapports_activite(request):
     """
     View function to render the 'rapports_activite' page.
@@ -5,3 +5,11 @@ class SearchAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "search"
     verbose_name = "Recherche"
+
+    def ready(self):
+        from search import index_queue, result_cache
+
+        # Invalidation du cache de résultats à chaque mise à jour de l'index
+        result_cache.connect_signals()
+        # Réindexation groupée après commit (remplace SearchContextMiddleware)
+        index_queue.install()
@@ -0,0 +1,166 @@
+"""
+Moteur de recherche plein texte SQLite FTS5.
+
+Sous SQLite, django-watson recherche par ``LIKE``/regex sur toute la table
+``watson_searchentry``. On maintient à côté une table virtuelle FTS5
+``search_fts`` à contenu externe (les textes restent dans
+``watson_searchentry``, seul l'index inversé est stocké) :
+
+- tokenisation ``unicode61 remove_diacritics 2`` : « dechets » trouve
+  « déchets », insensible à la casse ;
+- classement BM25 (titre > description > contenu) ;
+- extraits surlignés via ``snippet()`` ;
+- ``LIMIT``/``OFFSET`` exécutés en SQL.
+
+L'index est synchronisé par des triggers SQLite sur ``watson_searchentry``
+(migration ``0004_search_fts``) : tout modèle enregistré auprès de watson
+est donc couvert sans code supplémentaire. La commande ``rebuild_search_index``
+reconstruit l'ensemble.
+
+Si la base n'est pas SQLite ou si FTS5 n'est pas disponible, le service de
+recherche se rabat sur ``watson.search``.
+"""
+
+import logging
+import re
+from typing import NamedTuple
+
+from django.db import DatabaseError, connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = "search_fts"
+ENGINE_SLUG = "default"
+# Poids BM25 des colonnes (title, description, content)
+BM25_WEIGHTS = (10.0, 4.0, 1.0)
+SNIPPET_TOKENS = 24
+
+# Délimiteurs de surlignage de snippet() : caractères de contrôle absents
+# des textes indexés, remplacés par <mark> après échappement HTML
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+MARK_HTML = '<mark class="bg-yellow-200 dark:bg-yellow-700 px-1 rounded">'
+
+_TERM_RE = re.compile(r"\w+")
+_available = None
+
+
+class SearchHit(NamedTuple):
+    """Résultat de recherche (mêmes attributs que ``SearchEntry``)."""
+
+    id: int
+    app_label: str
+    model_name: str
+    object_id: str
+    title: str
+    description: str
+    url: str
+    snippet: str
+    rank: float
+    # Titre tronqué et surligné, calculé pour la page affichée
+    title_html: str = ""
+
+
+def is_available():
+    """FTS5 est-il utilisable (base SQLite et table ``search_fts`` présente) ?"""
+    global _available
+    if connection.vendor != "sqlite":
+        return False
+    if _available is None:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+                    [FTS_TABLE],
+                )
+                _available = cursor.fetchone() is not None
+        except DatabaseError:
+            _available = False
+    return _available
+
+
+def reset_availability():
+    """Oublie le résultat de ``is_available()`` (après création/suppression)."""
+    global _available
+    _available = None
+
+
+def build_match_expression(query):
+    """
+    Traduit la saisie utilisateur en expression ``MATCH`` FTS5.
+
+    Chaque mot devient un préfixe entre guillemets (``"dech"*``), tous
+    requis (ET implicite). Les opérateurs FTS5 saisis par l'utilisateur
+    (``OR``, ``NEAR``, ``-``...) sont ainsi neutralisés.
+
+    Returns:
+        l'expression, ou "" si la requête ne contient aucun mot.
+    """
+    terms = _TERM_RE.findall(query or "")
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _snippet_html(raw):
+    html = escape(raw).replace(_MARK_START, MARK_HTML).replace(_MARK_END, "</mark>")
+    return mark_safe(html)
+
+
+def count(query):
+    """Nombre de résultats pour ``query``."""
+    match = build_match_expression(query)
+    if not match:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT COUNT(*)
+            FROM {FTS_TABLE}
+            JOIN watson_searchentry AS e ON e.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH %s AND e.engine_slug = %s
+            """,
+            [match, ENGINE_SLUG],
+        )
+        return cursor.fetchone()[0]
+
+
+def search(query, limit, offset=0):
+    """
+    Résultats classés (BM25) pour ``query``, fenêtre ``[offset, offset+limit)``.
+
+    Returns:
+        liste de ``SearchHit``.
+    """
+    match = build_match_expression(query)
+    if not match or limit <= 0:
+        return []
+    weights = ", ".join(str(w) for w in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT e.id, ct.app_label, ct.model, e.object_id, e.title,
+                   e.description, e.url,
+                   snippet({FTS_TABLE}, -1, %s, %s, '…', {SNIPPET_TOKENS}),
+                   bm25({FTS_TABLE}, {weights}) AS rank
+            FROM {FTS_TABLE}
+            JOIN watson_searchentry AS e ON e.id = {FTS_TABLE}.rowid
+            JOIN django_content_type AS ct ON ct.id = e.content_type_id
+            WHERE {FTS_TABLE} MATCH %s AND e.engine_slug = %s
+            ORDER BY rank, e.id
+            LIMIT %s OFFSET %s
+            """,
+            [_MARK_START, _MARK_END, match, ENGINE_SLUG, limit, offset],
+        )
+        rows = cursor.fetchall()
+    return [
+        SearchHit(*row[:7], snippet=_snippet_html(row[7] or ""), rank=row[8])
+        for row in rows
+    ]
+
+
+def rebuild():
+    """Reconstruit l'index FTS5 depuis ``watson_searchentry`` puis l'optimise."""
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
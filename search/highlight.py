@@ -0,0 +1,85 @@
+"""
+Surlignage des termes recherchés dans les résultats.
+
+Un ``Highlighter`` est compilé une seule fois par requête normalisée (cache
+LRU) : une unique expression régulière en alternance couvre tous les mots
+de la requête, insensible à la casse et aux accents (« dechets » surligne
+« Déchets »). Le texte est parcouru en une passe, les segments hors
+correspondance étant échappés au passage.
+
+Comme l'index FTS5, un terme correspond au début d'un mot : « dech »
+surligne le mot « déchets » entier.
+"""
+
+import re
+from functools import lru_cache
+
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from search.fts import MARK_HTML
+from search.services import normalize_query
+
+# Variantes accentuées des lettres de base (le texte n'est pas replié)
+_ACCENT_VARIANTS = {
+    "a": "aàâäáãå",
+    "c": "cç",
+    "e": "eéèêë",
+    "i": "iîïíì",
+    "n": "nñ",
+    "o": "oôöóòõ",
+    "u": "uùûüú",
+    "y": "yÿý",
+}
+_TERM_RE = re.compile(r"\w+")
+
+
+def _char_pattern(char):
+    variants = _ACCENT_VARIANTS.get(char)
+    return f"[{variants}]" if variants else re.escape(char)
+
+
+class Highlighter:
+    """Surligne en une passe les mots commençant par un terme de la requête."""
+
+    __slots__ = ("terms", "pattern")
+
+    def __init__(self, query):
+        terms = dict.fromkeys(_TERM_RE.findall(normalize_query(query)))
+        # Termes longs d'abord : « plui » avant « pl » dans l'alternance
+        self.terms = tuple(sorted(terms, key=len, reverse=True))
+        if self.terms:
+            alternation = "|".join(
+                "".join(_char_pattern(char) for char in term) for term in self.terms
+            )
+            self.pattern = re.compile(rf"(?<!\w)(?:{alternation})\w*", re.IGNORECASE)
+        else:
+            self.pattern = None
+
+    def __bool__(self):
+        return self.pattern is not None
+
+    def highlight(self, text):
+        """HTML échappé de ``text`` avec les correspondances entre ``<mark>``."""
+        text = str(text)
+        if self.pattern is None:
+            return escape(text)
+        parts = []
+        position = 0
+        for match in self.pattern.finditer(text):
+            start, end = match.span()
+            parts.append(escape(text[position:start]))
+            parts.append(f"{MARK_HTML}{escape(match.group())}</mark>")
+            position = end
+        parts.append(escape(text[position:]))
+        return mark_safe("".join(parts))
+
+
+@lru_cache(maxsize=256)
+def _cached_highlighter(normalized_query):
+    return Highlighter(normalized_query)
+
+
+def get_highlighter(query):
+    """``Highlighter`` pour ``query``, compilé une fois par requête normalisée."""
+    return _cached_highlighter(normalize_query(query))
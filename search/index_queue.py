@@ -0,0 +1,114 @@
+"""
+Mise à jour différée de l'index de recherche.
+
+Par défaut, django-watson réindexe chaque objet dans son ``post_save``
+(ou en fin de requête via ``SearchContextMiddleware``, installée alors
+sur toutes les requêtes publiques). Ce module remplace ce récepteur :
+
+- un enregistrement ne fait que noter ``(modèle, pk)`` dans une file
+  propre au thread ;
+- la file est vidée après le commit de la transaction (``on_commit``),
+  en un lot : une requête par modèle pour relire les objets, puis une
+  écriture groupée des ``SearchEntry``.
+
+Les objets sont relus en base au moment du vidage : une transaction
+annulée ne laisse au pire qu'une réindexation inutile, jamais un état
+incohérent. Les suppressions restent immédiates (récepteur ``pre_delete``
+de watson, une simple requête ``DELETE``).
+"""
+
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+
+def _pending():
+    if not hasattr(_local, "pending"):
+        _local.pending = defaultdict(set)
+    return _local.pending
+
+
+def flush():
+    """Réindexe en un lot tous les objets en attente pour ce thread."""
+    from watson.search import default_search_engine, search_context_manager
+
+    from search import result_cache
+
+    pending = _pending()
+    if not pending:
+        return 0
+    batches = list(pending.items())
+    pending.clear()
+
+    indexed = 0
+    # Le contexte watson regroupe toutes les écritures en un bulk_create
+    with search_context_manager.update_index():
+        for model, pks in batches:
+            for obj in model._default_manager.filter(pk__in=pks).iterator():
+                search_context_manager.add_to_context(default_search_engine, obj)
+                indexed += 1
+    result_cache.bump_generation()
+    return indexed
+
+
+def _safe_flush():
+    try:
+        flush()
+    except Exception:
+        logger.exception("Erreur de mise à jour de l'index de recherche")
+
+
+def enqueue(model, pks):
+    """Programme la réindexation de ``pks`` après le commit courant."""
+    pks = [pk for pk in pks if pk is not None]
+    if not pks:
+        return
+    _pending()[model].update(pks)
+    # Enregistré à chaque appel : si une transaction est annulée, son
+    # rappel disparaît mais celui d'une transaction suivante videra la file
+    # (les rappels surnuméraires trouvent une file vide).
+    transaction.on_commit(_safe_flush)
+
+
+def _deferred_post_save(sender, instance, **kwargs):
+    enqueue(sender, [instance.pk])
+
+
+def install():
+    """
+    Remplace le récepteur ``post_save`` de watson par la file différée.
+
+    À appeler depuis ``SearchAppConfig.ready()`` : les applications qui
+    enregistrent des modèles auprès de watson doivent la précéder dans
+    ``INSTALLED_APPS``. Sans effet si ``SEARCH_DEFERRED_INDEX`` est faux.
+    """
+    from watson.search import default_search_engine
+
+    if not getattr(settings, "SEARCH_DEFERRED_INDEX", True):
+        return
+    for model in default_search_engine.get_registered_models():
+        post_save.disconnect(default_search_engine._post_save_receiver, model)
+        post_save.connect(
+            _deferred_post_save,
+            sender=model,
+            dispatch_uid=f"search_index_queue:{model._meta.label}",
+        )
+
+
+def uninstall():
+    """Rétablit l'indexation immédiate de watson."""
+    from watson.search import default_search_engine
+
+    for model in default_search_engine.get_registered_models():
+        post_save.disconnect(
+            sender=model, dispatch_uid=f"search_index_queue:{model._meta.label}"
+        )
+        post_save.connect(default_search_engine._post_save_receiver, model)
@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
+
 from home.models import StaticPage
+from search import index_queue
 
 
 class Command(BaseCommand):
@@ -183,8 +186,10 @@ class Command(BaseCommand):
         },
     ]
     
+    @transaction.atomic
     def handle(self, *args, **options):
         count = 0
+        updated_pks = []
         for page_data in self.PAGES:
             _, created = StaticPage.objects.get_or_create(
                 slug=page_data["slug"],
@@ -195,7 +200,11 @@ class Command(BaseCommand):
                 self.stdout.write(f"  Créé: {page_data['title']}")
             else:
                 # Mettre à jour les données existantes
-                StaticPage.objects.filter(slug=page_data["slug"]).update(**page_data)
+                pages = StaticPage.objects.filter(slug=page_data["slug"])
+                pages.update(**page_data)
+                updated_pks.extend(pages.values_list("pk", flat=True))
                 self.stdout.write(f"  Mis à jour: {page_data['title']}")
         
+        # update() n'émet pas post_save : réindexation groupée après commit
+        index_queue.enqueue(StaticPage, updated_pks)
         self.stdout.write(self.style.SUCCESS(f"\n{count} nouvelles pages créées, {len(self.PAGES) - count} pages mises à jour"))
@@ -0,0 +1,49 @@
+"""
+Commande Django pour reconstruire entièrement l'index de recherche.
+
+Réindexe tous les modèles enregistrés auprès de watson dans les ``ready()``
+des applications (``buildwatson``), puis reconstruit et optimise l'index
+FTS5 ``search_fts`` qui s'appuie sur ``watson_searchentry``.
+"""
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from watson import search as watson
+
+from search import fts, result_cache
+
+
+class Command(BaseCommand):
+    help = "Reconstruit l'index watson et l'index plein texte FTS5"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fts-only",
+            action="store_true",
+            help="Ne reconstruit que l'index FTS5 (watson_searchentry inchangé)",
+        )
+
+    def handle(self, *args, **options):
+        if not options["fts_only"]:
+            models = sorted(
+                model._meta.label for model in watson.get_registered_models()
+            )
+            self.stdout.write(
+                self.style.NOTICE(f"Modèles indexés : {', '.join(models)}")
+            )
+            call_command("buildwatson", stdout=self.stdout, stderr=self.stderr)
+            result_cache.bump_generation()
+
+        fts.reset_availability()
+        if not fts.is_available():
+            self.stdout.write(
+                self.style.WARNING(
+                    "Index FTS5 absent (base non SQLite ou FTS5 non compilé) : "
+                    "la recherche utilise watson."
+                )
+            )
+            return
+        fts.rebuild()
+        result_cache.bump_generation()
+        self.stdout.write(self.style.SUCCESS("Index FTS5 reconstruit et optimisé."))
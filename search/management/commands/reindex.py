@@ -0,0 +1,103 @@
+"""
+Commande Django de réindexation incrémentale de la recherche.
+
+    python manage.py reindex --since 24h
+    python manage.py reindex --since 2026-10-01
+
+Pour chaque modèle enregistré auprès de watson :
+
+- s'il possède un champ ``auto_now`` (ou à défaut ``auto_now_add``), seuls
+  les objets modifiés (créés) depuis la date sont réindexés ;
+- sinon, seuls les objets absents de l'index sont ajoutés.
+
+Dans tous les cas, les entrées d'objets supprimés sont retirées. Sans
+``--since``, tout est réindexé (équivalent de ``buildwatson``).
+"""
+
+import re
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from watson.search import default_search_engine
+
+from search import index_queue
+
+DURATION_RE = re.compile(r"^(\d+)\s*([mhdj])$")
+DURATION_UNITS = {"m": "minutes", "h": "hours", "d": "days", "j": "days"}
+
+
+def parse_since(value):
+    """
+    Date ISO (``2026-10-01``, ``2026-10-01T08:00``) ou durée (``30m``,
+    ``24h``, ``7d``).
+    """
+    match = DURATION_RE.match(value.strip().lower())
+    if match:
+        amount, unit = match.groups()
+        return timezone.now() - timedelta(**{DURATION_UNITS[unit]: int(amount)})
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Date invalide pour --since : {value!r}")
+        moment = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def timestamp_field(model):
+    """Champ de date de modification (ou de création) du modèle, ou None."""
+    fields = model._meta.concrete_fields
+    for flag in ("auto_now", "auto_now_add"):
+        for field in fields:
+            if getattr(field, flag, False):
+                return field.name
+    return None
+
+
+class Command(BaseCommand):
+    help = "Réindexe les objets modifiés depuis une date (ou absents de l'index)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Date ISO ou durée (30m, 24h, 7d) ; sans option, tout est réindexé",
+        )
+
+    def handle(self, *args, **options):
+        from django.contrib.contenttypes.models import ContentType
+
+        from watson.models import SearchEntry
+
+        since = parse_since(options["since"]) if options["since"] else None
+        total = 0
+        for model in default_search_engine.get_registered_models():
+            label = model._meta.label
+            default_search_engine.cleanup_model_index(model)
+            queryset = model._default_manager.all()
+            if since is not None:
+                field = timestamp_field(model)
+                if field:
+                    queryset = queryset.filter(**{f"{field}__gte": since})
+                    mode = f"modifiés depuis ({field})"
+                else:
+                    indexed_ids = SearchEntry.objects.filter(
+                        engine_slug="default",
+                        content_type=ContentType.objects.get_for_model(model),
+                    ).values_list("object_id", flat=True)
+                    queryset = queryset.exclude(pk__in=list(indexed_ids))
+                    mode = "absents de l'index"
+            else:
+                mode = "tous"
+            pks = list(queryset.values_list("pk", flat=True))
+            index_queue.enqueue(model, pks)
+            total += len(pks)
+            self.stdout.write(f"{label} : {len(pks)} objets ({mode})")
+
+        # Hors transaction, on_commit a déjà vidé la file ; sinon, on force
+        index_queue.flush()
+        self.stdout.write(self.style.SUCCESS(f"{total} objets réindexés."))
@@ -0,0 +1,84 @@
+"""
+Table virtuelle FTS5 ``search_fts`` indexant ``watson_searchentry``.
+
+Uniquement sous SQLite (et si FTS5 est compilé) ; sur les autres bases la
+migration ne fait rien et la recherche reste assurée par django-watson.
+"""
+
+import logging
+
+from django.db import OperationalError, migrations
+
+logger = logging.getLogger(__name__)
+
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+        title, description, content,
+        content='watson_searchentry',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_ai AFTER INSERT ON watson_searchentry
+    BEGIN
+        INSERT INTO search_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_ad AFTER DELETE ON watson_searchentry
+    BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS search_fts_au AFTER UPDATE ON watson_searchentry
+    BEGIN
+        INSERT INTO search_fts(search_fts, rowid, title, description, content)
+        VALUES ('delete', old.id, old.title, old.description, old.content);
+        INSERT INTO search_fts(rowid, title, description, content)
+        VALUES (new.id, new.title, new.description, new.content);
+    END
+    """,
+    "INSERT INTO search_fts(search_fts) VALUES ('rebuild')",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS search_fts_au",
+    "DROP TRIGGER IF EXISTS search_fts_ad",
+    "DROP TRIGGER IF EXISTS search_fts_ai",
+    "DROP TABLE IF EXISTS search_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        for statement in CREATE_SQL:
+            schema_editor.execute(statement)
+    except OperationalError as e:
+        # SQLite compilé sans FTS5 : repli sur watson
+        logger.warning("FTS5 indisponible, index search_fts non créé: %s", e)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("search", "0003_searchconfigmodel_singleton_and_more"),
+        ("watson", "0002_alter_searchentry_object_id"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
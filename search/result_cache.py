@@ -0,0 +1,256 @@
+"""
+Cache des résultats de recherche publique.
+
+Les citoyens tapent souvent les mêmes requêtes (« déchets », « PLUi »...).
+Chaque tranche de résultats est mémorisée sous une clé construite à partir
+de la requête normalisée (minuscules, sans accents, espaces réduits) :
+
+- niveau 1 : LRU en mémoire du processus (``LRU_SIZE`` entrées) ;
+- niveau 2 : cache Django (``LocMemCache`` : propre à chaque worker).
+
+Les deux niveaux expirent après ``RESULT_CACHE_SECONDS``, sauf les
+requêtes les plus fréquentes : ``pin_popular()`` (préchauffage du worker,
+``app.warmup``) les calcule une fois et les garde sans expiration pour la
+génération courante. Elles sont recalculées, dans un thread de fond, dès
+que la génération change ou au plus tard après ``PINNED_MAX_AGE``
+secondes (nouvelles requêtes populaires du journal analytics).
+
+Les clés incluent une « génération » de l'index, incrémentée dès qu'un
+modèle indexé par watson est enregistré ou supprimé (après commit) ou
+que l'index est reconstruit : toutes les entrées antérieures deviennent
+inaccessibles sans parcours ni suppression. La génération est stockée
+en base (``home.ContentVersion``, label ``GENERATION_LABEL``) pour être
+vue par tous les workers et par les commandes ; chaque processus la
+relit au plus toutes les ``GENERATION_CHECK_SECONDS`` secondes.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+logger = logging.getLogger(__name__)
+
+GENERATION_LABEL = "search.index"
+GENERATION_CHECK_SECONDS = 30
+RESULT_CACHE_SECONDS = 5 * 60
+LRU_SIZE = 256
+PINNED_MAX_AGE = 24 * 60 * 60
+
+
+class _LRUCache:
+    """
+    Dictionnaire borné, éviction de l'entrée la moins récemment lue.
+
+    Les entrées expirent ``timeout`` secondes après leur écriture.
+    """
+
+    def __init__(self, maxsize, timeout=None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return None
+            if expires is not None and expires <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_lru = _LRUCache(LRU_SIZE, RESULT_CACHE_SECONDS)
+# Dernière génération lue en base par ce processus
+_generation = {"value": None, "checked_at": 0.0}
+# Requêtes fréquentes préchauffées : entrées sans expiration pour
+# ``generation``, recalculées par ``seeder`` (voir ``pin_popular``)
+_pinned = {"generation": None, "entries": {}, "seeder": None, "seeded_at": 0.0}
+_reseed_lock = threading.Lock()
+_local = threading.local()
+
+
+def get_generation():
+    """Génération courante de l'index de recherche (relue en base toutes les 30 s)."""
+    now = time.monotonic()
+    if (
+        _generation["value"] is None
+        or now - _generation["checked_at"] > GENERATION_CHECK_SECONDS
+    ):
+        from home.content_versions import get_versions
+
+        try:
+            _generation["value"] = get_versions([GENERATION_LABEL])[GENERATION_LABEL]
+        except Exception as e:
+            logger.error("Search cache error: %s", e)
+            return _generation["value"] or "0"
+        _generation["checked_at"] = now
+        stale = (
+            _pinned["generation"] != _generation["value"]
+            or now - _pinned["seeded_at"] > PINNED_MAX_AGE
+        )
+        if _pinned["seeder"] is not None and stale and not _reseed_lock.locked():
+            _start_reseed()
+    return _generation["value"]
+
+
+def bump_generation():
+    """Invalide tous les résultats en cache (index modifié), dans tous les processus."""
+    from home.content_versions import bump
+
+    try:
+        bump(GENERATION_LABEL)
+    except Exception as e:
+        logger.error("Search cache error: %s", e)
+    _generation["value"] = None
+    _lru.clear()
+
+
+def clear_local():
+    """Vide le LRU et la génération mémorisés par ce processus (pas le cache Django)."""
+    _generation["value"] = None
+    _lru.clear()
+    _pinned.update(generation=None, entries={}, seeder=None, seeded_at=0.0)
+
+
+@contextmanager
+def _pinning():
+    """Mémorise, en plus, chaque entrée lue ou écrite par ce thread."""
+    entries = {}
+    _local.pinned = entries
+    try:
+        yield entries
+    finally:
+        _local.pinned = None
+
+
+def _pin(key, value):
+    entries = getattr(_local, "pinned", None)
+    if entries is not None:
+        entries[key] = value
+
+
+def reseed():
+    """
+    Recalcule les requêtes fréquentes épinglées pour la génération courante.
+
+    Returns:
+        nombre d'entrées épinglées, ou None si un recalcul est déjà en cours.
+    """
+    seeder = _pinned["seeder"]
+    if seeder is None or not _reseed_lock.acquire(blocking=False):
+        return None
+    try:
+        generation = get_generation()
+        with _pinning() as entries:
+            seeder()
+        _pinned.update(
+            generation=generation, entries=entries, seeded_at=time.monotonic()
+        )
+        return len(entries)
+    except Exception as e:
+        logger.error("Search cache error: %s", e)
+        return None
+    finally:
+        _reseed_lock.release()
+
+
+def _start_reseed():
+    threading.Thread(target=reseed, name="search-reseed", daemon=True).start()
+
+
+def pin_popular(seeder):
+    """
+    Préchauffe le cache des requêtes fréquentes dans ce processus.
+
+    ``seeder`` exécute ces requêtes (voir
+    ``search.services.warm_popular_queries``) ; il est rappelé à chaque
+    changement de génération. Renvoie le nombre d'entrées épinglées.
+    """
+    if not is_enabled():
+        return 0
+    _pinned["seeder"] = seeder
+    return reseed() or 0
+
+
+def make_key(kind, normalized_query, *parts):
+    """Clé de cache versionnée par la génération courante de l'index."""
+    digest = hashlib.md5(normalized_query.encode()).hexdigest()
+    suffix = ":".join(str(part) for part in parts)
+    generation = get_generation() if is_enabled() else 0
+    return f"search:{kind}:{generation}:{digest}:{suffix}"
+
+
+def is_enabled():
+    return getattr(settings, "SEARCH_RESULT_CACHE", True)
+
+
+def lookup(key):
+    """Valeur en cache (requêtes épinglées, LRU puis cache Django), ou None."""
+    if not is_enabled():
+        return None
+    value = _pinned["entries"].get(key)
+    if value is None:
+        value = _lru.get(key)
+    if value is None:
+        try:
+            value = cache.get(key)
+        except Exception as e:
+            logger.error("Search cache error: %s", e)
+            return None
+        if value is not None:
+            _lru.set(key, value)
+    if value is not None:
+        _pin(key, value)
+    return value
+
+
+def store(key, value):
+    """Mémorise ``value`` dans les deux niveaux de cache."""
+    if not is_enabled():
+        return
+    _pin(key, value)
+    _lru.set(key, value)
+    try:
+        cache.set(key, value, RESULT_CACHE_SECONDS)
+    except Exception as e:
+        logger.error("Search cache error: %s", e)
+
+
+def _on_index_change(sender, **kwargs):
+    from watson import search as watson
+
+    if watson.is_registered(sender):
+        transaction.on_commit(bump_generation)
+
+
+def connect_signals():
+    """Invalide le cache à chaque modification d'un modèle indexé."""
+    post_save.connect(_on_index_change, dispatch_uid="search_result_cache:save")
+    post_delete.connect(_on_index_change, dispatch_uid="search_result_cache:delete")
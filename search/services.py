@@ -1,12 +1,20 @@
 import logging
+import re
+from datetime import timedelta
 
 from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.core.validators import URLValidator
+from django.utils import timezone
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
 
 from watson import search as watson
 
+from app.utils import remove_accents
+from search import fts, result_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -38,6 +46,120 @@ class SearchLogger:
         logger.info("Search query='%s' results=%d", truncated, count)
 
 
+_WHITESPACE_RE = re.compile(r"\s+")
+# Période du journal analytics lue pour choisir les requêtes à préchauffer
+POPULAR_QUERIES_DAYS = 30
+# Longueurs d'affichage des résultats (ex-filtres ``truncatechars`` du template)
+TITLE_CHARS = 80
+DESCRIPTION_CHARS = 120
+
+
+def normalize_query(query):
+    """Forme canonique d'une requête : minuscules, sans accents, espaces réduits."""
+    return _WHITESPACE_RE.sub(" ", remove_accents(query or "").lower()).strip()
+
+
+class LazySearchResults:
+    """
+    Résultats de recherche paresseux, compatibles ``Paginator``.
+
+    Seule la tranche affichée est lue (``LIMIT/OFFSET`` en SQL, que la
+    source soit l'index FTS5 ou un QuerySet watson) et seules ses URL sont
+    validées. Total et tranches sont mémorisés par requête normalisée
+    (texte brut pour watson, sensible aux accents ; voir
+    ``search.result_cache``, invalidé à chaque mise à jour de l'index) : le
+    total inclut d'éventuels résultats à URL dangereuse, écartés à
+    l'affichage.
+    """
+
+    def __init__(self, query, use_fts=None):
+        self.query = query
+        self.use_fts = fts.is_available() if use_fts is None else use_fts
+        self._count = None
+        self._queryset = None
+
+    @property
+    def backend(self):
+        return "fts" if self.use_fts else "watson"
+
+    def _cache_key(self, kind, *parts):
+        # FTS5 ignore casse et accents (``remove_diacritics``) ; watson
+        # cherche le texte tel quel : sa clé ne réduit que les espaces
+        if self.use_fts:
+            query = normalize_query(self.query)
+        else:
+            query = _WHITESPACE_RE.sub(" ", self.query or "").strip()
+        return result_cache.make_key(kind, query, self.backend, *parts)
+
+    def _watson_queryset(self):
+        if self._queryset is None:
+            self._queryset = watson.search(self.query)
+        return self._queryset
+
+    def _compute_count(self):
+        if self.use_fts:
+            return fts.count(self.query)
+        return self._watson_queryset().count()
+
+    def count(self):
+        if self._count is None:
+            key = self._cache_key("count")
+            self._count = result_cache.lookup(key)
+            if self._count is None:
+                self._count = self._compute_count()
+                result_cache.store(key, self._count)
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def _fetch(self, start, stop):
+        if stop <= start:
+            return []
+        key = self._cache_key("hits", start, stop)
+        hits = result_cache.lookup(key)
+        if hits is None:
+            if self.use_fts:
+                hits = fts.search(self.query, limit=stop - start, offset=start)
+            else:
+                hits = list(self._watson_queryset()[start:stop])
+            result_cache.store(key, hits)
+        return hits
+
+    def _decorate(self, hit):
+        """
+        Ajoute le titre (et la description) tronqués et surlignés.
+
+        Calculé une fois par résultat affiché, sur le texte déjà tronqué :
+        les templates n'ont plus aucun travail de surlignage à faire.
+        """
+        from search.highlight import get_highlighter
+
+        highlighter = get_highlighter(self.query)
+        title = Truncator(strip_tags(hit.title)).chars(TITLE_CHARS)
+        if isinstance(hit, fts.SearchHit):
+            # Description : extrait snippet() déjà surligné par FTS5
+            return hit._replace(title_html=highlighter.highlight(title))
+        description = Truncator(strip_tags(hit.description)).chars(DESCRIPTION_CHARS)
+        hit.title_html = highlighter.highlight(title)
+        hit.description_html = highlighter.highlight(description) if description else ""
+        return hit
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start = index.start or 0
+            stop = index.stop if index.stop is not None else self.count()
+            return [
+                self._decorate(hit)
+                for hit in self._fetch(start, stop)
+                if URLValidatorService.is_safe(hit.url)
+            ]
+        hits = self._fetch(index, index + 1)
+        if not hits:
+            raise IndexError(index)
+        return hits[0]
+
+
 class SearchService:
     @staticmethod
     def execute(raw_query, config):
@@ -45,22 +167,55 @@ class SearchService:
         if len(query) < config.min_query_length:
             return None
 
-        raw_results = watson.search(query)
+        results = LazySearchResults(query)
+        count = results.count()
 
-        validated = [r for r in raw_results if URLValidatorService.is_safe(r.url)]
+        SearchLogger.log(query, count)
 
-        SearchLogger.log(query, len(validated))
-
-        paginator = Paginator(validated, config.results_per_page)
+        paginator = Paginator(results, config.results_per_page)
 
         return {
             "query": query,
-            "results": validated,
-            "count": len(validated),
+            "results": results,
+            "count": count,
             "paginator": paginator,
         }
 
 
+def warm_popular_queries(limit=None, days=POPULAR_QUERIES_DAYS):
+    """
+    Exécute les recherches les plus fréquentes du journal analytics.
+
+    Total et première page sont calculés comme par la vue (mêmes clés de
+    cache) ; appelé par ``search.result_cache.reseed``, qui les épingle.
+    Renvoie le nombre de requêtes exécutées.
+    """
+    from django.conf import settings
+
+    from analytics.analytics_data import get_search_queries
+    from search.models import SearchConfigModel
+
+    if limit is None:
+        limit = getattr(settings, "WARMUP_TOP_QUERIES", 50)
+    if limit <= 0:
+        return 0
+    config = SearchConfigModel.get_config()
+    end = timezone.localdate()
+    # Plusieurs graphies d'une même requête partagent la même clé de cache
+    seen = set()
+    for entry in get_search_queries(end - timedelta(days=days), end, limit=limit):
+        query = entry["query"].strip()[: config.max_query_length]
+        normalized = normalize_query(query)
+        if len(query) < config.min_query_length or normalized in seen:
+            continue
+        seen.add(normalized)
+        results = LazySearchResults(query)
+        results.count()
+        # Même découpage que la vue : même clé de cache pour la page 1
+        Paginator(results, config.results_per_page).get_page(1)
+    return len(seen)
+
+
 class RateLimitService:
     RATE_LIMIT = 30
     WINDOW_SECONDS = 60
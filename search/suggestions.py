@@ -0,0 +1,176 @@
+"""
+Suggestions de recherche à la frappe (arbre de préfixes en mémoire).
+
+L'arbre est construit à partir des titres indexés par watson pour les
+modèles de ``SUGGESTION_MODELS`` et des requêtes les plus fréquentes du
+journal analytics. Les clés sont repliées (minuscules, sans accents) et
+chaque titre est indexé à partir de chacun de ses mots : « dech » propose
+« Collecte des déchets ».
+
+Chaque nœud conserve directement ses ``MAX_SUGGESTIONS`` meilleures
+entrées : une recherche ne coûte que le parcours du préfixe, sans requête
+ni parcours de sous-arbre. L'arbre est reconstruit paresseusement quand la
+génération de l'index change (voir ``search.result_cache``) ou après
+``REBUILD_SECONDS`` (nouvelles requêtes fréquentes).
+"""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+from urllib.parse import urlencode
+
+from django.urls import reverse
+from django.utils import timezone
+
+from search import result_cache
+from search.services import normalize_query
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 8
+MIN_PREFIX_LENGTH = 2
+REBUILD_SECONDS = 3600
+POPULAR_QUERIES_DAYS = 30
+POPULAR_QUERIES_LIMIT = 200
+
+# Modèles dont les titres alimentent les suggestions
+SUGGESTION_MODELS = (
+    "home.StaticPage",
+    "conseil_communautaire.ConseilVille",
+    "journal.Journal",
+    "partenaires.Partenaire",
+    "competences.Competence",
+    "services.Service",
+    "bureau_communautaire.Elus",
+)
+
+
+class PrefixTrie:
+    """Arbre de préfixes dont chaque nœud garde ses meilleures entrées."""
+
+    __slots__ = ("root", "items", "limit", "_labels")
+
+    def __init__(self, limit=MAX_SUGGESTIONS):
+        # Nœud : [enfants (dict), candidats [(-poids, libellé, index)]]
+        self.root = [{}, []]
+        self.items = []
+        self.limit = limit
+        self._labels = set()
+
+    def add(self, label, weight=1, **extra):
+        """Indexe ``label`` à partir de chacun de ses mots (doublons ignorés)."""
+        folded = normalize_query(label)
+        if not folded or folded in self._labels:
+            return
+        self._labels.add(folded)
+        index = len(self.items)
+        self.items.append({"label": label, **extra})
+        candidate = (-weight, folded, index)
+        words = folded.split(" ")
+        seen_nodes = set()
+        for position in range(len(words)):
+            node = self.root
+            for char in " ".join(words[position:]):
+                node = node[0].setdefault(char, [{}, []])
+                if id(node) not in seen_nodes:
+                    seen_nodes.add(id(node))
+                    node[1].append(candidate)
+
+    def freeze(self):
+        """Trie et tronque les candidats de chaque nœud (après tous les ``add``)."""
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node[1] = [index for *_key, index in sorted(node[1])[: self.limit]]
+            stack.extend(node[0].values())
+
+    def lookup(self, prefix):
+        """Entrées dont un mot commence par ``prefix`` (déjà replié ou non)."""
+        node = self.root
+        for char in normalize_query(prefix):
+            node = node[0].get(char)
+            if node is None:
+                return []
+        return [self.items[index] for index in node[1]]
+
+
+def _indexed_titles():
+    from django.apps import apps
+    from django.contrib.contenttypes.models import ContentType
+
+    from watson.models import SearchEntry
+
+    content_types = ContentType.objects.get_for_models(
+        *(apps.get_model(label) for label in SUGGESTION_MODELS)
+    ).values()
+    return SearchEntry.objects.filter(
+        engine_slug="default", content_type__in=content_types
+    ).values_list("title", "url", "content_type__model")
+
+
+def _popular_queries():
+    try:
+        from analytics.analytics_data import get_search_queries
+
+        end = timezone.localdate()
+        start = end - timedelta(days=POPULAR_QUERIES_DAYS)
+        return get_search_queries(start, end, limit=POPULAR_QUERIES_LIMIT)
+    except Exception as e:
+        logger.warning("Requêtes fréquentes indisponibles: %s", e)
+        return []
+
+
+def build_trie():
+    """Construit l'arbre depuis l'index watson et le journal analytics."""
+    trie = PrefixTrie()
+    # Les titres passent avant une requête tapée moins de 5 fois
+    for title, url, model_name in _indexed_titles():
+        trie.add(title, weight=5, url=url, type=model_name)
+    search_url = reverse("search")
+    for entry in _popular_queries():
+        query = entry["query"].strip()
+        trie.add(
+            query,
+            weight=entry["count"],
+            url=f"{search_url}?{urlencode({'q': query})}",
+            type="recherche",
+        )
+    trie.freeze()
+    return trie
+
+
+_lock = threading.Lock()
+_state = {"trie": None, "generation": None, "built_at": 0.0}
+
+
+def _is_stale(generation):
+    return (
+        _state["trie"] is None
+        or _state["generation"] != generation
+        or time.monotonic() - _state["built_at"] > REBUILD_SECONDS
+    )
+
+
+def get_trie():
+    """Arbre courant, reconstruit si l'index a changé ou s'il est trop ancien."""
+    generation = result_cache.get_generation()
+    if _is_stale(generation):
+        with _lock:
+            if _is_stale(generation):
+                _state["trie"] = build_trie()
+                _state["generation"] = generation
+                _state["built_at"] = time.monotonic()
+    return _state["trie"]
+
+
+def reset():
+    """Oublie l'arbre courant (reconstruit à la prochaine suggestion)."""
+    _state["trie"] = None
+
+
+def suggest(prefix):
+    """Suggestions pour ``prefix`` (liste vide sous ``MIN_PREFIX_LENGTH``)."""
+    if len(normalize_query(prefix)) < MIN_PREFIX_LENGTH:
+        return []
+    return get_trie().lookup(prefix)
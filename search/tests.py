@@ -1,12 +1,28 @@
 import logging
 import logging.handlers
+import time
+from io import StringIO
+from unittest import mock
 
 from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.core.paginator import Paginator
 from django.test import RequestFactory, TestCase, override_settings
 from django.urls import reverse
 
+from watson import search as watson
+
+from home.models import StaticPage
+from search import fts, index_queue, result_cache, suggestions
 from search.models import SearchConfigModel
-from search.services import SearchLogger, SearchService, URLValidatorService
+from search.services import (
+    LazySearchResults,
+    SearchLogger,
+    SearchService,
+    URLValidatorService,
+    normalize_query,
+    warm_popular_queries,
+)
 
 
 class SearchConfigModelTest(TestCase):
@@ -107,6 +123,415 @@ class SearchServiceTest(TestCase):
         self.assertIsNotNone(result)
 
 
+class FTSSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.config = SearchConfigModel.get_config()
+        StaticPage.objects.create(
+            title="Collecte des déchets",
+            slug="dechets",
+            url="/dechets/",
+            description="Calendrier de ramassage",
+            content="Tri sélectif, verre et ordures ménagères",
+        )
+        StaticPage.objects.create(
+            title="Habitat",
+            slug="habitat",
+            url="/habitat/",
+            description="Aides au logement",
+            content="Rénovation énergétique et déchets de chantier",
+        )
+        StaticPage.objects.create(
+            title="Piège",
+            slug="piege",
+            url="javascript:alert(1)",
+            description="déchets",
+            content="",
+        )
+
+    def test_fts_available_on_sqlite(self):
+        self.assertTrue(fts.is_available())
+
+    def test_accent_insensitive_match(self):
+        titles = [hit.title for hit in fts.search("dechets", limit=10)]
+        self.assertIn("Collecte des déchets", titles)
+        self.assertIn("Habitat", titles)
+
+    def test_bm25_ranks_title_matches_first(self):
+        hits = fts.search("déchets", limit=10)
+        self.assertEqual(hits[0].title, "Collecte des déchets")
+        self.assertEqual(hits[0].model_name, "staticpage")
+
+    def test_prefix_match(self):
+        self.assertEqual(fts.count("ordu"), 1)
+
+    def test_limit_offset_pushed_to_sql(self):
+        self.assertEqual(fts.count("déchets"), 3)
+        self.assertEqual(len(fts.search("déchets", limit=1, offset=1)), 1)
+        self.assertEqual(fts.search("déchets", limit=10, offset=5), [])
+
+    def test_snippet_is_escaped_and_highlighted(self):
+        StaticPage.objects.create(
+            title="Test", slug="xss", url="/xss/", content="<b>verre</b> recyclé"
+        )
+        hit = fts.search("recyclé", limit=1)[0]
+        self.assertIn("<mark", hit.snippet)
+        self.assertNotIn("<b>", hit.snippet)
+
+    def test_fts_operators_are_neutralised(self):
+        self.assertEqual(
+            fts.build_match_expression('verre OR "x" -y'), '"verre"* "OR"* "x"* "y"*'
+        )
+        self.assertEqual(fts.build_match_expression("!!"), "")
+        self.assertEqual(fts.count("!!"), 0)
+
+    def test_index_follows_updates_and_deletes(self):
+        page = StaticPage.objects.get(slug="habitat")
+        page.content = "Logement social"
+        page.save()
+        self.assertEqual(fts.count("chantier"), 0)
+        page.delete()
+        self.assertEqual(fts.count("logement"), 0)
+
+    def test_service_filters_unsafe_urls_on_page(self):
+        result = SearchService.execute("déchets", self.config)
+        page = result["paginator"].get_page(1)
+        urls = [hit.url for hit in page]
+        self.assertNotIn("javascript:alert(1)", urls)
+        self.assertIn("/dechets/", urls)
+
+    def test_displayed_hits_are_highlighted_in_advance(self):
+        result = SearchService.execute("dechets", self.config)
+        hit = list(result["paginator"].get_page(1))[0]
+        self.assertIn("<mark", hit.title_html)
+        self.assertIn("<mark", hit.snippet)
+
+    def test_watson_hits_are_highlighted_in_advance(self):
+        results = LazySearchResults("déchets", use_fts=False)
+        hits = {hit.title: hit for hit in results[0:10]}
+        self.assertIn("<mark", hits["Collecte des déchets"].title_html)
+        self.assertEqual(hits["Habitat"].title_html, "Habitat")
+
+    def test_rebuild_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn("FTS5", out.getvalue())
+        self.assertEqual(fts.count("ordures"), 1)
+
+
+class LazySearchResultsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(25):
+            StaticPage.objects.create(
+                title=f"Déchets {i}",
+                slug=f"dechets-{i}",
+                url=f"/dechets/{i}/",
+                content="Collecte des déchets",
+            )
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Déchets   VERTS "), "dechets verts")
+
+    @override_settings(SEARCH_RESULT_CACHE=True)
+    def test_count_cached_per_normalized_query(self):
+        result_cache.clear_local()
+        self.assertEqual(LazySearchResults("déchets").count(), 25)
+        with self.assertNumQueries(0):
+            self.assertEqual(LazySearchResults("  DECHETS ").count(), 25)
+
+    @override_settings(SEARCH_RESULT_CACHE=True)
+    def test_watson_cache_keyed_on_raw_query(self):
+        # watson ne replie pas les accents : « dechets » ne reprend pas
+        # le total mis en cache pour « déchets »
+        result_cache.clear_local()
+        self.assertEqual(LazySearchResults("déchets", use_fts=False).count(), 25)
+        self.assertEqual(LazySearchResults(" déchets ", use_fts=False).count(), 25)
+        self.assertEqual(LazySearchResults("dechets", use_fts=False).count(), 0)
+        result_cache.clear_local()
+
+    def test_only_displayed_slice_is_validated(self):
+        results = LazySearchResults("déchets")
+        with mock.patch.object(
+            URLValidatorService, "is_safe", wraps=URLValidatorService.is_safe
+        ) as is_safe:
+            page = Paginator(results, 10).get_page(2)
+            self.assertEqual(len(page), 10)
+        self.assertEqual(is_safe.call_count, 10)
+
+    def test_watson_fallback_is_sliced_in_sql(self):
+        results = LazySearchResults("déchets", use_fts=False)
+        page = Paginator(results, 10).get_page(3)
+        self.assertEqual(len(page.object_list), 5)
+        self.assertEqual(results.count(), 25)
+
+
+@override_settings(SEARCH_RESULT_CACHE=True)
+class SearchResultCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        result_cache.clear_local()
+        self.config = SearchConfigModel.get_config()
+        StaticPage.objects.create(
+            title="PLUi", slug="plui", url="/plui/", content="Urbanisme"
+        )
+
+    def tearDown(self):
+        result_cache.clear_local()
+
+    def _first_page(self, query):
+        result = SearchService.execute(query, self.config)
+        return list(result["paginator"].get_page(1))
+
+    def test_repeated_query_served_from_cache(self):
+        self._first_page("PLUi")
+        with self.assertNumQueries(0):
+            hits = self._first_page("  plui ")
+        self.assertEqual([hit.title for hit in hits], ["PLUi"])
+
+    def test_lru_evicts_least_recently_used(self):
+        lru = result_cache._LRUCache(2)
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+        self.assertIsNone(lru.get("b"))
+        self.assertEqual(lru.get("a"), 1)
+
+    def test_index_update_invalidates(self):
+        self.assertEqual(len(self._first_page("urbanisme")), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            StaticPage.objects.create(
+                title="Urbanisme", slug="urba", url="/urba/", content="PLUi"
+            )
+        self.assertEqual(len(self._first_page("urbanisme")), 2)
+
+    def test_unrelated_model_does_not_invalidate(self):
+        generation = result_cache.get_generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            SearchConfigModel.get_config().save()
+        self.assertEqual(result_cache.get_generation(), generation)
+
+    def test_lru_entries_expire(self):
+        lru = result_cache._LRUCache(2, timeout=60)
+        lru.set("a", 1)
+        later = time.monotonic() + 61
+        with mock.patch("search.result_cache.time.monotonic", return_value=later):
+            self.assertIsNone(lru.get("a"))
+
+    def test_generation_bumped_by_another_process_is_seen(self):
+        from home.content_versions import bump
+
+        self.assertEqual(len(self._first_page("urbanisme")), 1)
+        StaticPage.objects.create(
+            title="Urbanisme", slug="urba", url="/urba/", content="PLUi"
+        )
+        # Autre worker : la base change, pas la mémoire de ce processus
+        bump(result_cache.GENERATION_LABEL)
+        self.assertEqual(len(self._first_page("urbanisme")), 1)
+        result_cache._generation["checked_at"] -= (
+            result_cache.GENERATION_CHECK_SECONDS + 1
+        )
+        self.assertEqual(len(self._first_page("urbanisme")), 2)
+
+    def _expire_unpinned(self):
+        # Fin du délai ``RESULT_CACHE_SECONDS`` des entrées ordinaires
+        result_cache._lru.clear()
+        cache.clear()
+
+    @mock.patch("analytics.analytics_data.get_search_queries")
+    def test_popular_queries_pinned_without_expiry(self, queries):
+        queries.return_value = [
+            {"query": "PLUi", "count": 9},
+            {"query": "plui ", "count": 3},
+            {"query": "x", "count": 2},
+        ]
+        self.assertGreater(result_cache.pin_popular(warm_popular_queries), 0)
+        self.assertEqual(queries.call_args.kwargs["limit"], 50)
+        self._expire_unpinned()
+        with self.assertNumQueries(0):
+            self.assertEqual([hit.title for hit in self._first_page("plui")], ["PLUi"])
+
+    @mock.patch("analytics.analytics_data.get_search_queries")
+    def test_pinned_queries_reseeded_on_generation_change(self, queries):
+        queries.return_value = [{"query": "urbanisme", "count": 9}]
+        result_cache.pin_popular(warm_popular_queries)
+        with self.captureOnCommitCallbacks(execute=True):
+            StaticPage.objects.create(
+                title="Urbanisme", slug="urba", url="/urba/", content="PLUi"
+            )
+        # Recalcul synchrone (en production : thread de fond)
+        with mock.patch.object(
+            result_cache, "_start_reseed", side_effect=result_cache.reseed
+        ) as start:
+            generation = result_cache.get_generation()
+        start.assert_called_once()
+        self.assertEqual(result_cache._pinned["generation"], generation)
+        self._expire_unpinned()
+        with self.assertNumQueries(0):
+            self.assertEqual(len(self._first_page("urbanisme")), 2)
+
+    def test_pin_popular_disabled_without_cache(self):
+        with override_settings(SEARCH_RESULT_CACHE=False):
+            self.assertEqual(result_cache.pin_popular(warm_popular_queries), 0)
+        self.assertIsNone(result_cache._pinned["seeder"])
+
+
+class PrefixTrieTest(TestCase):
+    def test_matches_any_word_accent_insensitive(self):
+        trie = suggestions.PrefixTrie()
+        trie.add("Collecte des déchets", url="/dechets/")
+        trie.add("Habitat", url="/habitat/")
+        trie.freeze()
+        self.assertEqual(
+            [item["label"] for item in trie.lookup("DÉCH")], ["Collecte des déchets"]
+        )
+        self.assertEqual(trie.lookup("des dech")[0]["url"], "/dechets/")
+        self.assertEqual(trie.lookup("zz"), [])
+
+    def test_keeps_best_weighted_entries(self):
+        trie = suggestions.PrefixTrie(limit=2)
+        trie.add("Piscine", weight=1)
+        trie.add("PLUi", weight=10)
+        trie.add("Plan vélo", weight=5)
+        trie.add("plui", weight=50)  # doublon ignoré
+        trie.freeze()
+        self.assertEqual(
+            [item["label"] for item in trie.lookup("p")], ["PLUi", "Plan vélo"]
+        )
+
+
+class SuggestionsViewTest(TestCase):
+    def setUp(self):
+        suggestions.reset()
+        StaticPage.objects.create(
+            title="Collecte des déchets", slug="dechets", url="/dechets/", content="x"
+        )
+
+    def tearDown(self):
+        suggestions.reset()
+
+    @mock.patch("search.suggestions._popular_queries")
+    def test_returns_titles_and_popular_queries(self, popular):
+        popular.return_value = [{"query": "déchèterie horaires", "count": 40}]
+        response = self.client.get(reverse("search_suggestions"), {"q": "dech"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("max-age=300", response["Cache-Control"])
+        labels = [item["label"] for item in response.json()["suggestions"]]
+        self.assertEqual(labels, ["déchèterie horaires", "Collecte des déchets"])
+
+    @mock.patch("search.suggestions._popular_queries", return_value=[])
+    def test_lookup_does_not_query_database_once_built(self, _popular):
+        suggestions.suggest("co")
+        with self.assertNumQueries(0):
+            self.assertEqual(suggestions.suggest("coll")[0]["url"], "/dechets/")
+
+    @mock.patch("search.suggestions._popular_queries", return_value=[])
+    def test_rebuilt_on_index_change(self, _popular):
+        self.assertEqual(suggestions.suggest("habitat"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            StaticPage.objects.create(
+                title="Habitat", slug="habitat", url="/habitat/", content="x"
+            )
+        self.assertEqual(len(suggestions.suggest("habitat")), 1)
+
+    def test_short_prefix(self):
+        response = self.client.get(reverse("search_suggestions"), {"q": "d"})
+        self.assertEqual(response.json()["suggestions"], [])
+
+
+class DeferredIndexTest(TestCase):
+    def setUp(self):
+        with override_settings(SEARCH_DEFERRED_INDEX=True):
+            index_queue.install()
+
+    def tearDown(self):
+        index_queue.uninstall()
+
+    def _indexed_titles(self):
+        from watson.models import SearchEntry
+
+        return set(SearchEntry.objects.values_list("title", flat=True))
+
+    def test_saves_are_indexed_in_one_batch_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                StaticPage.objects.create(
+                    title=f"Page {i}", slug=f"page-{i}", url=f"/p{i}/", content="x"
+                )
+            self.assertEqual(self._indexed_titles(), set())
+        self.assertEqual(self._indexed_titles(), {"Page 0", "Page 1", "Page 2"})
+
+    def test_rolled_back_objects_are_not_indexed(self):
+        from django.db import transaction
+
+        class Rollback(Exception):
+            pass
+
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    StaticPage.objects.create(
+                        title="Annulée", slug="annulee", url="/a/", content="x"
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+            StaticPage.objects.create(
+                title="Gardée", slug="gardee", url="/g/", content="x"
+            )
+        self.assertEqual(self._indexed_titles(), {"Gardée"})
+
+    def test_no_search_context_middleware(self):
+        from django.conf import settings
+
+        self.assertNotIn(
+            "watson.middleware.SearchContextMiddleware", settings.MIDDLEWARE
+        )
+
+
+class ReindexCommandTest(TestCase):
+    def test_parse_since(self):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        from search.management.commands.reindex import parse_since
+
+        self.assertAlmostEqual(
+            parse_since("24h"),
+            timezone.now() - timedelta(hours=24),
+            delta=timedelta(seconds=5),
+        )
+        self.assertEqual(parse_since("2026-10-01").date().isoformat(), "2026-10-01")
+        with self.assertRaises(CommandError):
+            parse_since("hier")
+
+    def test_since_reindexes_recent_and_missing_only(self):
+        from watson.models import SearchEntry
+
+        from journal.models import Journal
+
+        page = StaticPage.objects.create(
+            title="Ancien titre", slug="recent", url="/r/", content="x"
+        )
+        StaticPage.objects.filter(pk=page.pk).update(title="Nouveau titre")
+        # Objet sans horodatage ni entrée d'index
+        with watson.skip_index_update():
+            Journal.objects.create(title="Journal 1", release_date="2026-01-01")
+
+        out = StringIO()
+        call_command("reindex", "--since", "1h", stdout=out)
+        titles = set(SearchEntry.objects.values_list("title", flat=True))
+        self.assertIn("Nouveau titre", titles)
+        self.assertIn("Journal 1", titles)
+        self.assertIn("absents de l'index", out.getvalue())
+
+
 @override_settings(TESTING=True)
 class SearchViewTest(TestCase):
     def setUp(self):
@@ -257,6 +682,30 @@ class SearchFiltersTest(TestCase):
         result = highlight("<script>alert(1)</script>", "script")
         self.assertNotIn("<script>", str(result))
 
+    def test_highlight_each_word_accent_insensitive(self):
+        from home.templatetags.search_filters import highlight
+
+        result = str(highlight("Collecte des Déchets verts", "dechets collecte"))
+        self.assertEqual(result.count("<mark"), 2)
+        self.assertIn(">Déchets</mark>", result)
+        self.assertIn(">Collecte</mark>", result)
+
+    def test_highlighter_compiled_once_per_normalized_query(self):
+        from search.highlight import get_highlighter
+
+        self.assertIs(
+            get_highlighter("Déchets  verts"), get_highlighter("dechets verts")
+        )
+
+    def test_highlighter_matches_word_prefixes_only(self):
+        from search.highlight import Highlighter
+
+        result = Highlighter("dech").highlight("déchèterie & tri-déchets")
+        self.assertIn(">déchèterie</mark>", result)
+        self.assertIn("&amp;", result)
+        self.assertIn("tri-<mark", result)
+        self.assertFalse(Highlighter("!!"))
+
     def test_split_words_basic(self):
         from home.templatetags.search_filters import split_words
 
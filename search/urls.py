@@ -4,4 +4,9 @@ from search import views
 
 urlpatterns = [
     path("recherche/", views.search_view, name="search"),
+    path(
+        "recherche/suggestions/",
+        views.suggestions_view,
+        name="search_suggestions",
+    ),
 ]
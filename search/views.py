@@ -1,5 +1,9 @@
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import require_safe
 
+from search import suggestions
 from search.models import SearchConfigModel
 from search.services import RateLimitService, SearchService
 
@@ -21,7 +25,7 @@ def search_view(request):
             status=429,
         )
 
-    config = SearchConfigModel.get_config()
+    config = SearchConfigModel.get_cached(create=True)
     raw_query = request.GET.get("q", "")
 
     result = SearchService.execute(raw_query, config)
@@ -63,3 +67,14 @@ def search_view(request):
             "page_obj": page_obj,
         },
     )
+
+
+@require_safe
+@cache_control(public=True, max_age=300)
+def suggestions_view(request):
+    """Suggestions JSON pour la saisie en cours (``?q=<préfixe>``)."""
+    prefix = request.GET.get("q", "").strip()[:100]
+    return JsonResponse(
+        {"query": prefix, "suggestions": suggestions.suggest(prefix)},
+        json_dumps_params={"ensure_ascii": False},
+    )
@@ -2,14 +2,16 @@ from django.contrib.auth.decorators import permission_required
 from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 
+from app.conditional import conditional_page
 from app.utils import secure_file_removal
 
 from .forms import SemestrielForm
 from .models import SemestrielPage
 
 
+@conditional_page("semestriels.SemestrielPage")
 def semestriel(request):
-    content = SemestrielPage.get_solo()
+    content = SemestrielPage.get_cached()
 
     context = {
         "content": content,
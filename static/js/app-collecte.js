@@ -794,10 +794,20 @@ function generatePdfViewLink(city, street = null) {
     return url;
 }
 
+function generateIcsLink(city, street = null) {
+    // Génère le lien d'abonnement agenda (.ics) du calendrier de collecte
+    let url = `/collecte/calendrier.ics?commune=${encodeURIComponent(city)}`;
+    if (street) {
+        url += `&rue=${encodeURIComponent(street)}`;
+    }
+    return url;
+}
+
 function getPdfDownloadButton(city, street = null) {
     // Retourne le HTML des boutons PDF (télécharger + visualiser)
     const downloadUrl = generatePdfLink(city, street);
     const viewUrl = generatePdfViewLink(city, street);
+    const icsUrl = generateIcsLink(city, street);
     const safeCity = sanitizeHtml(city);
     const safeStreet = street ? sanitizeHtml(street) : null;
     const downloadLabel = safeStreet
@@ -823,6 +833,12 @@ function getPdfDownloadButton(city, street = null) {
                 </svg>
                 ${viewLabel}
             </a>
+            <a href="${icsUrl}" class="inline-flex items-center px-4 py-2 border border-primary text-primary dark:text-blue-400 rounded-lg hover:bg-primary hover:text-white transition-colors duration-200 text-sm font-medium">
+                <svg xmlns="http://www.w3.org/2000/svg" class="h-4 w-4 mr-2" fill="none" viewBox="0 0 24 24" stroke="currentColor" aria-hidden="true">
+                    <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M8 7V3m8 4V3m-9 8h10M5 21h14a2 2 0 002-2V7a2 2 0 00-2-2H5a2 2 0 00-2 2v12a2 2 0 002 2z" />
+                </svg>
+                Ajouter à mon agenda
+            </a>
         </div>
     </div>
     `;